@@ -0,0 +1,103 @@
+"""initial_schema
+
+Revision ID: 3f1c2a9b7d10
+Revises:
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3f1c2a9b7d10"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def timestamp_columns() -> list[sa.Column]:
+    return [
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("TIMEZONE('utc', now())"),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("TIMEZONE('utc', now())"),
+            nullable=False,
+        ),
+        sa.Column(
+            "is_active",
+            sa.Boolean(),
+            server_default="TRUE",
+            nullable=False,
+        ),
+    ]
+
+
+def upgrade() -> None:
+    op.create_table(
+        "users",
+        sa.Column("first_name", sa.String(length=64), nullable=True),
+        sa.Column("last_name", sa.String(length=64), nullable=True),
+        sa.Column("username", sa.String(length=32), nullable=True),
+        sa.Column(
+            "some_bool_val",
+            sa.Boolean(),
+            server_default="FALSE",
+            nullable=False,
+        ),
+        sa.Column("id", sa.BigInteger(), nullable=False),
+        *timestamp_columns(),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_users_is_active"), "users", ["is_active"], unique=False
+    )
+
+    op.create_table(
+        "admins",
+        sa.Column("username", sa.String(length=50), nullable=False),
+        sa.Column("password", sa.String(), nullable=False),
+        sa.Column("id", sa.Integer(), nullable=False),
+        *timestamp_columns(),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("username"),
+    )
+    op.create_index(
+        op.f("ix_admins_is_active"), "admins", ["is_active"], unique=False
+    )
+
+    op.create_table(
+        "items",
+        sa.Column("title", sa.String(length=128), nullable=False),
+        sa.Column(
+            "item_type",
+            sa.Enum("option_1", "option_2", name="itemtype"),
+            nullable=False,
+        ),
+        sa.Column("user_id", sa.BigInteger(), nullable=False),
+        sa.Column("id", sa.Integer(), nullable=False),
+        *timestamp_columns(),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_items_is_active"), "items", ["is_active"], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_items_is_active"), table_name="items")
+    op.drop_table("items")
+    sa.Enum(name="itemtype").drop(op.get_bind(), checkfirst=True)
+    op.drop_index(op.f("ix_admins_is_active"), table_name="admins")
+    op.drop_table("admins")
+    op.drop_index(op.f("ix_users_is_active"), table_name="users")
+    op.drop_table("users")
@@ -0,0 +1,69 @@
+"""add_media_groups
+
+Revision ID: 5a7c3e1d9b28
+Revises: 3f1c2a9b7d10
+Create Date: 2026-10-19 12:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5a7c3e1d9b28"
+down_revision: Union[str, None] = "3f1c2a9b7d10"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "media_groups",
+        sa.Column("chat_id", sa.BigInteger(), nullable=False),
+        sa.Column("media_group_id", sa.String(length=64), nullable=False),
+        sa.Column("message_id", sa.BigInteger(), nullable=False),
+        sa.Column("file_id", sa.String(length=256), nullable=False),
+        sa.Column("media_type", sa.String(length=16), nullable=False),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("TIMEZONE('utc', now())"),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("TIMEZONE('utc', now())"),
+            nullable=False,
+        ),
+        sa.Column(
+            "is_active",
+            sa.Boolean(),
+            server_default="TRUE",
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_media_groups_is_active"),
+        "media_groups",
+        ["is_active"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_media_groups_media_group_id"),
+        "media_groups",
+        ["media_group_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        op.f("ix_media_groups_media_group_id"), table_name="media_groups"
+    )
+    op.drop_index(op.f("ix_media_groups_is_active"), table_name="media_groups")
+    op.drop_table("media_groups")
@@ -0,0 +1,29 @@
+"""add_last_active_to_users
+
+Revision ID: 8a4e6d2c1b53
+Revises: 5a7c3e1d9b28
+Create Date: 2026-10-19 12:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8a4e6d2c1b53"
+down_revision: Union[str, None] = "5a7c3e1d9b28"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "users",
+        sa.Column("last_active", sa.DateTime(timezone=True), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("users", "last_active")
@@ -0,0 +1,71 @@
+"""add_sync_watermarks
+
+Revision ID: e7b3a1f90c26
+Revises: c52d9e7f4a18
+Create Date: 2026-10-19 12:30:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "e7b3a1f90c26"
+down_revision: Union[str, None] = "c52d9e7f4a18"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "sync_watermarks",
+        sa.Column("name", sa.String(length=64), nullable=False),
+        sa.Column(
+            "last_updated_at", sa.DateTime(timezone=True), nullable=False
+        ),
+        sa.Column("last_id", sa.BigInteger(), nullable=False),
+        sa.Column("fencing_token", sa.BigInteger(), nullable=True),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("TIMEZONE('utc', now())"),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("TIMEZONE('utc', now())"),
+            nullable=False,
+        ),
+        sa.Column(
+            "is_active",
+            sa.Boolean(),
+            server_default="TRUE",
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("name"),
+    )
+    op.create_index(
+        op.f("ix_sync_watermarks_is_active"),
+        "sync_watermarks",
+        ["is_active"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_items_updated_at_id",
+        "items",
+        ["updated_at", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_items_updated_at_id", table_name="items")
+    op.drop_index(
+        op.f("ix_sync_watermarks_is_active"), table_name="sync_watermarks"
+    )
+    op.drop_table("sync_watermarks")
@@ -0,0 +1,61 @@
+"""add_user_reminder_slots
+
+Revision ID: 4d8f2b6e9a71
+Revises: e7b3a1f90c26
+Create Date: 2026-10-19 12:40:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "4d8f2b6e9a71"
+down_revision: Union[str, None] = "e7b3a1f90c26"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "users",
+        sa.Column(
+            "timezone",
+            sa.String(length=64),
+            server_default="UTC",
+            nullable=False,
+        ),
+    )
+    op.add_column(
+        "users",
+        sa.Column(
+            "reminder_slot",
+            sa.Integer(),
+            sa.Computed("id % 1024", persisted=True),
+            nullable=False,
+        ),
+    )
+    op.add_column(
+        "users",
+        sa.Column(
+            "is_reminded",
+            sa.Boolean(),
+            server_default="FALSE",
+            nullable=False,
+        ),
+    )
+    op.create_index(
+        "ix_users_timezone_reminder_slot",
+        "users",
+        ["timezone", "reminder_slot"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_users_timezone_reminder_slot", table_name="users")
+    op.drop_column("users", "is_reminded")
+    op.drop_column("users", "reminder_slot")
+    op.drop_column("users", "timezone")
@@ -0,0 +1,59 @@
+"""add_media_files
+
+Revision ID: 9b2e5c7d3f14
+Revises: 4d8f2b6e9a71
+Create Date: 2026-10-19 12:50:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "9b2e5c7d3f14"
+down_revision: Union[str, None] = "4d8f2b6e9a71"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "media_files",
+        sa.Column("key", sa.String(length=256), nullable=False),
+        sa.Column("file_id", sa.String(length=256), nullable=False),
+        sa.Column("media_type", sa.String(length=16), nullable=False),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("TIMEZONE('utc', now())"),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("TIMEZONE('utc', now())"),
+            nullable=False,
+        ),
+        sa.Column(
+            "is_active",
+            sa.Boolean(),
+            server_default="TRUE",
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("key", "media_type"),
+    )
+    op.create_index(
+        op.f("ix_media_files_is_active"),
+        "media_files",
+        ["is_active"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_media_files_is_active"), table_name="media_files")
+    op.drop_table("media_files")
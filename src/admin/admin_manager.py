@@ -5,12 +5,12 @@ from starlette_admin import I18nConfig
 from starlette_admin.contrib.sqla import Admin, ModelView
 
 from admin.auth import UsernameAndPasswordProvider
-from admin.views import PKModelView
+from admin.views import JobRunView, PKModelView
 from config import AdminConfig
 from core import BaseModuleManager
 
 # from database.models import Admin as AdminModel
-from database.models import Item, User
+from database.models import Item, JobRun, User
 
 
 class AdminManager(BaseModuleManager):
@@ -35,7 +35,7 @@ class AdminManager(BaseModuleManager):
         - Настройка базовых параметров (название, URL).
         - Подключение аутентификации.
         - Настройка middleware.
-        - Регистрация моделей (User, Item).
+        - Регистрация моделей (User, Item, JobRun).
         """
 
         self.admin.title = self.admin_config.project_name
@@ -56,6 +56,7 @@ class AdminManager(BaseModuleManager):
     def setup_views(self):
         self.admin.add_view(PKModelView(User, label="Пользователи"))
         self.admin.add_view(ModelView(Item, label="Штуки"))
+        self.admin.add_view(JobRunView(JobRun, label="Запуски задач"))
 
     async def start(self):
         """Админка не требует запуска."""
@@ -1,5 +1,27 @@
+from starlette.requests import Request
 from starlette_admin.contrib.sqla import ModelView
 
 
 class PKModelView(ModelView):
     form_include_pk = True
+
+
+class ReadOnlyModelView(ModelView):
+    """
+    Представление только для просмотра: журналы и прочие записи,
+    которые ведёт само приложение.
+    """
+
+    def can_create(self, request: Request) -> bool:
+        return False
+
+    def can_edit(self, request: Request) -> bool:
+        return False
+
+    def can_delete(self, request: Request) -> bool:
+        return False
+
+
+class JobRunView(ReadOnlyModelView):
+    fields_default_sort = [("id", True)]
+    exclude_fields_from_list = ["updated_at", "is_active", "error"]
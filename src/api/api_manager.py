@@ -9,6 +9,7 @@ from api.routers import router
 from api_client import ApiClientManager
 from config import ApiConfig
 from core import BaseModuleManager
+from scheduled_jobs import SchedulerManager
 
 
 class ApiManager(BaseModuleManager):
@@ -19,6 +20,7 @@ class ApiManager(BaseModuleManager):
         api_client: ApiClientManager | None = None,
         bot: Bot | None = None,
         admin: Admin | None = None,
+        scheduler: SchedulerManager | None = None,
     ):
         """
         Конструктор ApiManager.
@@ -28,12 +30,14 @@ class ApiManager(BaseModuleManager):
         :param api_client: Клиент для работы с внешними API (опционально).
         :param bot: Экземпляр Telegram-бота (опционально).
         :param admin: Объект админки (опционально).
+        :param scheduler: Менеджер планировщика задач (опционально).
         """
         self.api_config = api_config
         self.async_session = async_session
         self.api_client = api_client
         self.bot = bot
         self.admin = admin
+        self.scheduler = scheduler
 
         self.app = FastAPI(
             title=self.api_config.project_name,
@@ -50,6 +54,7 @@ class ApiManager(BaseModuleManager):
             "async_session": self.async_session,
             "api_client": self.api_client,
             "bot": self.bot,
+            "scheduler": self.scheduler,
         }
 
     async def configure(self):
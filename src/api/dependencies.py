@@ -5,6 +5,7 @@ from fastapi import Request
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from api_client import ApiClientManager
+from scheduled_jobs import SchedulerManager
 
 
 async def get_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
@@ -37,3 +38,13 @@ async def get_bot(request: Request) -> Bot:
     if not bot:
         raise ValueError("Telegram bot is not configured.")
     return bot
+
+
+async def get_scheduler(request: Request) -> SchedulerManager:
+    """
+    Зависимость для получения менеджера планировщика задач.
+    """
+    scheduler = request.state.scheduler
+    if not scheduler:
+        raise ValueError("Scheduler is not configured.")
+    return scheduler
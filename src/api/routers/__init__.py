@@ -1,8 +1,12 @@
 from fastapi import APIRouter
 
+from api.routers.job_router import router as job_router
+from api.routers.metrics_router import router as metrics_router
 from api.routers.user_count_router import router as user_count_router
 from api.routers.user_router import router as user_router
 
 router = APIRouter(prefix="/api")
 router.include_router(user_router)
 router.include_router(user_count_router)
+router.include_router(job_router)
+router.include_router(metrics_router)
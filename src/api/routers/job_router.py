@@ -0,0 +1,37 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from schemas import JobRunSchema, JobStatsSchema
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.dependencies import get_scheduler, get_session
+from scheduled_jobs import SchedulerManager
+from services import job_run_service
+from utils import ServiceError
+
+router = APIRouter(prefix="/jobs", tags=["Jobs"])
+
+
+@router.get("/runs", response_model=list[JobRunSchema])
+async def get_job_runs(
+    job_id: str | None = None,
+    limit: int = Query(50, ge=1, le=1000),
+    session: AsyncSession = Depends(get_session),
+):
+    """
+    Эндпойнт для истории запусков задач планировщика,
+    от новых к старым.
+    """
+    try:
+        return await job_run_service.list_recent(
+            session=session, job_id=job_id, limit=limit
+        )
+    except ServiceError:
+        raise HTTPException(status_code=500, detail="Failed to load job runs")
+
+
+@router.get("/stats", response_model=dict[str, JobStatsSchema])
+async def get_job_stats(scheduler: SchedulerManager = Depends(get_scheduler)):
+    """
+    Эндпойнт для метрик задач планировщика в этом процессе:
+    длительность запусков, пропуски из-за наложения, текущий интервал.
+    """
+    return scheduler.get_stats()
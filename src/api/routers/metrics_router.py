@@ -0,0 +1,18 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from core import metrics
+
+router = APIRouter(tags=["Metrics"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """
+    Эндпойнт для метрик процесса в текстовом формате Prometheus:
+    время обработки апдейтов и хэндлеров, запросы к базе, внешним API
+    и Telegram.
+    """
+    return PlainTextResponse(
+        metrics.render(), media_type="text/plain; version=0.0.4"
+    )
@@ -1,4 +1,16 @@
 # flake8: noqa
 
 from api_client.api_client_manager import ApiClientManager
-from api_client.client_errors import NotFoundError
+from api_client.bulk import BulkUploadResult, FailedChunk, GetManyResult
+from api_client.client_errors import (
+    BulkUploadError,
+    CircuitOpenError,
+    NotFoundError,
+)
+from api_client.pagination import (
+    CursorPagination,
+    LinkHeaderPagination,
+    OffsetPagination,
+    Pagination,
+)
+from api_client.resilience import CircuitBreaker, RetryPolicy
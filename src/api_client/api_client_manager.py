@@ -1,12 +1,28 @@
 from aiohttp import ClientSession
+from redis.asyncio import ConnectionPool, Redis
+from yarl import URL
 
 from api_client.clients import SomeClient, SomeOtherClient
-from config import ApiClientConfig
+from api_client.connection_pool import create_session
+from api_client.resilience import CircuitBreaker, RetryPolicy
+from api_client.response_cache import ResponseCache
+from config import ApiClientConfig, RedisConfig
 from core import BaseModuleManager
 
 
 class ApiClientManager(BaseModuleManager):
-    def __init__(self, api_client_config: ApiClientConfig):
+    def __init__(
+        self,
+        api_client_config: ApiClientConfig,
+        redis_config: RedisConfig | None = None,
+    ):
+        """
+        :param api_client_config: Настройки клиентов внешних API.
+        :param redis_config: Настройки Redis для общего кэша ответов
+         (опционально).
+        """
+        self.config = api_client_config
+        self.redis_config = redis_config
         self.some_base_url = api_client_config.some_api_url
         self.some_other_base_url = api_client_config.some_other_api_url
 
@@ -14,18 +30,97 @@ class ApiClientManager(BaseModuleManager):
         self.some_other_client: SomeOtherClient | None = None
 
         self.session: ClientSession | None = None
+        # Отдельные сессии сервисов (при session_per_upstream)
+        self.sessions: dict[str, ClientSession] = {}
+        self.retry_policy = RetryPolicy(
+            attempts=api_client_config.retry_attempts,
+            backoff=api_client_config.retry_backoff,
+            backoff_max=api_client_config.retry_backoff_max,
+        )
+        # Автомат защиты на каждый сервис (base URL), общий для всех
+        # его клиентов
+        self.circuit_breakers: dict[str, CircuitBreaker] = {}
+        self.response_cache: ResponseCache | None = None
+        self.redis: Redis | None = None
 
     async def configure(self):
         """
-        Создаёт общую сессию и инициализирует клиенты.
+        Создаёт общую сессию (или сессии сервисов) и инициализирует
+        клиенты.
         """
-        self.session = ClientSession()
+        if not self.config.session_per_upstream:
+            self.session = create_session(self.config, upstream="shared")
+        if self.config.response_cache:
+            self.response_cache = self._create_response_cache()
 
-        self.some_client = SomeClient(self.some_base_url, self.session)
+        self.some_client = SomeClient(
+            self.some_base_url,
+            self._session(self.some_base_url),
+            **self._client_options(self.some_base_url),
+        )
         self.payment_client = SomeOtherClient(
-            self.some_other_base_url, self.session
+            self.some_other_base_url,
+            self._session(self.some_other_base_url),
+            **self._client_options(self.some_other_base_url),
         )
 
+    def _session(self, base_url: str) -> ClientSession:
+        """
+        Сессия для клиентов сервиса: общая или своя у каждого сервиса.
+        """
+        if self.session:
+            return self.session
+        if base_url not in self.sessions:
+            self.sessions[base_url] = create_session(
+                self.config, upstream=URL(base_url).host or base_url
+            )
+        return self.sessions[base_url]
+
+    def _create_response_cache(self) -> ResponseCache:
+        if self.config.cache_redis and self.redis_config:
+            self.redis = Redis(
+                connection_pool=ConnectionPool(
+                    host=self.redis_config.redis_host,
+                    port=self.redis_config.redis_port,
+                    db=self.redis_config.redis_db,
+                    max_connections=self.redis_config.max_connections,
+                    socket_timeout=self.redis_config.socket_timeout,
+                    socket_connect_timeout=(
+                        self.redis_config.socket_connect_timeout
+                    ),
+                    health_check_interval=(
+                        self.redis_config.health_check_interval
+                    ),
+                )
+            )
+        return ResponseCache(
+            max_entries=self.config.cache_max_entries,
+            redis=self.redis,
+            default_ttl=self.config.cache_ttl,
+            stale_ttl=self.config.cache_stale_ttl,
+        )
+
+    def _client_options(self, base_url: str) -> dict:
+        """
+        Политика повторов, автомат защиты, кэш ответов и объединение
+        запросов для клиентов сервиса.
+        """
+        if base_url not in self.circuit_breakers:
+            self.circuit_breakers[base_url] = CircuitBreaker(
+                base_url,
+                failure_threshold=self.config.breaker_failure_threshold,
+                recovery_timeout=self.config.breaker_recovery_timeout,
+            )
+        return {
+            "retry_policy": self.retry_policy,
+            "circuit_breaker": self.circuit_breakers[base_url],
+            "response_cache": self.response_cache,
+            "coalesce_requests": self.config.coalesce_requests,
+            "bulk_chunk_size": self.config.bulk_chunk_size,
+            "bulk_concurrency": self.config.bulk_concurrency,
+            "get_many_concurrency": self.config.get_many_concurrency,
+        }
+
     async def start(self):
         """
         Клиенты не требуют явного запуска.
@@ -34,7 +129,11 @@ class ApiClientManager(BaseModuleManager):
 
     async def shutdown(self):
         """
-        Закрывает сессию.
+        Закрывает сессии.
         """
         if self.session:
             await self.session.close()
+        for session in self.sessions.values():
+            await session.close()
+        if self.redis:
+            await self.redis.aclose(close_connection_pool=True)
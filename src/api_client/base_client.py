@@ -1,36 +1,446 @@
+import asyncio
+import functools
 import logging
-from typing import List, Union
+import time
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Iterable,
+    Mapping,
+    NamedTuple,
+    Union,
+)
 
 from aiohttp import (
     ClientConnectionError,
-    ClientOSError,
     ClientPayloadError,
     ClientResponseError,
     ClientSession,
 )
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
+from pydantic_core import from_json, to_json
 
+from api_client.bulk import (
+    BulkUploadResult,
+    FailedChunk,
+    GetManyResult,
+    JsonArrayBody,
+    chunked,
+)
 from api_client.client_errors import NotFoundError
+from api_client.pagination import Pagination, SinglePage
+from api_client.resilience import (
+    CircuitBreaker,
+    RetryPolicy,
+    parse_retry_after,
+)
+from api_client.response_cache import CachedResponse, ResponseCache, cache_key
+from core import add_timing, metrics
+
+request_duration = metrics.histogram(
+    "api_client_request_duration_seconds",
+    "Duration of requests to external APIs",
+    ("client", "method", "status"),
+)
+coalesced_requests = metrics.counter(
+    "api_client_coalesced_requests_total",
+    "Requests served by an identical request already in flight",
+    ("client",),
+)
+
+# Безопасные методы: их одинаковые запросы можно объединять
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+class ApiResponse(NamedTuple):
+    status: int
+    headers: Mapping[str, str]
+    # Тело ответа как есть; декодирует его вызывающий
+    body: bytes
+
+
+@functools.lru_cache(maxsize=None)
+def _type_adapter(response_model: Any) -> TypeAdapter:
+    return TypeAdapter(response_model)
+
+
+def decode_body(
+    body: bytes | str, response_model: Any = None, raw: bool = False
+):
+    """
+    Декодирует тело ответа парсером pydantic-core (на Rust): с
+    response_model — сразу в модель, без промежуточных словарей.
+
+    :param body: Тело ответа.
+    :param response_model: Тип результата: модель, list[модель] и т.д.
+     Без него возвращаются словари и списки.
+    :param raw: Вернуть тело без декодирования (bytes).
+    :return: Декодированное тело или None, если тело пустое.
+    """
+    if raw:
+        return body.encode() if isinstance(body, str) else body
+    if not body:
+        return None
+    if response_model is None:
+        return from_json(body)
+    return _type_adapter(response_model).validate_json(body)
+
+
+def json_body(data: BaseModel | Any) -> dict:
+    """
+    Сериализует тело запроса в JSON через pydantic-core.
+
+    :param data: Модель или JSON-совместимые данные.
+    :return: Аргументы запроса aiohttp (data и Content-Type).
+    """
+    if isinstance(data, BaseModel):
+        content = data.model_dump_json()
+    else:
+        content = to_json(data)
+    return {"data": content, "headers": {"Content-Type": "application/json"}}
 
 
 class BaseClient:
-    def __init__(self, base_url: str, session: ClientSession, endpoint: str):
+    # Собственная политика повторов клиента; если не задана,
+    # используется переданная в конструктор
+    retry_policy: RetryPolicy | None = None
+    # Время жизни закэшированных GET-ответов клиента в секундах;
+    # если задано, важнее Cache-Control сервиса
+    cache_ttl: float | None = None
+    # Объединять одинаковые одновременные GET-запросы клиента;
+    # если не задано, используется значение из конструктора
+    coalesce_requests: bool | None = None
+    # Модель ресурса: get_by_id возвращает её, list — список моделей;
+    # если не задана, возвращаются словари
+    model: type[BaseModel] | None = None
+    # Как читать ресурс постранично (iter_pages, iter_items);
+    # по умолчанию весь список приходит одним ответом
+    pagination: Pagination = SinglePage()
+    # Путь пакетного чтения относительно endpoint (например, "/batch"):
+    # GET ?ids=1,2,3 возвращает список записей. Если не задан,
+    # get_many запрашивает записи по одной
+    batch_endpoint: str | None = None
+    batch_param: str = "ids"
+    batch_size: int = 100
+    # Поле записи с её идентификатором
+    id_field: str = "id"
+
+    def __init__(
+        self,
+        base_url: str,
+        session: ClientSession,
+        endpoint: str,
+        retry_policy: RetryPolicy | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+        response_cache: ResponseCache | None = None,
+        coalesce_requests: bool = False,
+        bulk_chunk_size: int = 500,
+        bulk_concurrency: int = 4,
+        get_many_concurrency: int = 10,
+    ):
+        """
+        :param base_url: Базовый URL сервиса.
+        :param session: Общая сессия aiohttp (в ней заданы таймауты).
+        :param endpoint: Путь ресурса.
+        :param retry_policy: Политика повторов для клиентов без
+         собственной политики.
+        :param circuit_breaker: Автомат защиты сервиса (общий для всех
+         клиентов одного base URL).
+        :param response_cache: Кэш ответов на GET-запросы
+         (get_by_id, list); без него запросы всегда идут в сервис.
+        :param coalesce_requests: Объединять одинаковые одновременные
+         запросы безопасными методами (для клиентов без собственной
+         настройки).
+        :param bulk_chunk_size: Сколько записей отправлять в одном
+         запросе bulk_create.
+        :param bulk_concurrency: Сколько частей bulk_create отправлять
+         одновременно.
+        :param get_many_concurrency: Сколько запросов get_many
+         выполнять одновременно.
+        """
         self.base_url = base_url
         self.session = session
         self.endpoint = endpoint
+        self.retry_policy = (
+            type(self).retry_policy or retry_policy or RetryPolicy()
+        )
+        self.circuit_breaker = circuit_breaker
+        self.response_cache = response_cache
+        self.resource = f"{base_url}{endpoint}"
+        self._revalidating: dict[str, asyncio.Task] = {}
+        if type(self).coalesce_requests is not None:
+            coalesce_requests = type(self).coalesce_requests
+        self.coalesce_requests = coalesce_requests
+        self._in_flight: dict[tuple, asyncio.Task] = {}
+        self.bulk_chunk_size = bulk_chunk_size
+        self.bulk_concurrency = bulk_concurrency
+        self._get_many_semaphore = asyncio.Semaphore(get_many_concurrency)
+
+    async def request(
+        self,
+        method: str,
+        endpoint: str,
+        response_model: Any = None,
+        raw: bool = False,
+        **kwargs,
+    ):
+        """
+        Отправляет запрос, повторяя идемпотентные запросы после сбоев
+        сервиса (5xx, 429, ошибки соединения, таймауты) с
+        экспоненциальной задержкой или по Retry-After.
+
+        :param response_model: Тип, в который декодировать ответ.
+        :param raw: Вернуть тело ответа без декодирования (bytes),
+         например чтобы переслать его дальше как есть.
+        :raises CircuitOpenError: Сервис недоступен, запрос не отправлен.
+        :raises pydantic.ValidationError: Ответ не соответствует
+         response_model.
+        """
+        response = await self._request(
+            method, f"{self.base_url}{endpoint}", **kwargs
+        )
+        return decode_body(response.body, response_model, raw)
+
+    async def get_cached(
+        self,
+        endpoint: str,
+        params: Mapping | None = None,
+        ttl: float | None = None,
+        response_model: Any = None,
+        raw: bool = False,
+    ):
+        """
+        GET-запрос через кэш ответов.
+
+        Свежий ответ отдаётся из кэша. Устаревший, но ещё допустимый
+        (stale-while-revalidate) — тоже из кэша, а обновляется в фоне.
+        Иначе запрос идёт в сервис, с If-None-Match, если у ответа
+        есть ETag: на 304 сервис не передаёт тело заново.
+
+        :param endpoint: Путь запроса.
+        :param params: Параметры запроса.
+        :param ttl: Время жизни ответа (по умолчанию cache_ttl клиента
+         или Cache-Control сервиса).
+        :param response_model: Тип, в который декодировать ответ.
+        :param raw: Вернуть тело ответа без декодирования (bytes).
+        :return: Тело ответа.
+        """
+        if self.response_cache is None:
+            return await self.request(
+                "GET",
+                endpoint,
+                response_model=response_model,
+                raw=raw,
+                params=params,
+            )
 
-    async def request(self, method: str, endpoint: str, **kwargs):
         url = f"{self.base_url}{endpoint}"
+        key = cache_key(url, params)
+        ttl = self.cache_ttl if ttl is None else ttl
+        entry = await self.response_cache.get(key)
+        now = time.time()
+        if entry and now < entry.fresh_until:
+            return decode_body(entry.body, response_model, raw)
+        if entry and now < entry.stale_until:
+            if key not in self._revalidating:
+                task = asyncio.create_task(
+                    self._revalidate(url, key, params, entry, ttl)
+                )
+                self._revalidating[key] = task
+                task.add_done_callback(
+                    lambda _: self._revalidating.pop(key, None)
+                )
+            return decode_body(entry.body, response_model, raw)
+        body = await self._fetch(url, key, params, entry, ttl)
+        return decode_body(body, response_model, raw)
+
+    async def _fetch(
+        self,
+        url: str,
+        key: str,
+        params: Mapping | None,
+        entry: CachedResponse | None,
+        ttl: float | None,
+    ) -> str:
+        """
+        Запрашивает ответ и сохраняет его в кэш.
+
+        :return: Тело ответа (JSON-текст).
+        """
+        headers = {"If-None-Match": entry.etag} if entry and entry.etag else {}
+        response = await self._request(
+            "GET", url, params=params, headers=headers
+        )
+        if response.status == 304 and entry:
+            body, etag = entry.body, entry.etag
+        else:
+            body = response.body.decode()
+            etag = response.headers.get("ETag")
+        await self.response_cache.store(
+            key,
+            self.resource,
+            body,
+            etag=etag,
+            cache_control=response.headers.get("Cache-Control"),
+            ttl=ttl,
+        )
+        return body
+
+    async def _revalidate(self, url, key, params, entry, ttl):
+        try:
+            await self._fetch(url, key, params, entry, ttl)
+        except Exception as e:
+            logging.warning(f"Failed to revalidate cached {key}: {e!r}")
+
+    async def invalidate_cache(self):
+        """
+        Сбрасывает закэшированные ответы ресурса клиента.
+        """
+        if self.response_cache is not None:
+            await self.response_cache.invalidate(self.resource)
+
+    async def _request(self, method: str, url: str, **kwargs) -> ApiResponse:
+        """
+        Отправляет запрос. Одинаковые одновременные запросы безопасными
+        методами (тот же метод, URL, параметры и заголовки) объединяются:
+        в сервис уходит один запрос, и все вызовы получают его результат
+        или ошибку. Тело ответа у них общее, менять его нельзя.
+        """
+        key = self._in_flight_key(method, url, kwargs)
+        if key is None:
+            return await self._request_with_retries(method, url, **kwargs)
+
+        task = self._in_flight.get(key)
+        if task is None:
+            # Отдельная задача: отмена первого вызова не должна
+            # отменять запрос для остальных
+            task = asyncio.create_task(
+                self._request_with_retries(method, url, **kwargs)
+            )
+            self._in_flight[key] = task
+            task.add_done_callback(lambda t: self._finish_in_flight(key, t))
+        else:
+            coalesced_requests.inc(client=type(self).__name__)
+        return await asyncio.shield(task)
+
+    def _in_flight_key(
+        self, method: str, url: str, kwargs: dict
+    ) -> tuple | None:
+        if not self.coalesce_requests or method.upper() not in SAFE_METHODS:
+            return None
+        if set(kwargs) - {"params", "headers"}:
+            return None
+        headers = tuple(sorted((kwargs.get("headers") or {}).items()))
+        return method.upper(), cache_key(url, kwargs.get("params")), headers
+
+    def _finish_in_flight(self, key: tuple, task: asyncio.Task):
+        self._in_flight.pop(key, None)
+        # Ошибку получают ожидающие вызовы; если их не осталось,
+        # забираем её здесь, чтобы asyncio не ругался в лог
+        if not task.cancelled():
+            task.exception()
+
+    async def _request_with_retries(
+        self, method: str, url: str, attempts: int | None = None, **kwargs
+    ) -> ApiResponse:
+        """
+        :param attempts: Сколько попыток разрешено (по умолчанию — по
+         политике повторов для метода).
+        """
+        if attempts is None:
+            attempts = self.retry_policy.attempts_for(method)
+        for attempt in range(1, attempts + 1):
+            if self.circuit_breaker:
+                self.circuit_breaker.before_request()
+            try:
+                result = await self._send(method, url, **kwargs)
+            except (
+                ClientResponseError,
+                ClientConnectionError,
+                TimeoutError,
+            ) as e:
+                retryable = self._is_upstream_failure(e)
+                if self.circuit_breaker:
+                    if retryable:
+                        self.circuit_breaker.record_failure()
+                    else:
+                        self.circuit_breaker.record_success()
+                if not retryable or attempt == attempts:
+                    self._raise_error(e, url)
+                retry_after, reason = None, type(e).__name__
+                if isinstance(e, ClientResponseError):
+                    reason = f"HTTP {e.status}"
+                    if e.headers:
+                        retry_after = parse_retry_after(
+                            e.headers.get("Retry-After")
+                        )
+                delay = self.retry_policy.delay(attempt, retry_after)
+                logging.warning(
+                    f"{method} {url} failed ({reason}), "
+                    f"retry {attempt}/{attempts - 1} in {delay:.1f}s"
+                )
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                if self.circuit_breaker:
+                    self.circuit_breaker.release()
+                raise
+            except ClientPayloadError as e:
+                if self.circuit_breaker:
+                    self.circuit_breaker.record_failure()
+                logging.error(
+                    "Payload error while processing response "
+                    f"from {url}: {e}"
+                )
+                raise
+            except Exception:
+                if self.circuit_breaker:
+                    self.circuit_breaker.record_failure()
+                logging.exception("Unexpected error occurred during request")
+                raise
+            else:
+                if self.circuit_breaker:
+                    self.circuit_breaker.record_success()
+                return result
+
+    async def _send(self, method: str, url: str, **kwargs) -> ApiResponse:
+        """
+        Одна попытка запроса.
+        """
+        status = "error"
+        start = time.perf_counter()
         try:
             async with self.session.request(method, url, **kwargs) as response:
+                status = response.status
                 response.raise_for_status()
 
-                if response.status == 204:
-                    return None
+                if response.status in (204, 304):
+                    return ApiResponse(response.status, response.headers, b"")
+
+                return ApiResponse(
+                    response.status, response.headers, await response.read()
+                )
+        finally:
+            elapsed = time.perf_counter() - start
+            request_duration.observe(
+                elapsed,
+                client=type(self).__name__,
+                method=method,
+                status=status,
+            )
+            add_timing("api", elapsed)
 
-                return await response.json()
+    def _is_upstream_failure(self, e: Exception) -> bool:
+        """
+        Сбой на стороне сервиса: запрос можно повторить, а автомат
+        защиты засчитывает его как отказ.
+        """
+        if isinstance(e, ClientResponseError):
+            return e.status in self.retry_policy.retry_statuses
+        return True
 
-        except ClientResponseError as e:
+    def _raise_error(self, e: Exception, url: str):
+        if isinstance(e, ClientResponseError):
             if e.status == 404:
                 logging.warning(f"Resource not found at {e.request_info.url}")
                 raise NotFoundError(
@@ -49,54 +459,321 @@ class BaseClient:
             else:
                 logging.error(
                     f"HTTP Error {e.status} at "
-                    "{e.request_info.url}: {e.message}"
+                    f"{e.request_info.url}: {e.message}"
                 )
                 raise e
+        elif isinstance(e, TimeoutError):
+            logging.error(f"Request to {url} timed out")
+            raise e
+        else:
+            logging.error(f"Failed to connect to server at {url}: {e}")
+            raise e
+
+    async def close(self):
+        await self.session.close()
 
-        except ClientConnectionError:
-            logging.error(f"Failed to connect to server at {url}")
-            raise
+    async def get_by_id(
+        self, item_id: int, response_model: Any = None, raw: bool = False
+    ):
+        response = await self.get_cached(
+            f"{self.endpoint}/{item_id}",
+            response_model=response_model or self.model,
+            raw=raw,
+        )
+        return response
 
-        except ClientOSError as e:
-            logging.error(f"OS error occurred while accessing {url}: {e}")
-            raise
+    async def list(
+        self, response_model: Any = None, raw: bool = False, **params
+    ):
+        if response_model is None and self.model is not None:
+            response_model = list[self.model]
+        return await self.get_cached(
+            self.endpoint,
+            params=params,
+            response_model=response_model,
+            raw=raw,
+        )
 
-        except ClientPayloadError as e:
-            logging.error(
-                f"Payload error while processing response from {url}: {e}"
+    async def get_many(
+        self,
+        ids: Iterable[Any],
+        response_model: Any = None,
+        use_cache: bool = True,
+    ) -> GetManyResult:
+        """
+        Получает несколько записей. Если у клиента задан batch_endpoint,
+        записи запрашиваются пачками по batch_size, иначе — по одной.
+        Запросы идут параллельно, но одновременно их не больше
+        get_many_concurrency на клиент.
+
+        Ошибка одной записи (или пачки) не прерывает остальные: она
+        попадает в errors результата.
+
+        :param ids: Идентификаторы записей; повторы запрашиваются один
+         раз.
+        :param response_model: Тип записи (по умолчанию model клиента).
+        :param use_cache: Запрашивать через кэш ответов.
+        :return: Найденные записи и ошибки по идентификаторам.
+        """
+        ids = list(dict.fromkeys(ids))
+        response_model = response_model or self.model
+        result = GetManyResult()
+        if self.batch_endpoint is None:
+            await asyncio.gather(
+                *(
+                    self._get_one(item_id, response_model, use_cache, result)
+                    for item_id in ids
+                )
             )
-            raise
+        else:
+            batches = [batch async for batch in chunked(ids, self.batch_size)]
+            await asyncio.gather(
+                *(
+                    self._get_batch(batch, response_model, use_cache, result)
+                    for batch in batches
+                )
+            )
+        return result
 
-        except Exception:
-            logging.exception("Unexpected error occurred during request")
-            raise
+    async def _get_one(
+        self,
+        item_id: Any,
+        response_model: Any,
+        use_cache: bool,
+        result: GetManyResult,
+    ):
+        endpoint = f"{self.endpoint}/{item_id}"
+        async with self._get_many_semaphore:
+            try:
+                if use_cache:
+                    record = await self.get_cached(
+                        endpoint, response_model=response_model
+                    )
+                else:
+                    record = await self.request(
+                        "GET", endpoint, response_model=response_model
+                    )
+            except Exception as e:
+                result.errors[item_id] = e
+            else:
+                result.found[item_id] = record
 
-    async def close(self):
-        await self.session.close()
+    async def _get_batch(
+        self,
+        ids: list,
+        response_model: Any,
+        use_cache: bool,
+        result: GetManyResult,
+    ):
+        endpoint = f"{self.endpoint}{self.batch_endpoint}"
+        params = {self.batch_param: ",".join(map(str, ids))}
+        async with self._get_many_semaphore:
+            try:
+                if use_cache:
+                    body = await self.get_cached(endpoint, params=params)
+                else:
+                    body = await self.request("GET", endpoint, params=params)
+            except Exception as e:
+                for item_id in ids:
+                    result.errors[item_id] = e
+                return
 
-    async def get_by_id(self, item_id: int):
-        response = await self.request("GET", f"{self.endpoint}/{item_id}")
-        return response
+        # Идентификаторы в ответе могут прийти другим типом (строкой)
+        records = {str(record[self.id_field]): record for record in body}
+        for item_id in ids:
+            record = records.get(str(item_id))
+            if record is None:
+                result.errors[item_id] = NotFoundError(
+                    f"Resource {item_id} not found at {self.resource}"
+                )
+                continue
+            try:
+                if response_model is not None:
+                    record = _type_adapter(response_model).validate_python(
+                        record
+                    )
+            except ValueError as e:
+                result.errors[item_id] = e
+            else:
+                result.found[item_id] = record
 
-    async def list(self, **params):
-        return await self.request("GET", self.endpoint, params=params)
+    async def iter_pages(
+        self, response_model: Any = None, prefetch: bool = True, **params
+    ) -> AsyncIterator[list]:
+        """
+        Читает ресурс постранично по стратегии pagination клиента.
 
-    async def create(self, data: BaseModel):
-        return await self.request(
-            "POST", self.endpoint, json=data.model_dump()
+        С prefetch следующая страница запрашивается, пока вызывающий
+        обрабатывает текущую: в памяти не больше двух страниц, а
+        ожидание сервиса перекрывается обработкой. Страницы не
+        кэшируются. Если цикл прерывается раньше, запрос следующей
+        страницы отменяется при закрытии генератора (например, через
+        contextlib.aclosing).
+
+        :param response_model: Тип записи (по умолчанию model
+         клиента); без него записи — словари.
+        :param prefetch: Запрашивать следующую страницу заранее.
+        :param params: Параметры запроса (фильтры, размер страницы).
+        :yield: Записи очередной страницы.
+        """
+        response_model = response_model or self.model
+        pagination = self.pagination
+        url = f"{self.base_url}{self.endpoint}"
+        next_page = self._fetch_page(
+            pagination, url, pagination.first_params(params), response_model
         )
+        try:
+            while next_page is not None:
+                items, next_request = await next_page
+                next_page = None
+                if next_request is not None:
+                    next_page = self._fetch_page(
+                        pagination, *next_request, response_model
+                    )
+                    if prefetch:
+                        next_page = asyncio.create_task(next_page)
+                yield items
+        finally:
+            if isinstance(next_page, asyncio.Task):
+                next_page.cancel()
+                # Ошибка заранее запрошенной страницы уже никому не нужна
+                next_page.add_done_callback(
+                    lambda t: t.cancelled() or t.exception()
+                )
+            elif next_page is not None:
+                next_page.close()
+
+    async def iter_items(
+        self, response_model: Any = None, prefetch: bool = True, **params
+    ) -> AsyncIterator[Any]:
+        """
+        То же, что iter_pages, но по одной записи.
+
+        :yield: Очередная запись.
+        """
+        pages = self.iter_pages(response_model, prefetch, **params)
+        try:
+            async for page in pages:
+                for item in page:
+                    yield item
+        finally:
+            await pages.aclose()
 
-    async def update(self, item_id: int, data: Union[BaseModel, dict]):
-        json_data = data.model_dump() if isinstance(data, BaseModel) else data
-        return await self.request(
-            "PUT", f"{self.endpoint}/{item_id}", json=json_data
+    async def _fetch_page(
+        self,
+        pagination: Pagination,
+        url: str,
+        params: dict,
+        response_model: Any,
+    ) -> tuple[list, tuple[str, dict] | None]:
+        """
+        :return: Записи страницы и запрос следующей страницы.
+        """
+        response = await self._request("GET", url, params=params or None)
+        body = decode_body(response.body)
+        items = pagination.items(body)
+        next_request = pagination.next_request(
+            url, params, response.headers, body, items
         )
+        if response_model is not None:
+            items = _type_adapter(list[response_model]).validate_python(items)
+        return items, next_request
 
-    async def delete(self, item_id: int):
-        return await self.request("DELETE", f"{self.endpoint}/{item_id}")
+    async def create(self, data: BaseModel, response_model: Any = None):
+        response = await self.request(
+            "POST",
+            self.endpoint,
+            response_model=response_model,
+            **json_body(data),
+        )
+        await self.invalidate_cache()
+        return response
 
-    async def bulk_create(self, items_data: List[BaseModel]):
-        data = [item.model_dump(mode="json") for item in items_data]
-        return await self.request(
-            "POST", f"{self.endpoint}/bulk_create", json=data
+    async def update(
+        self,
+        item_id: int,
+        data: Union[BaseModel, dict],
+        response_model: Any = None,
+    ):
+        response = await self.request(
+            "PUT",
+            f"{self.endpoint}/{item_id}",
+            response_model=response_model,
+            **json_body(data),
         )
+        await self.invalidate_cache()
+        return response
+
+    async def delete(self, item_id: int):
+        response = await self.request("DELETE", f"{self.endpoint}/{item_id}")
+        await self.invalidate_cache()
+        return response
+
+    async def bulk_create(
+        self,
+        items_data: Iterable[BaseModel] | AsyncIterable[BaseModel],
+        chunk_size: int | None = None,
+        concurrency: int | None = None,
+    ) -> BulkUploadResult:
+        """
+        Отправляет записи частями по chunk_size, до concurrency частей
+        одновременно. Источник читается по мере отправки, так что
+        загрузка начинается, пока записи ещё читаются из базы, а тело
+        каждого запроса сериализуется потоком.
+
+        Сервис должен принимать запись повторно (upsert): упавшая часть
+        повторяется по политике повторов клиента. Части отправляются
+        не по порядку.
+
+        :param items_data: Записи: список, генератор или асинхронный
+         итератор.
+        :param chunk_size: Размер части (по умолчанию из настроек).
+        :param concurrency: Сколько частей отправлять одновременно
+         (по умолчанию из настроек).
+        :return: Итог загрузки; не отправленные части с ошибками —
+         в failed (raise_for_failures превращает их в исключение).
+        """
+        chunk_size = chunk_size or self.bulk_chunk_size
+        concurrency = concurrency or self.bulk_concurrency
+        url = f"{self.base_url}{self.endpoint}/bulk_create"
+        result = BulkUploadResult()
+        # Очередь ограничена: источник не читается дальше, чем успевают
+        # отправлять
+        queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency)
+
+        async def upload():
+            while True:
+                index, chunk = await queue.get()
+                try:
+                    await self._request_with_retries(
+                        "POST",
+                        url,
+                        attempts=self.retry_policy.attempts,
+                        data=JsonArrayBody(chunk),
+                        headers={"Content-Type": "application/json"},
+                    )
+                    result.sent += len(chunk)
+                except Exception as e:
+                    result.failed.append(FailedChunk(index, chunk, e))
+                finally:
+                    queue.task_done()
+
+        workers = [asyncio.create_task(upload()) for _ in range(concurrency)]
+        try:
+            async for chunk in chunked(items_data, chunk_size):
+                await queue.put((result.chunks, chunk))
+                result.chunks += 1
+            await queue.join()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+        if result.sent:
+            await self.invalidate_cache()
+        if result.failed:
+            logging.error(
+                f"Bulk upload to {url}: {len(result.failed)} of "
+                f"{result.chunks} chunks failed"
+            )
+        return result
@@ -0,0 +1,120 @@
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterable, AsyncIterator, Iterable
+
+from pydantic import BaseModel
+
+from api_client.client_errors import BulkUploadError
+
+
+class JsonArrayBody:
+    """
+    Тело запроса — JSON-массив, который сериализуется по одной записи
+    во время отправки, а не собирается в память целиком.
+
+    Каждый проход (__aiter__) начинается заново, поэтому то же тело
+    можно отправить повторно при повторе запроса.
+    """
+
+    def __init__(self, items: list[BaseModel]):
+        self.items = items
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        yield b"["
+        for index, item in enumerate(self.items):
+            if index:
+                yield b","
+            yield item.model_dump_json().encode()
+        yield b"]"
+
+
+async def chunked(
+    items: Iterable[Any] | AsyncIterable[Any], size: int
+) -> AsyncIterator[list[Any]]:
+    """
+    Нарезает обычный или асинхронный итератор на списки по size
+    элементов, не читая источник дальше текущего списка.
+
+    :param items: Источник записей.
+    :param size: Размер списка.
+    :yield: Очередной список записей.
+    """
+    chunk = []
+    if isinstance(items, AsyncIterable):
+        async for item in items:
+            chunk.append(item)
+            if len(chunk) >= size:
+                yield chunk
+                chunk = []
+    else:
+        for item in items:
+            chunk.append(item)
+            if len(chunk) >= size:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+
+
+@dataclass
+class FailedChunk:
+    """
+    Часть пакетной загрузки, которую не удалось отправить.
+
+    - index: номер части (с 0).
+    - items: записи части, чтобы их можно было отправить снова.
+    - error: последняя ошибка.
+    """
+
+    index: int
+    items: list[Any]
+    error: Exception
+
+
+@dataclass
+class BulkUploadResult:
+    """
+    Итог пакетной загрузки.
+
+    - sent: сколько записей принял сервис.
+    - chunks: на сколько частей была разбита загрузка.
+    - failed: части, которые не удалось отправить.
+    """
+
+    sent: int = 0
+    chunks: int = 0
+    failed: list[FailedChunk] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.failed
+
+    def raise_for_failures(self):
+        """
+        :raises BulkUploadError: Если хотя бы одна часть не отправлена.
+        """
+        if self.failed:
+            lost = sum(len(chunk.items) for chunk in self.failed)
+            error = self.failed[0].error
+            raise BulkUploadError(
+                f"{len(self.failed)} of {self.chunks} chunks "
+                f"({lost} items) failed, first error: "
+                f"{type(error).__name__}: {error}"
+            )
+
+
+@dataclass
+class GetManyResult:
+    """
+    Итог get_many.
+
+    - found: найденные записи {идентификатор: запись}.
+    - errors: ошибки по идентификаторам (NotFoundError, если записи
+      нет, иначе ошибка запроса).
+    """
+
+    found: dict[Any, Any] = field(default_factory=dict)
+    errors: dict[Any, Exception] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
@@ -2,3 +2,15 @@ class NotFoundError(Exception):
     """Кастомное исключение для ресурса, который не найден."""
 
     pass
+
+
+class CircuitOpenError(Exception):
+    """Внешний сервис недоступен: запрос отклонён без отправки."""
+
+    pass
+
+
+class BulkUploadError(Exception):
+    """Часть пакетной загрузки не принята сервисом."""
+
+    pass
@@ -5,6 +5,6 @@ from api_client.clients.some_client.user_client import UserClient
 
 
 class SomeClient:
-    def __init__(self, base_url: str, session: ClientSession):
-        self.user_client = UserClient(base_url, session)
-        self.item_client = ItemClient(base_url, session)
+    def __init__(self, base_url: str, session: ClientSession, **kwargs):
+        self.user_client = UserClient(base_url, session, **kwargs)
+        self.item_client = ItemClient(base_url, session, **kwargs)
@@ -1,11 +1,13 @@
 from aiohttp import ClientSession
 
-from api_client.base_client import BaseClient
+from api_client.base_client import BaseClient, json_body
 
 
 class SomeOtherClient(BaseClient):
-    def __init__(self, base_url: str, session: ClientSession):
-        super().__init__(base_url, session, "/some_route")
+    def __init__(self, base_url: str, session: ClientSession, **kwargs):
+        super().__init__(base_url, session, "/some_route", **kwargs)
 
     async def specific_request(self, some_data: dict):
-        return await self.request("POST", "/specific_endpoint", json=some_data)
+        return await self.request(
+            "POST", "/specific_endpoint", **json_body(some_data)
+        )
@@ -0,0 +1,105 @@
+import time
+from collections import defaultdict
+from types import SimpleNamespace
+
+from aiohttp import (
+    ClientSession,
+    ClientTimeout,
+    TCPConnector,
+    TraceConfig,
+)
+
+from config import ApiClientConfig
+from core import metrics
+
+connections_created = metrics.counter(
+    "api_client_connections_created_total",
+    "New connections opened to an upstream",
+    ("upstream",),
+)
+connections_reused = metrics.counter(
+    "api_client_connections_reused_total",
+    "Requests that reused a keep-alive connection",
+    ("upstream",),
+)
+connection_queue_wait = metrics.histogram(
+    "api_client_connection_queue_wait_seconds",
+    "Time a request waited for a free connection in the pool",
+    ("upstream",),
+)
+
+# Запросы, которые сейчас выполняются, по пулам
+_in_flight: dict[str, int] = defaultdict(int)
+metrics.gauge(
+    "api_client_requests_in_flight",
+    "Requests currently using a connection pool",
+    lambda: {(upstream,): count for upstream, count in _in_flight.items()},
+    labelnames=("upstream",),
+)
+
+
+def pool_trace_config(upstream: str) -> TraceConfig:
+    """
+    Считает использование пула соединений: новые и переиспользованные
+    соединения, ожидание свободного соединения (пул исчерпан)
+    и запросы в работе.
+
+    :param upstream: Имя пула для меток метрик.
+    :return: Настройки трассировки для ClientSession.
+    """
+
+    async def on_request_start(session, context, params):
+        _in_flight[upstream] += 1
+
+    async def on_request_finished(session, context, params):
+        _in_flight[upstream] -= 1
+
+    async def on_connection_queued_start(session, context, params):
+        context.queued_at = time.perf_counter()
+
+    async def on_connection_queued_end(session, context, params):
+        connection_queue_wait.observe(
+            time.perf_counter() - context.queued_at, upstream=upstream
+        )
+
+    async def on_connection_create_end(session, context, params):
+        connections_created.inc(upstream=upstream)
+
+    async def on_connection_reuseconn(session, context, params):
+        connections_reused.inc(upstream=upstream)
+
+    trace_config = TraceConfig(trace_config_ctx_factory=SimpleNamespace)
+    trace_config.on_request_start.append(on_request_start)
+    trace_config.on_request_end.append(on_request_finished)
+    trace_config.on_request_exception.append(on_request_finished)
+    trace_config.on_connection_queued_start.append(on_connection_queued_start)
+    trace_config.on_connection_queued_end.append(on_connection_queued_end)
+    trace_config.on_connection_create_end.append(on_connection_create_end)
+    trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+    return trace_config
+
+
+def create_session(config: ApiClientConfig, upstream: str) -> ClientSession:
+    """
+    Создаёт сессию aiohttp с настройками пула соединений и таймаутами
+    из конфигурации.
+
+    :param config: Настройки клиентов внешних API.
+    :param upstream: Имя пула для метрик.
+    :return: Сессия.
+    """
+    connector = TCPConnector(
+        limit=config.connection_limit,
+        limit_per_host=config.connection_limit_per_host,
+        keepalive_timeout=config.keepalive_timeout,
+        ttl_dns_cache=config.dns_cache_ttl,
+    )
+    return ClientSession(
+        connector=connector,
+        timeout=ClientTimeout(
+            total=config.total_timeout,
+            connect=config.connect_timeout,
+            sock_read=config.read_timeout,
+        ),
+        trace_configs=[pool_trace_config(upstream)],
+    )
@@ -0,0 +1,158 @@
+import re
+from abc import ABC, abstractmethod
+from typing import Any, Mapping
+
+from yarl import URL
+
+# Элемент заголовка Link: <url>; rel="next"; ...
+LINK_PATTERN = re.compile(r"<([^>]*)>((?:\s*;\s*[^;,]+)*)")
+REL_PATTERN = re.compile(r';\s*rel\s*=\s*"?([^";]+)"?')
+
+
+class Pagination(ABC):
+    """
+    Стратегия постраничного чтения ресурса: с какими параметрами
+    запросить первую страницу, где в ответе записи и как запросить
+    следующую страницу.
+    """
+
+    def __init__(self, items_field: str | None = None):
+        """
+        :param items_field: Поле ответа со списком записей; без него
+         ответ — сам список.
+        """
+        self.items_field = items_field
+
+    def first_params(self, params: dict) -> dict:
+        """
+        :param params: Параметры запроса от вызывающего.
+        :return: Параметры запроса первой страницы.
+        """
+        return params
+
+    def items(self, body: Any) -> list:
+        """
+        :param body: Декодированное тело ответа.
+        :return: Записи страницы.
+        """
+        if self.items_field is not None and body:
+            body = body.get(self.items_field)
+        return body or []
+
+    @abstractmethod
+    def next_request(
+        self,
+        url: str,
+        params: dict,
+        headers: Mapping[str, str],
+        body: Any,
+        items: list,
+    ) -> tuple[str, dict] | None:
+        """
+        :param url: URL текущей страницы.
+        :param params: Параметры запроса текущей страницы.
+        :param headers: Заголовки ответа.
+        :param body: Декодированное тело ответа.
+        :param items: Записи текущей страницы.
+        :return: URL и параметры следующей страницы или None, если
+         страница последняя.
+        """
+
+
+class SinglePage(Pagination):
+    """
+    Ресурс без пагинации: весь список приходит одним ответом.
+    """
+
+    def next_request(self, url, params, headers, body, items):
+        return None
+
+
+class OffsetPagination(Pagination):
+    """
+    Пагинация смещением: ?limit=100&offset=200. Страница короче
+    limit считается последней.
+    """
+
+    def __init__(
+        self,
+        limit: int = 100,
+        limit_param: str = "limit",
+        offset_param: str = "offset",
+        items_field: str | None = None,
+    ):
+        """
+        :param limit: Размер страницы (если вызывающий не передал свой).
+        :param limit_param: Параметр размера страницы.
+        :param offset_param: Параметр смещения.
+        :param items_field: Поле ответа со списком записей.
+        """
+        super().__init__(items_field)
+        self.limit = limit
+        self.limit_param = limit_param
+        self.offset_param = offset_param
+
+    def first_params(self, params: dict) -> dict:
+        return {self.limit_param: self.limit, self.offset_param: 0, **params}
+
+    def next_request(self, url, params, headers, body, items):
+        if len(items) < int(params[self.limit_param]):
+            return None
+        offset = int(params[self.offset_param]) + len(items)
+        return url, {**params, self.offset_param: offset}
+
+
+class CursorPagination(Pagination):
+    """
+    Пагинация курсором: ответ содержит курсор следующей страницы,
+    который передаётся параметром запроса. Пустой курсор — последняя
+    страница.
+    """
+
+    def __init__(
+        self,
+        cursor_param: str = "cursor",
+        next_cursor_field: str = "next_cursor",
+        items_field: str | None = "items",
+    ):
+        """
+        :param cursor_param: Параметр запроса с курсором.
+        :param next_cursor_field: Поле ответа с курсором следующей
+         страницы.
+        :param items_field: Поле ответа со списком записей.
+        """
+        super().__init__(items_field)
+        self.cursor_param = cursor_param
+        self.next_cursor_field = next_cursor_field
+
+    def next_request(self, url, params, headers, body, items):
+        cursor = body.get(self.next_cursor_field) if body else None
+        if not cursor:
+            return None
+        return url, {**params, self.cursor_param: cursor}
+
+
+class LinkHeaderPagination(Pagination):
+    """
+    Пагинация заголовком Link (RFC 8288, как в GitHub API): URL
+    следующей страницы — ссылка с rel="next".
+    """
+
+    def next_request(self, url, params, headers, body, items):
+        next_url = parse_next_link(headers.get("Link"))
+        if next_url is None:
+            return None
+        # Параметры уже в URL следующей страницы
+        return str(URL(url).join(URL(next_url))), {}
+
+
+def parse_next_link(value: str | None) -> str | None:
+    """
+    :param value: Заголовок Link.
+    :return: Ссылка с rel="next" или None.
+    """
+    for match in LINK_PATTERN.finditer(value or ""):
+        rel = REL_PATTERN.search(match.group(2))
+        if rel and "next" in rel.group(1).lower().split():
+            return match.group(1)
+    return None
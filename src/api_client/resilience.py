@@ -0,0 +1,136 @@
+import datetime
+import random
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+
+from api_client.client_errors import CircuitOpenError
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    Политика повторов запросов клиента.
+
+    - attempts: сколько всего попыток (1 — без повторов).
+    - backoff: задержка перед первым повтором в секундах, дальше
+      удваивается; к ней добавляется случайный разброс.
+    - backoff_max: предел задержки (и ожидания по Retry-After).
+    - retry_statuses: HTTP-статусы, после которых запрос повторяется.
+    - methods: повторяются только идемпотентные методы: повтор POST
+      может создать запись дважды.
+    """
+
+    attempts: int = 3
+    backoff: float = 0.5
+    backoff_max: float = 10.0
+    retry_statuses: frozenset[int] = frozenset({429, 500, 502, 503, 504})
+    methods: frozenset[str] = frozenset(
+        {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+    )
+
+    def attempts_for(self, method: str) -> int:
+        """
+        :param method: HTTP-метод.
+        :return: Сколько попыток разрешено для метода.
+        """
+        return self.attempts if method.upper() in self.methods else 1
+
+    def delay(self, attempt: int, retry_after: float | None = None) -> float:
+        """
+        :param attempt: Номер неудачной попытки (с 1).
+        :param retry_after: Задержка, которую попросил сервер.
+        :return: Сколько секунд ждать перед следующей попыткой.
+        """
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        delay = min(self.backoff * 2 ** (attempt - 1), self.backoff_max)
+        return delay * random.uniform(0.5, 1.0)
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """
+    Разбирает заголовок Retry-After: число секунд или HTTP-дату.
+
+    :param value: Значение заголовка.
+    :return: Задержка в секундах или None.
+    """
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    now = datetime.datetime.now(datetime.timezone.utc)
+    return max((retry_at - now).total_seconds(), 0.0)
+
+
+class CircuitBreaker:
+    """
+    Автомат защиты для одного внешнего сервиса.
+
+    - closed: запросы идут как обычно; после failure_threshold сбоев
+      подряд автомат размыкается.
+    - open: запросы сразу падают с CircuitOpenError, не занимая
+      корутины и соединения в ожидании лежащего сервиса.
+    - half-open: через recovery_timeout секунд пропускается один
+      пробный запрос; успех замыкает автомат, сбой снова размыкает.
+    """
+
+    def __init__(
+        self, name: str, failure_threshold: int, recovery_timeout: float
+    ):
+        """
+        :param name: Имя сервиса (base URL) для логов и ошибок.
+        :param failure_threshold: Сколько сбоев подряд размыкает автомат.
+        :param recovery_timeout: Через сколько секунд пробовать снова.
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+
+        self.state = "closed"
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    def before_request(self):
+        """
+        Проверяет, можно ли отправить запрос.
+
+        :raises CircuitOpenError: Автомат разомкнут.
+        """
+        if self.state == "closed":
+            return
+        if self.state == "open":
+            if time.monotonic() - self._opened_at < self.recovery_timeout:
+                raise CircuitOpenError(f"Circuit for {self.name} is open")
+            self.state = "half-open"
+        if self._probe_in_flight:
+            raise CircuitOpenError(f"Circuit for {self.name} is half-open")
+        self._probe_in_flight = True
+
+    def release(self):
+        """
+        Снимает отметку пробного запроса, если он был отменён.
+        """
+        self._probe_in_flight = False
+
+    def record_success(self):
+        self.state = "closed"
+        self.failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._probe_in_flight = False
+        if (
+            self.state == "half-open"
+            or self.failures >= self.failure_threshold
+        ):
+            self.state = "open"
+            self._opened_at = time.monotonic()
@@ -0,0 +1,243 @@
+import json
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Mapping
+from urllib.parse import urlencode
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+# Сколько секунд хранить устаревший ответ с ETag: по нему можно
+# сделать условный запрос и получить 304 вместо всего тела
+ETAG_RETENTION = 3600
+
+
+@dataclass
+class CachedResponse:
+    """
+    Закэшированный ответ.
+
+    - body: тело ответа (JSON-текст).
+    - etag: ETag ответа для условных запросов.
+    - fresh_until: до этого момента (unix time) ответ отдаётся без
+      обращения к сервису.
+    - stale_until: до этого момента устаревший ответ отдаётся сразу,
+      а обновляется в фоне (stale-while-revalidate).
+    """
+
+    body: str
+    etag: str | None
+    fresh_until: float
+    stale_until: float
+
+
+def cache_key(url: str, params: Mapping | None = None) -> str:
+    """
+    :param url: URL запроса.
+    :param params: Параметры запроса.
+    :return: Ключ кэша, не зависящий от порядка параметров.
+    """
+    if not params:
+        return url
+    return f"{url}?{urlencode(sorted(params.items()), doseq=True)}"
+
+
+def parse_cache_control(value: str | None) -> dict[str, str | None]:
+    """
+    :param value: Заголовок Cache-Control.
+    :return: Директивы: {"max-age": "60", "no-store": None, ...}.
+    """
+    directives = {}
+    for part in (value or "").split(","):
+        name, _, argument = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = argument.strip('"') or None
+    return directives
+
+
+class ResponseCache:
+    """
+    Кэш ответов на GET-запросы к внешним API.
+
+    Два уровня: ограниченный LRU в памяти процесса и (опционально)
+    Redis, общий для всех процессов. Время жизни ответа берётся из
+    переопределения клиента, иначе из Cache-Control (max-age,
+    stale-while-revalidate, no-cache, no-store), иначе default_ttl.
+
+    Ответы группируются по ресурсам (base URL + путь клиента):
+    запись в ресурс сбрасывает все его ответы. LRU других процессов
+    при этом не сбрасывается, поэтому для данных, которые часто
+    меняются, стоит задавать короткий TTL.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        redis: Redis | None = None,
+        key_prefix: str = "api_cache",
+        default_ttl: float = 60.0,
+        stale_ttl: float = 0.0,
+    ):
+        """
+        :param max_entries: Предел ответов в памяти процесса.
+        :param redis: Клиент Redis для общего уровня кэша
+         (опционально).
+        :param key_prefix: Префикс ключей в Redis.
+        :param default_ttl: Время жизни ответа без Cache-Control,
+         в секундах.
+        :param stale_ttl: Сколько секунд после устаревания отдавать
+         ответ, обновляя его в фоне.
+        """
+        self.max_entries = max_entries
+        self.redis = redis
+        self.key_prefix = key_prefix
+        self.default_ttl = default_ttl
+        self.stale_ttl = stale_ttl
+        self._entries: OrderedDict[str, tuple[str, CachedResponse]] = (
+            OrderedDict()
+        )
+
+    def _entry_key(self, key: str) -> str:
+        return f"{self.key_prefix}:entry:{key}"
+
+    def _index_key(self, resource: str) -> str:
+        return f"{self.key_prefix}:index:{resource}"
+
+    async def get(self, key: str) -> CachedResponse | None:
+        """
+        :param key: Ключ кэша.
+        :return: Ответ из памяти, а если его нет — из Redis.
+        """
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return self._entries[key][1]
+        if self.redis is None:
+            return None
+        try:
+            raw = await self.redis.get(self._entry_key(key))
+        except RedisError:
+            logging.exception("Failed to read response cache from Redis: ")
+            return None
+        if raw is None:
+            return None
+        data = json.loads(raw)
+        entry = CachedResponse(**data["entry"])
+        self._remember(key, data["resource"], entry)
+        return entry
+
+    async def store(
+        self,
+        key: str,
+        resource: str,
+        body: str,
+        etag: str | None = None,
+        cache_control: str | None = None,
+        ttl: float | None = None,
+    ) -> CachedResponse | None:
+        """
+        Сохраняет ответ.
+
+        :param key: Ключ кэша.
+        :param resource: Ресурс, к которому относится ответ.
+        :param body: Тело ответа (JSON-текст).
+        :param etag: ETag ответа.
+        :param cache_control: Заголовок Cache-Control ответа.
+        :param ttl: Время жизни, заданное клиентом (важнее
+         Cache-Control).
+        :return: Сохранённый ответ или None, если сервис запретил
+         его хранить.
+        """
+        directives = parse_cache_control(cache_control)
+        if "no-store" in directives:
+            await self._delete(key)
+            return None
+
+        stale_ttl = self.stale_ttl
+        if ttl is None:
+            if "no-cache" in directives:
+                ttl, stale_ttl = 0.0, 0.0
+            else:
+                ttl = _seconds(directives.get("max-age"), self.default_ttl)
+                stale_ttl = _seconds(
+                    directives.get("stale-while-revalidate"), stale_ttl
+                )
+
+        now = time.time()
+        entry = CachedResponse(
+            body=body,
+            etag=etag,
+            fresh_until=now + ttl,
+            stale_until=now + ttl + stale_ttl,
+        )
+        self._remember(key, resource, entry)
+
+        if self.redis is not None:
+            expire = ttl + stale_ttl + (ETAG_RETENTION if etag else 0)
+            if expire > 0:
+                await self._save_to_redis(key, resource, entry, expire)
+        return entry
+
+    async def invalidate(self, resource: str):
+        """
+        Сбрасывает все ответы ресурса.
+
+        :param resource: Ресурс (base URL + путь клиента).
+        """
+        for key in [
+            key
+            for key, (entry_resource, _) in self._entries.items()
+            if entry_resource == resource
+        ]:
+            del self._entries[key]
+
+        if self.redis is None:
+            return
+        try:
+            index_key = self._index_key(resource)
+            keys = await self.redis.smembers(index_key)
+            async with self.redis.pipeline(transaction=True) as pipe:
+                for key in keys:
+                    pipe.delete(self._entry_key(key.decode()))
+                pipe.delete(index_key)
+                await pipe.execute()
+        except RedisError:
+            logging.exception("Failed to invalidate response cache: ")
+
+    def _remember(self, key: str, resource: str, entry: CachedResponse):
+        self._entries[key] = (resource, entry)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def _save_to_redis(
+        self, key: str, resource: str, entry: CachedResponse, expire: float
+    ):
+        index_key = self._index_key(resource)
+        data = json.dumps({"resource": resource, "entry": asdict(entry)})
+        try:
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.set(self._entry_key(key), data, px=int(expire * 1000))
+                pipe.sadd(index_key, key)
+                pipe.expire(index_key, int(expire) + 1, gt=True)
+                pipe.expire(index_key, int(expire) + 1, nx=True)
+                await pipe.execute()
+        except RedisError:
+            logging.exception("Failed to save response cache to Redis: ")
+
+    async def _delete(self, key: str):
+        self._entries.pop(key, None)
+        if self.redis is None:
+            return
+        try:
+            await self.redis.delete(self._entry_key(key))
+        except RedisError:
+            logging.exception("Failed to delete response cache entry: ")
+
+
+def _seconds(value: str | None, default: float) -> float:
+    try:
+        return max(float(value), 0.0)
+    except (TypeError, ValueError):
+        return default
@@ -10,6 +10,7 @@ from core import BaseModuleManager
 from database import DatabaseManager
 from scheduled_jobs import SchedulerManager
 from server import ServerManager
+from task_queue import TaskWorkerManager
 
 
 class AppContainer:
@@ -23,14 +24,19 @@ class AppContainer:
     и обеспечивает корректное завершение работы приложения.
     """
 
-    def __init__(self, settings: Settings):
+    def __init__(self, settings: Settings, role: str = "app"):
         """
         Инициализирует контейнер приложения.
 
         :param settings: Конфигурация приложения.
+        :param role: Роль процесса:
+         - "app": всё приложение целиком;
+         - "bot-worker": только обработка апдейтов бота из Redis Stream;
+         - "worker": только выполнение фоновых задач из очереди.
         """
 
         self.settings = settings
+        self.role = role
 
         self.database_manager: DatabaseManager | None = None
         self.api_client_manager: ApiClientManager | None = None
@@ -39,6 +45,7 @@ class AppContainer:
         self.api_manager: ApiManager | None = None
         self.scheduler_manager: SchedulerManager | None = None
         self.server_manager: ServerManager | None = None
+        self.task_worker_manager: TaskWorkerManager | None = None
 
         self.modules: list[BaseModuleManager] = []
 
@@ -75,13 +82,21 @@ class AppContainer:
 
         После выполнения этого метода приложение готово к запуску.
         """
+        if self.role == "bot-worker":
+            await self.configure_bot_worker()
+            return
+        if self.role == "worker":
+            await self.configure_task_worker()
+            return
 
         self.database_manager = await self.setup_module(
             DatabaseManager, self.settings.database_config
         )
 
         self.api_client_manager = await self.setup_module(
-            ApiClientManager, self.settings.api_client_config
+            ApiClientManager,
+            self.settings.api_client_config,
+            redis_config=self.settings.redis_config,
         )
 
         self.bot_manager = await self.setup_module(
@@ -90,6 +105,8 @@ class AppContainer:
             redis_config=self.settings.redis_config,
             async_session=self.database_manager.async_session,
             api_client=self.api_client_manager,
+            throttling_config=self.settings.throttling_config,
+            scheduler_config=self.settings.scheduler_config,
         )
 
         self.admin_manager = await self.setup_module(
@@ -99,6 +116,17 @@ class AppContainer:
             async_session=self.database_manager.async_session,
         )
 
+        self.scheduler_manager = await self.setup_module(
+            SchedulerManager,
+            bot=self.bot_manager.bot,
+            async_session=self.database_manager.async_session,
+            api_client=self.api_client_manager,
+            redis=self.bot_manager.redis,
+            redis_config=self.settings.redis_config,
+            scheduler_config=self.settings.scheduler_config,
+            task_queue_config=self.settings.task_queue_config,
+        )
+
         self.api_manager = await self.setup_module(
             ApiManager,
             api_config=self.settings.api_config,
@@ -106,13 +134,7 @@ class AppContainer:
             api_client=self.api_client_manager,
             bot=self.bot_manager.bot,
             admin=self.admin_manager.admin,
-        )
-
-        self.scheduler_manager = await self.setup_module(
-            SchedulerManager,
-            bot=self.bot_manager.bot,
-            async_session=self.database_manager.async_session,
-            api_client=self.api_client_manager,
+            scheduler=self.scheduler_manager,
         )
 
         self.server_manager = await self.setup_module(
@@ -122,6 +144,62 @@ class AppContainer:
         )
         self._setup_signal_handlers()
 
+    async def configure_bot_worker(self) -> None:
+        """
+        Конфигурирует процесс-воркер бота: только модули, нужные
+        для обработки апдейтов, которые приёмник сложил в Redis Stream.
+        Таких процессов можно запустить несколько.
+        """
+        self.database_manager = await self.setup_module(
+            DatabaseManager, self.settings.database_config
+        )
+
+        self.api_client_manager = await self.setup_module(
+            ApiClientManager,
+            self.settings.api_client_config,
+            redis_config=self.settings.redis_config,
+        )
+
+        self.bot_manager = await self.setup_module(
+            BotManager,
+            bot_config=self.settings.bot_config.model_copy(
+                update={"update_mode": "worker"}
+            ),
+            redis_config=self.settings.redis_config,
+            async_session=self.database_manager.async_session,
+            api_client=self.api_client_manager,
+            throttling_config=self.settings.throttling_config,
+            scheduler_config=self.settings.scheduler_config,
+        )
+        self._setup_signal_handlers()
+
+    async def configure_task_worker(self) -> None:
+        """
+        Конфигурирует процесс-воркер фоновых задач: задачи планировщика
+        ставятся в очередь процессом приложения, а выполняются здесь.
+        Таких процессов можно запустить несколько.
+        """
+        self.database_manager = await self.setup_module(
+            DatabaseManager, self.settings.database_config
+        )
+
+        self.api_client_manager = await self.setup_module(
+            ApiClientManager,
+            self.settings.api_client_config,
+            redis_config=self.settings.redis_config,
+        )
+
+        self.task_worker_manager = await self.setup_module(
+            TaskWorkerManager,
+            task_queue_config=self.settings.task_queue_config,
+            redis_config=self.settings.redis_config,
+            bot_config=self.settings.bot_config,
+            async_session=self.database_manager.async_session,
+            api_client=self.api_client_manager,
+            scheduler_config=self.settings.scheduler_config,
+        )
+        self._setup_signal_handlers()
+
     def _setup_signal_handlers(self):
         """
         Настраивает обработчики сигналов SIGTERM и SIGINT
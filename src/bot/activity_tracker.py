@@ -0,0 +1,102 @@
+import asyncio
+import datetime
+import logging
+
+from redis.exceptions import RedisError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from scheduled_jobs.reminder_index import ReminderIndex
+from services import user_service
+from utils import ServiceError
+
+
+class ActivityTracker:
+    """
+    Отложенная запись времени последней активности пользователей.
+
+    Middleware только запоминает время в памяти процесса, а фоновая
+    задача раз в flush_interval секунд записывает накопленное в базу
+    одним UPDATE. Для каждого пользователя хранится только последнее
+    время, поэтому сколько бы апдейтов он ни прислал, в базу уйдёт
+    одна строка за интервал.
+
+    Если задан индекс напоминаний, записанная активность сразу
+    попадает и в него.
+    """
+
+    def __init__(
+        self,
+        async_session: async_sessionmaker,
+        flush_interval: float = 5.0,
+        reminder_index: ReminderIndex | None = None,
+    ):
+        """
+        :param async_session: Фабрика асинхронных сессий SQLAlchemy.
+        :param flush_interval: Как часто записывать активность в базу,
+         в секундах.
+        :param reminder_index: Индекс кандидатов на напоминание
+         (опционально).
+        """
+        self.async_session = async_session
+        self.flush_interval = flush_interval
+        self.reminder_index = reminder_index
+        self._activity: dict[int, datetime.datetime] = {}
+        self._flush_task: asyncio.Task | None = None
+
+    def touch(self, user_id: int):
+        """
+        Запоминает, что пользователь был активен только что.
+
+        :param user_id: Telegram ID пользователя.
+        """
+        self._activity[user_id] = datetime.datetime.now(datetime.timezone.utc)
+
+    async def start(self):
+        """
+        Запускает периодическую запись активности в базу.
+        """
+        self._flush_task = asyncio.create_task(self._flush_periodically())
+
+    async def shutdown(self):
+        """
+        Останавливает фоновую задачу и записывает остаток активности.
+        """
+        if self._flush_task:
+            self._flush_task.cancel()
+            await asyncio.gather(self._flush_task, return_exceptions=True)
+            self._flush_task = None
+        await self.flush()
+
+    async def flush(self):
+        """
+        Записывает накопленную активность в базу одним запросом.
+        Если запись не удалась, активность вернётся в буфер
+        и будет записана при следующей попытке.
+        """
+        if not self._activity:
+            return
+
+        activity, self._activity = self._activity, {}
+        try:
+            async with self.async_session() as session:
+                users = await user_service.update_last_active(
+                    session=session, activity=activity
+                )
+        except ServiceError:
+            logging.exception("Failed to flush user activity: ")
+            for user_id, last_active in activity.items():
+                # Более свежие отметки, пришедшие за время записи, важнее
+                self._activity.setdefault(user_id, last_active)
+            return
+
+        if self.reminder_index:
+            try:
+                await self.reminder_index.touch(users)
+            except RedisError:
+                # База — источник истины: индекс можно пересобрать
+                logging.exception("Failed to update reminder index: ")
+
+    async def _flush_periodically(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
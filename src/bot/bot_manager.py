@@ -1,21 +1,41 @@
 import asyncio
 
-from aiogram import Bot, Dispatcher
+from aiogram import Bot
 from aiogram.client.bot import DefaultBotProperties
 from aiogram.enums import ParseMode
-from aiogram.fsm.storage.redis import Redis, RedisStorage
+from aiogram.fsm.storage.redis import Redis
+from aiogram.types import InputFile, Message, Update
 from api_client import ApiClientManager
-from config import BotConfig, RedisConfig
+from config import BotConfig, RedisConfig, SchedulerConfig, ThrottlingConfig
 from core import BaseModuleManager
+from redis.asyncio import ConnectionPool
 from sqlalchemy.ext.asyncio import async_sessionmaker
 
+from bot.activity_tracker import ActivityTracker
 from bot.bot_utils import set_default_commands
-from bot.middleware import (  # MediaGroupMiddleware,
+from bot.delayed_retry import DelayedRetryQueue
+from bot.fsm_storage import FastRedisStorage
+from bot.media_cache import MediaCache, MediaType
+from bot.media_group_storage import (
+    BaseMediaGroupStorage,
+    MemoryMediaGroupStorage,
+    RedisMediaGroupStorage,
+)
+from bot.middleware import (
+    ActivityMiddleware,
     ApiClientMiddleware,
     DBSessionMiddleware,
+    HandlerMetricsMiddleware,
     IsAdminMiddleware,
+    MediaGroupMiddleware,
+    TelegramRequestMetrics,
+    ThrottlingMiddleware,
+    UpdateMetricsMiddleware,
 )
 from bot.routers import router
+from bot.update_scheduler import ScheduledDispatcher, UpdateScheduler
+from bot.update_stream import UpdateStreamConsumer, UpdateStreamProducer
+from scheduled_jobs.reminder_index import ReminderIndex
 
 
 class BotManager(BaseModuleManager):
@@ -25,19 +45,33 @@ class BotManager(BaseModuleManager):
         redis_config: RedisConfig,
         async_session: async_sessionmaker,
         api_client: ApiClientManager,
+        throttling_config: ThrottlingConfig | None = None,
+        scheduler_config: SchedulerConfig | None = None,
     ):
         self.bot_config = bot_config
         self.redis_config = redis_config
         self.async_session = async_session
         self.api_client = api_client
+        self.throttling_config = throttling_config or ThrottlingConfig()
+        self.scheduler_config = scheduler_config or SchedulerConfig()
 
         self.bot: Bot = Bot(
             token=self.bot_config.bot_token.get_secret_value(),
             default=DefaultBotProperties(parse_mode=ParseMode.HTML),
         )
         self.redis: Redis | None = None
-        self.storage: RedisStorage | None = None
-        self.dispatcher: Dispatcher | None = None
+        self.storage: FastRedisStorage | None = None
+        self.dispatcher: ScheduledDispatcher | None = None
+        self.update_scheduler: UpdateScheduler | None = None
+        self.update_consumer: UpdateStreamConsumer | None = None
+        self.media_cache: MediaCache | None = None
+        self.activity_tracker = ActivityTracker(
+            self.async_session,
+            flush_interval=self.bot_config.activity_flush_interval,
+        )
+        self.retry_queue = DelayedRetryQueue(
+            max_attempts=self.bot_config.send_retry_attempts
+        )
         self._polling_task: asyncio.Task | None = None
 
     async def configure(self):
@@ -47,40 +81,189 @@ class BotManager(BaseModuleManager):
 
         await set_default_commands(bot=self.bot)
 
-        self.redis = Redis(
+        connection_pool = ConnectionPool(
             host=self.redis_config.redis_host,
             port=self.redis_config.redis_port,
             db=self.redis_config.redis_db,
+            max_connections=self.redis_config.max_connections,
+            socket_timeout=self.redis_config.socket_timeout,
+            socket_connect_timeout=self.redis_config.socket_connect_timeout,
+            health_check_interval=self.redis_config.health_check_interval,
         )
-        self.storage = RedisStorage(
+        self.redis = Redis(connection_pool=connection_pool)
+        if self.scheduler_config.reminder_index:
+            self.activity_tracker.reminder_index = ReminderIndex(self.redis)
+        self.media_cache = MediaCache(self.redis, self.async_session)
+        self.storage = FastRedisStorage(
             redis=self.redis,
+            serializer=self.redis_config.fsm_serializer,
+            use_local_cache=self.redis_config.fsm_local_cache,
             state_ttl=self.redis_config.state_ttl,
             data_ttl=self.redis_config.data_ttl,
         )
 
-        self.dispatcher = Dispatcher(storage=self.storage)
+        self.dispatcher = ScheduledDispatcher(storage=self.storage)
+        # Доступна хэндлерам (в том числе ошибок) по имени retry_queue
+        self.dispatcher["retry_queue"] = self.retry_queue
+        self.dispatcher["media_cache"] = self.media_cache
         self.dispatcher.include_router(router)
 
+        if self.bot_config.update_workers:
+            self.update_scheduler = UpdateScheduler(
+                self.dispatcher.process_scheduled_update,
+                workers=self.bot_config.update_workers,
+                queue_size=self.bot_config.update_queue_size,
+            )
+            self.dispatcher.update_scheduler = self.update_scheduler
+
+        await self.configure_update_stream()
         await self.configure_middleware()
 
+    async def configure_update_stream(self):
+        """
+        Настройка режима приёма апдейтов:
+        - polling: процесс сам получает и обрабатывает апдейты;
+        - intake: процесс получает апдейты и складывает их в Redis Stream;
+        - worker: процесс обрабатывает апдейты из Redis Stream.
+        """
+        if self.bot_config.update_mode == "intake":
+            self.dispatcher.update_producer = UpdateStreamProducer(
+                self.redis,
+                stream=self.bot_config.update_stream,
+                maxlen=self.bot_config.update_stream_maxlen,
+            )
+        elif self.bot_config.update_mode == "worker":
+            self.update_consumer = UpdateStreamConsumer(
+                self.redis,
+                bot=self.bot,
+                process_update=self._process_stream_update,
+                stream=self.bot_config.update_stream,
+                group=self.bot_config.update_stream_group,
+                max_deliveries=self.bot_config.update_stream_max_deliveries,
+            )
+
+    async def _process_stream_update(self, update: Update):
+        """
+        Обрабатывает апдейт из стрима, через планировщик, если он есть.
+        """
+        kwargs = {"dispatcher": self.dispatcher, "bots": (self.bot,)}
+        if self.update_scheduler:
+            future = await self.update_scheduler.submit(
+                self.bot, update, **kwargs
+            )
+            return await future
+        return await self.dispatcher.process_scheduled_update(
+            self.bot, update, **kwargs
+        )
+
     async def configure_middleware(self):
         """
         Настройка Middleware.
         """
+        self.bot.session.middleware(TelegramRequestMetrics())
+        self.dispatcher.update.outer_middleware(
+            UpdateMetricsMiddleware(self.bot_config.slow_update_threshold)
+        )
+        # Inner-middleware диспетчера срабатывают и для хэндлеров
+        # вложенных роутеров
+        handler_metrics = HandlerMetricsMiddleware()
+        for event_name, observer in self.dispatcher.observers.items():
+            if event_name != "update":
+                observer.middleware(handler_metrics)
+
+        # Альбом собирается до антифлуда, чтобы считаться одним событием
         self.dispatcher.update.middleware(
-            DBSessionMiddleware(self.async_session)
+            MediaGroupMiddleware(
+                self._create_media_group_storage(),
+                self.async_session,
+                latency=self.bot_config.media_group_latency,
+            )
         )
         self.dispatcher.update.middleware(ApiClientMiddleware(self.api_client))
-        self.dispatcher.update.middleware(IsAdminMiddleware())
-        # self.dispatcher.update.middleware(MediaGroupMiddleware())
+        # is_admin нужен фильтрам, поэтому считается до них
+        self.dispatcher.update.middleware(
+            IsAdminMiddleware(self.async_session)
+        )
+
+        # Антифлуд вешается на конкретные типы событий, чтобы видеть
+        # флаги хэндлеров
+        throttling_middleware = ThrottlingMiddleware(
+            self.redis, self.throttling_config
+        )
+        self.dispatcher.message.middleware(throttling_middleware)
+        self.dispatcher.callback_query.middleware(throttling_middleware)
+
+        # Сессия базы и учёт активности — после антифлуда: отброшенные
+        # события не открывают сессию и не считаются активностью
+        db_session = DBSessionMiddleware(self.async_session)
+        activity = ActivityMiddleware(self.activity_tracker)
+        for event_name, observer in self.dispatcher.observers.items():
+            if event_name != "update":
+                observer.middleware(db_session)
+                observer.middleware(activity)
+
+    def _create_media_group_storage(self) -> BaseMediaGroupStorage:
+        """
+        Создаёт буфер для сборки альбомов. Redis нужен, если апдейты
+        обрабатывают несколько процессов.
+        """
+        if self.bot_config.media_group_storage == "redis":
+            return RedisMediaGroupStorage(self.redis)
+        return MemoryMediaGroupStorage()
+
+    async def send_media(
+        self,
+        chat_id: int | str,
+        media_type: MediaType,
+        file: InputFile,
+        name: str | None = None,
+        **kwargs,
+    ) -> Message:
+        """
+        Отправляет файл, загружая его в Telegram только в первый раз:
+        дальше файл отправляется по сохранённому file_id.
+
+        :param chat_id: ID чата.
+        :param media_type: Тип файла: photo, document, video и т.д.
+        :param file: Файл для загрузки (BufferedInputFile, FSInputFile
+         или URLInputFile).
+        :param name: Логическое имя файла. Без него ключом служит хэш
+         содержимого или URL.
+        :param kwargs: Остальные параметры метода отправки (caption,
+         reply_markup и т.д.).
+        :return: Отправленное сообщение.
+        """
+        return await self.media_cache.send(
+            self.bot, chat_id, media_type, file, name=name, **kwargs
+        )
 
     async def start(self):
         """
         Запуск бота.
         """
-        if self.dispatcher:
+        await self.activity_tracker.start()
+        await self.retry_queue.start()
+        if self.update_scheduler:
+            await self.update_scheduler.start()
+
+        if self.update_consumer:
+            await self.dispatcher.emit_startup(
+                bot=self.bot, dispatcher=self.dispatcher
+            )
+            await self.update_consumer.start()
+        elif self.dispatcher:
+            # С планировщиком polling ждёт места в очереди вместо того,
+            # чтобы плодить задачи, — так работает backpressure. Приёмник
+            # публикует апдейты по одному, чтобы сохранить их порядок
             self._polling_task = asyncio.create_task(
-                self.dispatcher.start_polling(self.bot, handle_signals=False)
+                self.dispatcher.start_polling(
+                    self.bot,
+                    handle_signals=False,
+                    handle_as_tasks=(
+                        self.update_scheduler is None
+                        and self.bot_config.update_mode != "intake"
+                    ),
+                )
             )
 
     async def shutdown(self):
@@ -94,8 +277,21 @@ class BotManager(BaseModuleManager):
             except asyncio.CancelledError:
                 pass
 
+        if self.update_consumer:
+            await self.update_consumer.shutdown()
+            await self.dispatcher.emit_shutdown(
+                bot=self.bot, dispatcher=self.dispatcher
+            )
+
+        if self.update_scheduler:
+            await self.update_scheduler.shutdown()
+
+        # Активность за последние секунды пишется в базу до её закрытия
+        await self.activity_tracker.shutdown()
+        await self.retry_queue.shutdown()
+
         if self.bot and self.bot.session:
             await self.bot.session.close()
 
         if self.redis:
-            await self.redis.close()
+            await self.redis.aclose(close_connection_pool=True)
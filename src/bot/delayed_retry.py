@@ -0,0 +1,184 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import random
+
+from aiogram import Bot
+from aiogram.exceptions import (
+    TelegramAPIError,
+    TelegramNetworkError,
+    TelegramRetryAfter,
+)
+from aiogram.methods import TelegramMethod
+
+from core import metrics
+
+retries_scheduled = metrics.counter(
+    "bot_telegram_retries_scheduled_total",
+    "Telegram requests put into the delayed retry queue",
+    labelnames=("method",),
+)
+retries_delivered = metrics.counter(
+    "bot_telegram_retries_delivered_total",
+    "Delayed Telegram requests that were sent successfully",
+    labelnames=("method",),
+)
+retries_failed = metrics.counter(
+    "bot_telegram_retries_failed_total",
+    "Delayed Telegram requests given up after an error or all attempts",
+    labelnames=("method",),
+)
+retries_dropped = metrics.counter(
+    "bot_telegram_retries_dropped_total",
+    "Telegram requests dropped because the retry queue was full or stopped",
+    labelnames=("method",),
+)
+
+
+class DelayedRetryQueue:
+    """
+    Отложенный повтор запросов к Telegram, упавших с
+    TelegramRetryAfter или TelegramNetworkError.
+
+    Обработчик ошибки не ждёт внутри себя: он кладёт упавший запрос
+    в очередь таймеров и сразу возвращается, а запрос отправляется
+    заново, когда Telegram это разрешит (retry_after) или после
+    экспоненциальной задержки при сетевой ошибке.
+
+    Очередь хранится в памяти процесса: при остановке бота
+    неотправленные запросы теряются (их количество пишется в лог).
+    После сетевой ошибки запрос мог дойти до Telegram, поэтому
+    повтор может продублировать сообщение.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        network_backoff: float = 1.0,
+        max_pending: int = 1000,
+    ):
+        """
+        :param max_attempts: Сколько раз повторять один запрос.
+        :param network_backoff: Задержка перед первым повтором после
+         сетевой ошибки в секундах (удваивается с каждой попыткой).
+        :param max_pending: Предел запросов в очереди; лишние
+         отбрасываются.
+        """
+        self.max_attempts = max_attempts
+        self.network_backoff = network_backoff
+        self.max_pending = max_pending
+
+        self._heap: list[tuple[float, int, Bot, TelegramMethod, int]] = []
+        self._counter = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._sending: set[asyncio.Task] = set()
+
+        metrics.gauge(
+            "bot_telegram_retries_pending",
+            "Telegram requests waiting in the delayed retry queue",
+            lambda: len(self._heap),
+        )
+
+    def schedule(
+        self,
+        bot: Bot,
+        method: TelegramMethod,
+        delay: float,
+        attempt: int = 1,
+    ) -> bool:
+        """
+        Откладывает повтор запроса.
+
+        :param bot: Бот, от имени которого отправлялся запрос.
+        :param method: Упавший запрос.
+        :param delay: Через сколько секунд повторить.
+        :param attempt: Номер повтора.
+        :return: True, если запрос поставлен в очередь.
+        """
+        name = type(method).__name__
+        if attempt > self.max_attempts:
+            retries_failed.inc(method=name)
+            logging.error(f"Giving up {name} after {attempt - 1} retries")
+            return False
+        if len(self._heap) >= self.max_pending:
+            retries_dropped.inc(method=name)
+            logging.error(f"Retry queue is full, dropping {name}")
+            return False
+
+        # Разброс, чтобы отложенные запросы не ушли одной пачкой
+        run_at = (
+            asyncio.get_running_loop().time()
+            + delay
+            + random.uniform(0, min(delay, 1.0))
+        )
+        heapq.heappush(
+            self._heap, (run_at, next(self._counter), bot, method, attempt)
+        )
+        retries_scheduled.inc(method=name)
+        self._wakeup.set()
+        return True
+
+    async def start(self):
+        """
+        Запускает отправку отложенных запросов.
+        """
+        self._task = asyncio.create_task(self._run())
+
+    async def shutdown(self):
+        """
+        Останавливает очередь. Отложенные запросы теряются.
+        """
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._sending:
+            await asyncio.gather(*self._sending, return_exceptions=True)
+        if self._heap:
+            logging.warning(
+                f"{len(self._heap)} delayed Telegram requests were not sent"
+            )
+            for _, _, _, method, _ in self._heap:
+                retries_dropped.inc(method=type(method).__name__)
+            self._heap.clear()
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            self._wakeup.clear()
+            if not self._heap:
+                await self._wakeup.wait()
+                continue
+
+            delay = self._heap[0][0] - loop.time()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                except TimeoutError:
+                    pass
+                continue
+
+            _, _, bot, method, attempt = heapq.heappop(self._heap)
+            task = asyncio.create_task(self._send(bot, method, attempt))
+            self._sending.add(task)
+            task.add_done_callback(self._sending.discard)
+
+    async def _send(self, bot: Bot, method: TelegramMethod, attempt: int):
+        try:
+            await bot(method)
+        except TelegramRetryAfter as e:
+            self.schedule(bot, method, e.retry_after, attempt + 1)
+        except TelegramNetworkError:
+            self.schedule(
+                bot,
+                method,
+                self.network_backoff * 2 ** (attempt - 1),
+                attempt + 1,
+            )
+        except TelegramAPIError:
+            retries_failed.inc(method=type(method).__name__)
+            logging.exception(f"Retry of {type(method).__name__} failed: ")
+        else:
+            retries_delivered.inc(method=type(method).__name__)
@@ -1 +1,23 @@
-#
+from aiogram.types import Message
+
+# Порядок важен: у анимации Telegram дополнительно заполняет document
+MEDIA_TYPES = ("photo", "video", "animation", "audio", "document")
+
+
+def extract_media_from_message(message: Message) -> dict | None:
+    """
+    Достаёт file_id и тип медиафайла из сообщения.
+
+    :param message: Сообщение Telegram.
+    :return: Словарь с ключами file_id и media_type или None,
+     если в сообщении нет медиафайла.
+    """
+    for media_type in MEDIA_TYPES:
+        media = getattr(message, media_type)
+        if not media:
+            continue
+        if media_type == "photo":
+            # Берём фото в максимальном размере
+            media = media[-1]
+        return {"file_id": media.file_id, "media_type": media_type}
+    return None
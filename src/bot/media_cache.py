@@ -0,0 +1,226 @@
+import asyncio
+import hashlib
+import logging
+from typing import Literal
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import (
+    BufferedInputFile,
+    FSInputFile,
+    InputFile,
+    Message,
+    URLInputFile,
+)
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from services import media_file_service
+from utils import ServiceError
+
+MediaType = Literal[
+    "photo",
+    "document",
+    "video",
+    "audio",
+    "animation",
+    "voice",
+    "video_note",
+    "sticker",
+]
+
+# Ошибки Telegram, означающие, что сохранённый file_id больше не годится.
+# Остальные TelegramBadRequest (chat not found, длинная подпись и т.д.)
+# к файлу отношения не имеют, и повторная загрузка их не исправит
+STALE_FILE_ID_ERRORS = (
+    "wrong file identifier",
+    "wrong remote file id",
+    "wrong file_id",
+    "file reference expired",
+    "file_reference_expired",
+    "can't use file of type",
+)
+
+
+def _is_stale_file_id(error: TelegramBadRequest) -> bool:
+    message = error.message.lower()
+    return any(text in message for text in STALE_FILE_ID_ERRORS)
+
+
+def _hash_path(path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class MediaCache:
+    """
+    Кэш file_id файлов, которые бот уже загружал в Telegram.
+
+    После первой загрузки Telegram возвращает file_id, по которому
+    тот же файл можно отправлять без повторной загрузки. file_id
+    хранится в Redis (hash `<prefix>:file_ids`) и в таблице
+    media_files, чтобы пережить очистку Redis.
+
+    Ключ файла — логическое имя (если передано), хэш содержимого
+    для BufferedInputFile и FSInputFile или URL для URLInputFile.
+    """
+
+    def __init__(
+        self,
+        redis: Redis,
+        async_session: async_sessionmaker,
+        key_prefix: str = "media",
+    ):
+        """
+        :param redis: Асинхронный клиент Redis.
+        :param async_session: Фабрика асинхронных сессий SQLAlchemy.
+        :param key_prefix: Префикс ключей в Redis.
+        """
+        self.redis = redis
+        self.async_session = async_session
+        self.redis_key = f"{key_prefix}:file_ids"
+
+    async def key_for(self, file: InputFile, name: str | None = None) -> str:
+        """
+        Вычисляет ключ файла.
+
+        :param file: Файл для загрузки.
+        :param name: Логическое имя файла (например, "welcome_banner").
+        :return: Ключ файла.
+        """
+        if name:
+            return f"name:{name}"
+        if isinstance(file, BufferedInputFile):
+            return f"sha256:{hashlib.sha256(file.data).hexdigest()}"
+        if isinstance(file, FSInputFile):
+            digest = await asyncio.to_thread(_hash_path, file.path)
+            return f"sha256:{digest}"
+        if isinstance(file, URLInputFile):
+            return f"url:{file.url}"
+        raise ValueError(f"Cannot build cache key for {type(file).__name__}")
+
+    async def get(self, key: str, media_type: MediaType) -> str | None:
+        """
+        Возвращает file_id из Redis, а если его там нет — из базы.
+
+        :param key: Ключ файла.
+        :param media_type: Тип файла.
+        :return: ID файла в Telegram или None.
+        """
+        field = f"{media_type}:{key}"
+        try:
+            file_id = await self.redis.hget(self.redis_key, field)
+            if file_id:
+                return file_id.decode()
+        except RedisError:
+            logging.exception("Failed to read file_id from Redis: ")
+
+        try:
+            async with self.async_session() as session:
+                file_id = await media_file_service.get_file_id(
+                    session=session, key=key, media_type=media_type
+                )
+        except ServiceError:
+            logging.exception("Failed to read file_id from database: ")
+            return None
+        if file_id:
+            try:
+                await self.redis.hset(self.redis_key, field, file_id)
+            except RedisError:
+                logging.exception("Failed to cache file_id in Redis: ")
+        return file_id
+
+    async def set(self, key: str, media_type: MediaType, file_id: str):
+        """
+        Сохраняет file_id в Redis и в базе.
+
+        :param key: Ключ файла.
+        :param media_type: Тип файла.
+        :param file_id: ID файла в Telegram.
+        """
+        try:
+            await self.redis.hset(
+                self.redis_key, f"{media_type}:{key}", file_id
+            )
+        except RedisError:
+            logging.exception("Failed to cache file_id in Redis: ")
+        try:
+            async with self.async_session() as session:
+                await media_file_service.save_file_id(
+                    session=session,
+                    key=key,
+                    file_id=file_id,
+                    media_type=media_type,
+                )
+        except ServiceError:
+            logging.exception("Failed to save file_id to database: ")
+
+    async def forget(self, key: str, media_type: MediaType):
+        """
+        Удаляет file_id, который Telegram больше не принимает.
+
+        :param key: Ключ файла.
+        :param media_type: Тип файла.
+        """
+        try:
+            await self.redis.hdel(self.redis_key, f"{media_type}:{key}")
+        except RedisError:
+            logging.exception("Failed to delete file_id from Redis: ")
+        try:
+            async with self.async_session() as session:
+                await media_file_service.forget(
+                    session=session, key=key, media_type=media_type
+                )
+        except ServiceError:
+            logging.exception("Failed to delete file_id from database: ")
+
+    async def send(
+        self,
+        bot: Bot,
+        chat_id: int | str,
+        media_type: MediaType,
+        file: InputFile,
+        name: str | None = None,
+        **kwargs,
+    ) -> Message:
+        """
+        Отправляет файл по сохранённому file_id, а если его нет —
+        загружает файл и сохраняет полученный file_id.
+
+        :param bot: Экземпляр Telegram-бота.
+        :param chat_id: ID чата.
+        :param media_type: Тип файла: определяет метод (send_photo,
+         send_document и т.д.).
+        :param file: Файл для загрузки.
+        :param name: Логическое имя файла. Без него ключом служит хэш
+         содержимого или URL.
+        :param kwargs: Остальные параметры метода (caption,
+         reply_markup и т.д.).
+        :return: Отправленное сообщение.
+        """
+        send_method = getattr(bot, f"send_{media_type}")
+        key = await self.key_for(file, name)
+
+        file_id = await self.get(key, media_type)
+        if file_id:
+            try:
+                return await send_method(chat_id, file_id, **kwargs)
+            except TelegramBadRequest as e:
+                if not _is_stale_file_id(e):
+                    raise
+                # file_id устарел: загружаем файл заново
+                logging.warning(f"Cached file_id for {key} rejected: {e}")
+                await self.forget(key, media_type)
+
+        message = await send_method(chat_id, file, **kwargs)
+        sent = getattr(message, media_type)
+        # У фото несколько размеров, последний — самый большой
+        if isinstance(sent, list):
+            sent = sent[-1]
+        if sent:
+            await self.set(key, media_type, sent.file_id)
+        return message
@@ -0,0 +1,101 @@
+from abc import ABC, abstractmethod
+from datetime import timedelta
+
+from aiogram import Bot
+from aiogram.fsm.storage.redis import Redis
+from aiogram.types import Message
+
+
+class BaseMediaGroupStorage(ABC):
+    """
+    Буфер для частей альбома, пока они собираются в одну медиагруппу.
+    """
+
+    @abstractmethod
+    async def add(self, key: str, message: Message) -> bool:
+        """
+        Добавляет часть альбома в буфер.
+
+        :param key: Ключ медиагруппы.
+        :param message: Сообщение с частью альбома.
+        :return: True, если это первая часть группы. Обработчик первой
+         части отвечает за сборку всей группы.
+        """
+
+    @abstractmethod
+    async def size(self, key: str) -> int:
+        """Возвращает количество накопленных частей."""
+
+    @abstractmethod
+    async def pop(self, key: str, bot: Bot) -> list[Message]:
+        """
+        Забирает все накопленные части и очищает буфер.
+
+        :param key: Ключ медиагруппы.
+        :param bot: Экземпляр бота для привязки восстановленных сообщений.
+        :return: Список сообщений группы.
+        """
+
+
+class MemoryMediaGroupStorage(BaseMediaGroupStorage):
+    """
+    Буфер в памяти процесса. Подходит, если апдейты обрабатывает
+    один процесс.
+    """
+
+    def __init__(self):
+        self._groups: dict[str, list[Message]] = {}
+
+    async def add(self, key: str, message: Message) -> bool:
+        is_first = key not in self._groups
+        self._groups.setdefault(key, []).append(message)
+        return is_first
+
+    async def size(self, key: str) -> int:
+        return len(self._groups.get(key, ()))
+
+    async def pop(self, key: str, bot: Bot) -> list[Message]:
+        return self._groups.pop(key, [])
+
+
+class RedisMediaGroupStorage(BaseMediaGroupStorage):
+    """
+    Буфер в Redis. Нужен, когда части одного альбома могут попасть
+    в разные процессы.
+    """
+
+    def __init__(self, redis: Redis, ttl: timedelta = timedelta(minutes=1)):
+        """
+        :param redis: Клиент Redis.
+        :param ttl: Время жизни буфера на случай падения процесса-сборщика.
+        """
+        self.redis = redis
+        self.ttl = ttl
+
+    async def add(self, key: str, message: Message) -> bool:
+        parts_key, owner_key = self._build_keys(key)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.rpush(parts_key, message.model_dump_json(exclude_none=True))
+            pipe.expire(parts_key, self.ttl)
+            pipe.set(owner_key, 1, nx=True, ex=self.ttl)
+            _, _, is_first = await pipe.execute()
+        return bool(is_first)
+
+    async def size(self, key: str) -> int:
+        parts_key, _ = self._build_keys(key)
+        return await self.redis.llen(parts_key)
+
+    async def pop(self, key: str, bot: Bot) -> list[Message]:
+        parts_key, owner_key = self._build_keys(key)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.lrange(parts_key, 0, -1)
+            pipe.delete(parts_key, owner_key)
+            raw_parts, _ = await pipe.execute()
+        return [
+            Message.model_validate_json(raw, context={"bot": bot})
+            for raw in raw_parts
+        ]
+
+    @staticmethod
+    def _build_keys(key: str) -> tuple[str, str]:
+        return f"media_group:{key}:parts", f"media_group:{key}:owner"
@@ -1,7 +1,13 @@
 # flake8: noqa
 
+from bot.middleware.activity_middleware import ActivityMiddleware
 from bot.middleware.api_client_middleware import ApiClientMiddleware
 from bot.middleware.db_session_middleware import DBSessionMiddleware
 from bot.middleware.is_admin_middleware import IsAdminMiddleware
-
-# from bot.middleware.media_group_middleware import MediaGroupMiddleware
+from bot.middleware.media_group_middleware import MediaGroupMiddleware
+from bot.middleware.metrics_middleware import (
+    HandlerMetricsMiddleware,
+    TelegramRequestMetrics,
+    UpdateMetricsMiddleware,
+)
+from bot.middleware.throttling_middleware import ThrottlingMiddleware
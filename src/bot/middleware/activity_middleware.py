@@ -0,0 +1,23 @@
+from aiogram import BaseMiddleware
+from aiogram.types import User
+
+from bot.activity_tracker import ActivityTracker
+
+
+class ActivityMiddleware(BaseMiddleware):
+    def __init__(self, tracker: ActivityTracker):
+        """
+        Middleware для учёта последней активности пользователей.
+        Время активности пишется в базу пачками через ActivityTracker.
+
+        Регистрируется после антифлуда, поэтому учитываются только
+        события, дошедшие до хэндлера.
+        """
+        super().__init__()
+        self.tracker = tracker
+
+    async def __call__(self, handler, event, data: dict):
+        user: User | None = data.get("event_from_user")
+        if user:
+            self.tracker.touch(user.id)
+        return await handler(event, data)
@@ -1,31 +1,59 @@
+import asyncio
+import logging
+import time
+
 from aiogram import BaseMiddleware
-from aiogram.types import Update
-from sqlalchemy.ext.asyncio import AsyncSession
+from aiogram.types import User
+from sqlalchemy.ext.asyncio import async_sessionmaker
 
 from services import admin_service
+from utils import ServiceError
 
 
 class IsAdminMiddleware(BaseMiddleware):
+    def __init__(self, async_session: async_sessionmaker, ttl: float = 60.0):
+        """
+        Middleware, которое добавляет в data флаг is_admin.
+
+        Список администраторов читается из базы не чаще раза в ttl
+        секунд: middleware работает до фильтров (их использует
+        IsAdminFilter) и до антифлуда, поэтому не должно ходить в базу
+        на каждое сообщение.
+
+        :param async_session: Фабрика асинхронных сессий SQLAlchemy.
+        :param ttl: Сколько секунд хранить список администраторов.
+        """
+        super().__init__()
+        self.async_session = async_session
+        self.ttl = ttl
+        self._usernames: set[str] | None = None
+        self._expires_at = 0.0
+        self._lock = asyncio.Lock()
+
     async def __call__(self, handler, event, data: dict):
         """
         Проверяет, есть ли пользователь в таблице администраторов,
         и добавляет эту информацию в data.
         """
-        update: Update = event
-
-        if update.message:
-            username = update.message.from_user.username
-
-            if not username:
-                data["is_admin"] = False
-                return await handler(event, data)
-
-            db_session: AsyncSession = data.get("db_session")
-
-            data["is_admin"] = bool(
-                await admin_service.get_or_none(
-                    session=db_session, username=username
-                )
-            )
-
+        user: User | None = data.get("event_from_user")
+        username = user.username if user else None
+        data["is_admin"] = bool(username) and username in await self._admins()
         return await handler(event, data)
+
+    async def _admins(self) -> set[str]:
+        """
+        :return: Имена пользователей администраторов.
+        """
+        if self._usernames is not None and time.monotonic() < self._expires_at:
+            return self._usernames
+        async with self._lock:
+            if self._usernames is None or time.monotonic() >= self._expires_at:
+                try:
+                    async with self.async_session() as session:
+                        admins = await admin_service.list(session=session)
+                except ServiceError:
+                    logging.exception("Failed to load admins: ")
+                    return self._usernames or set()
+                self._usernames = {admin.username for admin in admins}
+                self._expires_at = time.monotonic() + self.ttl
+        return self._usernames
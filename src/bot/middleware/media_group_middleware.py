@@ -1,34 +1,110 @@
+import asyncio
+import logging
+
 from aiogram import BaseMiddleware
 from aiogram.types import Message, Update
+from sqlalchemy.ext.asyncio import async_sessionmaker
 
 from bot.helpers import extract_media_from_message
+from bot.media_group_storage import BaseMediaGroupStorage
 from services import media_group_service
+from utils import ServiceError
 
 
 class MediaGroupMiddleware(BaseMiddleware):
     """
-    Middleware для обработки всех сообщений с media_group_id.
-    Сохраняет информацию о медиафайлах из медиагрупп в базу данных.
+    Middleware для сборки медиагрупп (альбомов).
+
+    Части альбома копятся в хранилище, пока в течение latency секунд
+    не перестанут приходить новые. После этого вся группа сохраняется
+    в базу одной пачкой, а хэндлер вызывается один раз — для первого
+    сообщения альбома, со списком всех сообщений в data["album"].
+    Апдейты с остальными частями дальше по цепочке не передаются.
+
+    Пример использования:
+        @router.message(F.media_group_id)
+        async def album_handler(message: Message, album: list[Message]):
+            await message.answer(f"Получено файлов: {len(album)}")
     """
 
+    def __init__(
+        self,
+        storage: BaseMediaGroupStorage,
+        async_session: async_sessionmaker,
+        latency: float = 0.5,
+        max_wait: float = 5.0,
+    ):
+        """
+        :param storage: Хранилище частей альбома (в памяти или в Redis).
+        :param async_session: Фабрика сессий для сохранения альбома:
+         middleware работает раньше, чем сессия открывается для хэндлера.
+        :param latency: Сколько ждать следующую часть альбома, в секундах.
+        :param max_wait: Максимальное время сборки одного альбома.
+        """
+        super().__init__()
+        self.storage = storage
+        self.async_session = async_session
+        self.latency = latency
+        self.max_wait = max_wait
+
     async def __call__(self, handler, event: Update, data: dict):
-        if (
-            event.message
-            and isinstance(event.message, Message)
-            and event.message.media_group_id
-        ):
-            message = event.message
-            chat_id = message.chat.id
-            media_group_id = message.media_group_id
-
-            media = extract_media_from_message(message)
-
-            db_session = data.get("db_session")
-            await media_group_service.create(
-                session=db_session,
-                chat_id=chat_id,
-                media_group_id=media_group_id,
-                file_id=media["file_id"],
-                media_type=media["media_type"],
-            )
+        message = event.message
+        if not (isinstance(message, Message) and message.media_group_id):
+            return await handler(event, data)
+
+        key = f"{message.chat.id}:{message.media_group_id}"
+        if not await self.storage.add(key, message):
+            return None
+
+        await self._wait_for_parts(key)
+
+        album = await self.storage.pop(key, bot=data["bot"])
+        album.sort(key=lambda part: part.message_id)
+        await self._save_album(album)
+
+        data["album"] = album
         return await handler(event, data)
+
+    async def _wait_for_parts(self, key: str):
+        """
+        Ждёт, пока в течение latency секунд не перестанут
+        приходить новые части альбома.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_wait
+        size = await self.storage.size(key)
+        while loop.time() < deadline:
+            await asyncio.sleep(self.latency)
+            new_size = await self.storage.size(key)
+            if new_size == size:
+                return
+            size = new_size
+
+    async def _save_album(self, album: list[Message]):
+        """
+        Сохраняет все файлы альбома одной вставкой.
+        """
+        items_data = []
+        for part in album:
+            media = extract_media_from_message(part)
+            if not media:
+                continue
+            items_data.append(
+                {
+                    "chat_id": part.chat.id,
+                    "media_group_id": part.media_group_id,
+                    "message_id": part.message_id,
+                    "file_id": media["file_id"],
+                    "media_type": media["media_type"],
+                }
+            )
+        if not items_data:
+            return
+
+        try:
+            async with self.async_session() as session:
+                await media_group_service.bulk_create(
+                    session=session, items_data=items_data
+                )
+        except ServiceError:
+            logging.exception("Failed to save media group: ")
@@ -0,0 +1,119 @@
+import logging
+import time
+
+from aiogram import BaseMiddleware, Bot
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware
+from aiogram.dispatcher.event.bases import UNHANDLED
+from aiogram.methods import TelegramMethod
+from aiogram.types import Update
+
+from core import add_timing, collect_timings, metrics
+
+updates_total = metrics.counter(
+    "bot_updates_total",
+    "Processed updates by type and outcome",
+    ("update_type", "outcome"),
+)
+update_duration = metrics.histogram(
+    "bot_update_duration_seconds",
+    "Full processing time of an update",
+    ("update_type",),
+)
+update_wait = metrics.histogram(
+    "bot_update_wait_seconds",
+    "Time an update spent waiting for a resource (db, api, telegram)",
+    ("update_type", "resource"),
+)
+handler_duration = metrics.histogram(
+    "bot_handler_duration_seconds",
+    "Handler execution time",
+    ("router", "handler"),
+)
+telegram_request_duration = metrics.histogram(
+    "telegram_request_duration_seconds",
+    "Duration of Telegram Bot API requests",
+    ("method",),
+)
+
+
+class UpdateMetricsMiddleware(BaseMiddleware):
+    def __init__(self, slow_update_threshold: float):
+        """
+        Outer-middleware апдейтов: замеряет полное время обработки
+        апдейта, время ожидания базы и внешних API, считает исходы
+        (handled, unhandled, error) и пишет в лог медленные апдейты.
+
+        :param slow_update_threshold: Апдейты дольше этого срока
+         (в секундах) попадают в лог.
+        """
+        super().__init__()
+        self.slow_update_threshold = slow_update_threshold
+
+    async def __call__(self, handler, event: Update, data: dict):
+        update_type = event.event_type
+        # Заполняется HandlerMetricsMiddleware, которая видит хэндлер
+        handler_info: dict = {}
+        data["handler_info"] = handler_info
+
+        outcome = "error"
+        start = time.perf_counter()
+        with collect_timings() as timings:
+            try:
+                result = await handler(event, data)
+                outcome = "unhandled" if result is UNHANDLED else "handled"
+                return result
+            finally:
+                elapsed = time.perf_counter() - start
+                updates_total.inc(update_type=update_type, outcome=outcome)
+                update_duration.observe(elapsed, update_type=update_type)
+                for resource, seconds in timings.items():
+                    update_wait.observe(
+                        seconds, update_type=update_type, resource=resource
+                    )
+                if elapsed >= self.slow_update_threshold:
+                    waits = ", ".join(
+                        f"{resource}={seconds:.3f}s"
+                        for resource, seconds in timings.items()
+                    )
+                    logging.warning(
+                        f"Slow update {event.update_id} ({update_type}, "
+                        f"{outcome}) took {elapsed:.3f}s, handler "
+                        f"{handler_info.get('handler', '-')}"
+                        + (f", waited {waits}" if waits else "")
+                    )
+
+
+class HandlerMetricsMiddleware(BaseMiddleware):
+    """
+    Inner-middleware событий: замеряет время работы хэндлера
+    с разбивкой по роутерам и хэндлерам.
+    """
+
+    async def __call__(self, handler, event, data: dict):
+        callback = data["handler"].callback
+        router = data["event_router"].name
+        name = getattr(callback, "__qualname__", type(callback).__name__)
+        handler_info = data.get("handler_info")
+        if handler_info is not None:
+            handler_info["handler"] = f"{router}:{name}"
+
+        with handler_duration.time(router=router, handler=name):
+            return await handler(event, data)
+
+
+class TelegramRequestMetrics(BaseRequestMiddleware):
+    """
+    Middleware сессии бота: замеряет запросы к Bot API и добавляет
+    их длительность к времени ожидания текущего апдейта.
+    """
+
+    async def __call__(self, make_request, bot: Bot, method: TelegramMethod):
+        start = time.perf_counter()
+        try:
+            return await make_request(bot, method)
+        finally:
+            elapsed = time.perf_counter() - start
+            telegram_request_duration.observe(
+                elapsed, method=type(method).__name__
+            )
+            add_timing("telegram", elapsed)
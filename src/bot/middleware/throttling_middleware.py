@@ -0,0 +1,249 @@
+import asyncio
+import itertools
+import logging
+import time
+import uuid
+from collections import deque
+
+from aiogram import BaseMiddleware
+from aiogram.dispatcher.flags import get_flag
+from aiogram.fsm.storage.redis import Redis
+from aiogram.types import CallbackQuery, Message, User
+
+from config import ThrottlingConfig
+
+# Скользящее окно на sorted set: удаляет устаревшие отметки, добавляет
+# накопленные локально попадания и атомарно решает, пропускать ли событие.
+# Возвращает 0, если событие разрешено, иначе — через сколько мс
+# освободится место в окне.
+SLIDING_WINDOW_SCRIPT = """
+local key = KEYS[1]
+local now = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+local limit = tonumber(ARGV[3])
+
+for i = 5, #ARGV, 2 do
+    redis.call("ZADD", key, ARGV[i], ARGV[i + 1])
+end
+redis.call("ZREMRANGEBYSCORE", key, "-inf", now - period)
+
+local count = redis.call("ZCARD", key)
+if count < limit then
+    redis.call("ZADD", key, now, ARGV[4])
+    redis.call("PEXPIRE", key, period)
+    return 0
+end
+
+redis.call("PEXPIRE", key, period)
+local index = count - limit
+local edge = redis.call("ZRANGE", key, index, index, "WITHSCORES")
+return math.max(1, tonumber(edge[2]) + period - now)
+"""
+
+# Порог, после которого из локального кэша выкидываются молчащие ключи
+LOCAL_CACHE_CLEANUP_SIZE = 10_000
+
+
+class ThrottlingMiddleware(BaseMiddleware):
+    """
+    Middleware для ограничения частоты событий от одного пользователя.
+
+    Лимит считается скользящим окном в Redis (Lua-скрипт, атомарно),
+    поэтому он общий для всех процессов бота. С local_fast_path_hits
+    первые события молчавшего пользователя пропускаются локально, без
+    похода в Redis, а попадания досылаются в Redis при следующей
+    проверке того же ключа. Каждый процесс пропускает их независимо,
+    так что при N процессах в окно может пройти до
+    rate_limit + N * local_fast_path_hits событий; по умолчанию
+    быстрый путь выключен.
+
+    Лимиты по умолчанию берутся из ThrottlingConfig. Отдельному хэндлеру
+    можно задать свой лимит флагом "throttling" (True — лимит по
+    умолчанию, False — без лимита). Для отдельного роутера можно
+    зарегистрировать собственный экземпляр middleware со своим config
+    и scope.
+
+    Middleware нужно регистрировать как inner middleware на конкретных
+    типах событий (message, callback_query), иначе флаги хэндлера
+    недоступны, и раньше middleware, которые открывают сессию базы
+    и учитывают активность: лишние события должны отбрасываться до них.
+
+    Пример использования:
+        @router.message(
+            Command("report"),
+            flags={"throttling": {"rate_limit": 1, "period": 30,
+                                  "behavior": "warn"}},
+        )
+        async def report_handler(message: Message):
+            ...
+    """
+
+    def __init__(
+        self,
+        redis: Redis,
+        config: ThrottlingConfig,
+        scope: str = "default",
+    ):
+        """
+        :param redis: Клиент Redis, общий с хранилищем FSM.
+        :param config: Лимиты по умолчанию.
+        :param scope: Пространство ключей для лимитов по умолчанию.
+        """
+        super().__init__()
+        self.redis = redis
+        self.config = config
+        self.scope = scope
+        self.script = redis.register_script(SLIDING_WINDOW_SCRIPT)
+
+        self._handler_configs: dict[int, ThrottlingConfig] = {}
+        self._local_hits: dict[str, deque[int]] = {}
+        # Когда локальные попадания ключа выходят из окна (в мс):
+        # у ключей разных хэндлеров разная длина окна
+        self._local_expiry: dict[str, int] = {}
+        self._pending_hits: dict[str, list[int]] = {}
+        self._member_prefix = uuid.uuid4().hex[:8]
+        self._member_counter = itertools.count()
+
+    async def __call__(self, handler, event, data: dict):
+        user: User | None = data.get("event_from_user")
+        if user is None:
+            return await handler(event, data)
+
+        resolved = self._resolve_config(data)
+        if resolved is None:
+            return await handler(event, data)
+        config, scope = resolved
+
+        key = f"throttling:{scope}:{user.id}"
+        retry_after = await self._hit(key, config)
+        if not retry_after:
+            return await handler(event, data)
+
+        if config.behavior == "queue":
+            if await self._wait_for_slot(key, config, retry_after):
+                return await handler(event, data)
+        elif config.behavior == "warn":
+            await self._warn_once(key, config, event)
+
+        logging.info(f"Throttled event from user {user.id} ({scope})")
+        return None
+
+    def _resolve_config(
+        self, data: dict
+    ) -> tuple[ThrottlingConfig, str] | None:
+        """
+        Определяет лимит для текущего хэндлера с учётом его флагов.
+
+        :return: Пара (лимит, scope) или None, если троттлинг отключён.
+        """
+        handler_object = data.get("handler")
+        flag = get_flag(data, "throttling") if handler_object else None
+        if flag is None or flag is True:
+            return self.config, self.scope
+        if flag is False:
+            return None
+
+        callback = handler_object.callback
+        cache_key = id(callback)
+        if cache_key not in self._handler_configs:
+            self._handler_configs[cache_key] = ThrottlingConfig.model_validate(
+                {**self.config.model_dump(), **flag}
+            )
+        config = self._handler_configs[cache_key]
+        scope = flag.get(
+            "key", f"{callback.__module__}.{callback.__qualname__}"
+        )
+        return config, scope
+
+    async def _hit(self, key: str, config: ThrottlingConfig) -> int:
+        """
+        Регистрирует событие и проверяет лимит.
+
+        :return: 0, если событие разрешено, иначе задержка в мс.
+        """
+        now = int(time.time() * 1000)
+        if not config.local_fast_path_hits:
+            return await self._check_redis(key, config, now)
+
+        period = int(config.period * 1000)
+        local = self._local_hits.setdefault(key, deque())
+        while local and local[0] <= now - period:
+            local.popleft()
+
+        if len(local) < config.local_fast_path_hits:
+            local.append(now)
+            self._local_expiry[key] = now + period
+            self._pending_hits.setdefault(key, []).append(now)
+            self._cleanup_local_cache(now)
+            return 0
+
+        retry_after = await self._check_redis(key, config, now)
+        if not retry_after:
+            local.append(now)
+            self._local_expiry[key] = now + period
+        return retry_after
+
+    async def _check_redis(
+        self, key: str, config: ThrottlingConfig, now: int
+    ) -> int:
+        pending = self._pending_hits.pop(key, [])
+        args = [
+            now,
+            int(config.period * 1000),
+            config.rate_limit,
+            self._next_member(now),
+        ]
+        for timestamp in pending:
+            args.extend([timestamp, self._next_member(timestamp)])
+
+        try:
+            return int(await self.script(keys=[key], args=args))
+        except Exception:
+            # Антифлуд не должен ронять обработку апдейтов
+            logging.exception("Throttling check failed, letting event pass")
+            return 0
+
+    async def _wait_for_slot(
+        self, key: str, config: ThrottlingConfig, retry_after: int
+    ) -> bool:
+        """
+        Ждёт освобождения места в окне, но не дольше max_queue_delay.
+        """
+        deadline = time.monotonic() + config.max_queue_delay
+        while retry_after:
+            delay = retry_after / 1000
+            if time.monotonic() + delay > deadline:
+                return False
+            await asyncio.sleep(delay)
+            now = int(time.time() * 1000)
+            retry_after = await self._check_redis(key, config, now)
+        return True
+
+    async def _warn_once(self, key: str, config: ThrottlingConfig, event):
+        """
+        Отправляет предупреждение не чаще одного раза за окно.
+        """
+        if not isinstance(event, (Message, CallbackQuery)):
+            return
+        is_first = await self.redis.set(
+            f"{key}:warned", 1, nx=True, px=int(config.period * 1000)
+        )
+        if is_first:
+            await event.answer(config.warning_text)
+
+    def _next_member(self, timestamp: int) -> str:
+        sequence = next(self._member_counter)
+        return f"{timestamp}-{self._member_prefix}-{sequence}"
+
+    def _cleanup_local_cache(self, now: int):
+        """
+        Удаляет ключи пользователей, молчавших дольше окна своего ключа.
+        Их неотправленные попадания уже вне окна и на лимит не влияют.
+        """
+        if len(self._local_hits) < LOCAL_CACHE_CLEANUP_SIZE:
+            return
+        for key in list(self._local_hits):
+            if self._local_expiry.get(key, 0) <= now:
+                del self._local_hits[key]
+                self._local_expiry.pop(key, None)
+                self._pending_hits.pop(key, None)
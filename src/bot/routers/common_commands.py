@@ -7,7 +7,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from services import user_service
 
-router = Router()
+router = Router(name="common_commands")
 
 
 @router.message(Command("start"))
@@ -1,7 +1,6 @@
-import asyncio
 import logging
 
-from aiogram import Router
+from aiogram import Bot, Router
 from aiogram.exceptions import (
     TelegramAPIError,
     TelegramNetworkError,
@@ -10,23 +9,34 @@ from aiogram.exceptions import (
 from aiogram.filters import ExceptionTypeFilter
 from aiogram.types import ErrorEvent
 
-router = Router()
+from bot.delayed_retry import DelayedRetryQueue
 
+router = Router(name="errors")
 
-# Хэндлер для ошибки RetryAfter (слишком частые запросы)
+
+# Хэндлер для ошибки RetryAfter (слишком частые запросы).
+# Упавший запрос откладывается и будет отправлен, когда Telegram
+# разрешит, а обработка апдейтов продолжается
 @router.error(ExceptionTypeFilter(TelegramRetryAfter))
-async def handle_retry_after(event: ErrorEvent):
+async def handle_retry_after(
+    event: ErrorEvent, bot: Bot, retry_queue: DelayedRetryQueue
+):
     exception: TelegramRetryAfter = event.exception
     retry_after = exception.retry_after
-    logging.warning(f"Перегрузка, повторите через {retry_after} секунд.")
-    await asyncio.sleep(retry_after)
+    logging.warning(f"Перегрузка, повтор через {retry_after} секунд.")
+    retry_queue.schedule(bot, exception.method, retry_after)
     return True
 
 
 # Хэндлер для ошибки NetworkError (проблема с сетью)
 @router.error(ExceptionTypeFilter(TelegramNetworkError))
-async def handle_network_error(event: ErrorEvent):
-    logging.warning("Сетевая ошибка. Переподключение...")
+async def handle_network_error(
+    event: ErrorEvent, bot: Bot, retry_queue: DelayedRetryQueue
+):
+    logging.warning("Сетевая ошибка, запрос будет повторён.")
+    retry_queue.schedule(
+        bot, event.exception.method, retry_queue.network_backoff
+    )
     return True
 
 
@@ -0,0 +1,239 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable
+
+from aiogram import Bot, Dispatcher
+from aiogram.dispatcher.middlewares.user_context import UserContextMiddleware
+from aiogram.types import Update
+
+from bot.fsm_storage import fsm_cache_scope
+from bot.update_stream import UpdateStreamProducer
+from core import metrics
+
+queue_wait = metrics.histogram(
+    "bot_update_queue_wait_seconds",
+    "Time an update spent in a worker queue",
+)
+queue_full = metrics.counter(
+    "bot_update_queue_full_total",
+    "Updates that had to wait for space in a full worker queue",
+)
+
+
+class UpdateScheduler:
+    """
+    Планировщик обработки апдейтов на фиксированном пуле воркеров.
+
+    Апдейт попадает в очередь воркера по хэшу ID чата (или пользователя),
+    поэтому апдейты одного чата обрабатываются строго по порядку,
+    а разные чаты — параллельно. Очереди ограничены по размеру:
+    когда воркер не успевает, submit ждёт места в очереди, и это
+    притормаживает polling или вебхук.
+
+    Части альбомов идут через ту же очередь, но воркер не ждёт их
+    обработки: MediaGroupMiddleware ждёт остальные части альбома,
+    которые стоят в очереди следом. Перед следующим апдейтом не из
+    альбома воркер дожидается обработки альбомов, так что порядок
+    внутри чата сохраняется. Одновременно у воркера не больше
+    queue_size частей альбомов.
+    """
+
+    def __init__(
+        self,
+        process_update: Callable[..., Awaitable[Any]],
+        workers: int,
+        queue_size: int,
+    ):
+        """
+        :param process_update: Корутина обработки одного апдейта.
+        :param workers: Количество воркеров (и очередей).
+        :param queue_size: Максимальная длина очереди одного воркера.
+        """
+        self.process_update = process_update
+        self.queues: list[asyncio.Queue] = [
+            asyncio.Queue(maxsize=queue_size) for _ in range(workers)
+        ]
+        self._workers: list[asyncio.Task] = []
+        self._album_tasks: set[asyncio.Task] = set()
+
+        metrics.gauge(
+            "bot_update_queue_depth",
+            "Updates waiting in a worker queue",
+            lambda: {
+                (str(index),): queue.qsize()
+                for index, queue in enumerate(self.queues)
+            },
+            labelnames=("worker",),
+        )
+        metrics.gauge(
+            "bot_update_album_parts_in_flight",
+            "Album parts being processed outside the worker loop",
+            lambda: len(self._album_tasks),
+        )
+
+    async def start(self):
+        """
+        Запускает воркеры.
+        """
+        self._workers = [
+            asyncio.create_task(self._worker(queue)) for queue in self.queues
+        ]
+
+    async def submit(
+        self, bot: Bot, update: Update, **kwargs
+    ) -> asyncio.Future:
+        """
+        Ставит апдейт в очередь воркера его чата.
+
+        :param bot: Экземпляр бота.
+        :param update: Апдейт Telegram.
+        :param kwargs: Контекстные данные для обработчика.
+        :return: Future, который завершится после обработки апдейта.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        item = (loop.time(), bot, update, kwargs, future)
+
+        queue = self.queues[self._get_partition(update)]
+        if queue.full():
+            queue_full.inc()
+        await queue.put(item)
+        return future
+
+    def _get_partition(self, update: Update) -> int:
+        """
+        Выбирает очередь по ID чата, а если его нет — по ID пользователя.
+        """
+        context = UserContextMiddleware.resolve_event_context(update)
+        routing_id = context.chat_id or context.user_id or update.update_id
+        return hash(routing_id) % len(self.queues)
+
+    async def _worker(self, queue: asyncio.Queue):
+        albums: set[asyncio.Task] = set()
+        while True:
+            item = await queue.get()
+            update = item[2]
+            try:
+                if update.message and update.message.media_group_id:
+                    if len(albums) >= queue.maxsize > 0:
+                        await asyncio.wait(
+                            albums, return_when=asyncio.FIRST_COMPLETED
+                        )
+                    task = asyncio.create_task(self._process(*item))
+                    for tasks in (albums, self._album_tasks):
+                        tasks.add(task)
+                        task.add_done_callback(tasks.discard)
+                    continue
+                if albums:
+                    await asyncio.wait(albums)
+                await self._process(*item)
+            finally:
+                queue.task_done()
+
+    async def _process(
+        self,
+        enqueued_at: float,
+        bot: Bot,
+        update: Update,
+        kwargs: dict,
+        future: asyncio.Future,
+    ):
+        queue_wait.observe(asyncio.get_running_loop().time() - enqueued_at)
+        try:
+            result = await self.process_update(bot, update, **kwargs)
+            if not future.done():
+                future.set_result(result)
+        except Exception as e:
+            logging.exception(
+                f"Exception while processing update {update.update_id}"
+            )
+            if not future.done():
+                future.set_exception(e)
+                # Исключение уже залогировано, помечаем его полученным,
+                # чтобы asyncio не ругался, если результат никто не ждёт
+                future.exception()
+
+    async def shutdown(self, timeout: float = 10.0):
+        """
+        Дожидается обработки уже принятых апдейтов и останавливает воркеры.
+
+        :param timeout: Сколько ждать опустошения очередей, в секундах.
+        """
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(queue.join() for queue in self.queues)),
+                timeout=timeout,
+            )
+            if self._album_tasks:
+                await asyncio.wait(self._album_tasks, timeout=timeout)
+        except asyncio.TimeoutError:
+            logging.warning("Update queues were not drained before shutdown")
+
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+
+class ScheduledDispatcher(Dispatcher):
+    """
+    Диспетчер, который отдаёт апдейты из polling и вебхуков дальше:
+    - в UpdateStreamProducer, если он подключён (режим приёмника);
+    - в UpdateScheduler, если он подключён;
+    - иначе обрабатывает их как обычный Dispatcher.
+
+    Каждый апдейт обрабатывается внутри fsm_cache_scope, чтобы
+    хранилище FSM могло кэшировать состояние на время апдейта.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.update_scheduler: UpdateScheduler | None = None
+        self.update_producer: UpdateStreamProducer | None = None
+
+    async def feed_update(self, bot: Bot, update: Update, **kwargs):
+        with fsm_cache_scope():
+            return await super().feed_update(bot, update, **kwargs)
+
+    async def _process_update(
+        self, bot: Bot, update: Update, call_answer: bool = True, **kwargs
+    ) -> bool:
+        if self.update_producer is not None:
+            # Исключение отсюда остановило бы polling насовсем
+            try:
+                await self.update_producer.submit(bot, update)
+            except Exception:
+                logging.exception(
+                    f"Dropped update {update.update_id}: "
+                    "failed to publish it to the stream"
+                )
+                return False
+            return True
+        if self.update_scheduler is None:
+            return await super()._process_update(
+                bot, update, call_answer=call_answer, **kwargs
+            )
+        await self.update_scheduler.submit(
+            bot, update, call_answer=call_answer, **kwargs
+        )
+        return True
+
+    async def _feed_webhook_update(self, bot: Bot, update: Update, **kwargs):
+        if self.update_producer is not None:
+            await self.update_producer.submit(bot, update)
+            return None
+        if self.update_scheduler is None:
+            return await super()._feed_webhook_update(bot, update, **kwargs)
+        # Ответ на вебхук отправляется отдельным запросом из воркера
+        await self.update_scheduler.submit(bot, update, **kwargs)
+        return None
+
+    async def process_scheduled_update(
+        self, bot: Bot, update: Update, call_answer: bool = True, **kwargs
+    ) -> bool:
+        """
+        Обрабатывает апдейт, взятый из очереди воркера или из стрима.
+        """
+        return await super()._process_update(
+            bot, update, call_answer=call_answer, **kwargs
+        )
@@ -0,0 +1,503 @@
+import asyncio
+import logging
+import os
+import socket
+from collections import deque
+from typing import Any, Awaitable, Callable
+
+from aiogram import Bot
+from aiogram.dispatcher.middlewares.user_context import UserContextMiddleware
+from aiogram.fsm.storage.redis import Redis
+from aiogram.types import Update
+from redis.exceptions import ResponseError
+
+# Сколько помнить обработанные update_id для дедупликации
+DEDUP_TTL_SECONDS = 60 * 60
+
+# Отметка «апдейт уже видели» и публикация в стрим одной операцией:
+# если XADD не выполнится, отметка тоже не останется
+PUBLISH_SCRIPT = """
+if not redis.call("SET", KEYS[2], 1, "NX", "EX", ARGV[1]) then
+    return false
+end
+return redis.call(
+    "XADD", KEYS[1], "MAXLEN", "~", ARGV[2], "*",
+    "update_id", ARGV[3], "payload", ARGV[4]
+)
+"""
+
+# Значение ключа обработки апдейта после успешной обработки
+DONE = b"done"
+
+# Продление ключа обработки, только если он всё ещё наш.
+# KEYS: ключ обработки; ARGV: значение, срок в мс
+RENEW_CLAIM_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("PEXPIRE", KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+# Снятие ключа обработки, только если он всё ещё наш.
+# KEYS: ключ обработки; ARGV: значение
+RELEASE_CLAIM_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("DEL", KEYS[1])
+end
+return 0
+"""
+
+
+class UpdateStreamProducer:
+    """
+    Приёмник апдейтов: складывает сырые апдейты в Redis Stream,
+    откуда их разбирают воркеры (UpdateStreamConsumer).
+
+    Апдейт с уже виденным update_id повторно не публикуется
+    (например, после перезапуска приёмника Telegram может
+    прислать неподтверждённые апдейты ещё раз).
+
+    Апдейты одного чата должны публиковаться по порядку, поэтому
+    polling в этом режиме обрабатывает апдейты последовательно.
+    Неудачная публикация (таймаут Redis и т.п.) повторяется
+    с экспоненциальной задержкой.
+    """
+
+    def __init__(
+        self,
+        redis: Redis,
+        stream: str,
+        maxlen: int,
+        attempts: int = 5,
+        backoff: float = 0.5,
+        backoff_max: float = 10.0,
+    ):
+        """
+        :param redis: Клиент Redis.
+        :param stream: Имя стрима.
+        :param maxlen: Примерный предел длины стрима.
+        :param attempts: Сколько всего попыток публикации делать.
+        :param backoff: Задержка перед первым повтором в секундах,
+         дальше она удваивается.
+        :param backoff_max: Предел задержки.
+        """
+        self.redis = redis
+        self.stream = stream
+        self.maxlen = maxlen
+        self.attempts = attempts
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.script = redis.register_script(PUBLISH_SCRIPT)
+
+    async def submit(self, bot: Bot, update: Update, **kwargs):
+        """
+        Публикует апдейт в стрим, повторяя неудачные попытки.
+
+        :param bot: Экземпляр бота (в стрим не передаётся).
+        :param update: Апдейт Telegram.
+        :raises Exception: Ошибка последней попытки, если все попытки
+         не удались.
+        """
+        payload = update.model_dump_json(exclude_unset=True)
+        for attempt in range(1, self.attempts + 1):
+            try:
+                # Скрипт кэшируется в Redis по SHA; после SCRIPT FLUSH или
+                # перезапуска Redis redis-py сам загружает его заново
+                await self.script(
+                    keys=[
+                        self.stream,
+                        f"{self.stream}:seen:{update.update_id}",
+                    ],
+                    args=[
+                        DEDUP_TTL_SECONDS,
+                        self.maxlen,
+                        update.update_id,
+                        payload,
+                    ],
+                )
+                return
+            except Exception:
+                if attempt == self.attempts:
+                    raise
+                delay = min(
+                    self.backoff * 2 ** (attempt - 1), self.backoff_max
+                )
+                logging.warning(
+                    f"Failed to publish update {update.update_id} "
+                    f"(attempt {attempt}), retrying in {delay:.1f}s",
+                    exc_info=True,
+                )
+                await asyncio.sleep(delay)
+
+
+class UpdateStreamConsumer:
+    """
+    Воркер, разбирающий апдейты из Redis Stream в составе
+    consumer group. Таких воркеров можно запустить сколько угодно,
+    в том числе на разных машинах.
+
+    - Апдейт подтверждается (XACK) только после обработки.
+    - Апдейты, которые взял упавший или зависший воркер и не
+      подтвердил за min_idle_time, забираются (XAUTOCLAIM)
+      и обрабатываются повторно.
+    - Перед обработкой воркер атомарно (SET NX) занимает update_id на
+      min_idle_time, а после обработки помечает его выполненным, поэтому
+      апдейт, который был обработан, но не подтверждён, второй раз не
+      выполняется, и два воркера не обрабатывают его одновременно.
+      Пока хэндлер работает, воркер продлевает занятие и обновляет
+      запись в стриме (XCLAIM), так что долгий хэндлер у него
+      не заберут. Если занятие всё же потеряно, обработка отменяется.
+    - Апдейт, который доставлялся больше max_deliveries раз (хэндлер
+      каждый раз падал), переносится в стрим dead_letter_stream
+      и подтверждается, чтобы не повторяться бесконечно.
+    - Апдейты одного чата обрабатываются по порядку, разных чатов —
+      параллельно. Чтение стрима не ждёт обработки прочитанного: у
+      каждого чата своя очередь, и медленный чат не задерживает
+      остальные. Новые апдейты не читаются, пока в обработке больше
+      max_in_flight апдейтов.
+    - Части альбома, как и в UpdateScheduler, запускаются без ожидания:
+      MediaGroupMiddleware первой части ждёт остальные, которые идут
+      следом. Следующий апдейт чата не из альбома ждёт их обработки.
+    """
+
+    def __init__(
+        self,
+        redis: Redis,
+        bot: Bot,
+        process_update: Callable[[Update], Awaitable[Any]],
+        stream: str,
+        group: str,
+        batch_size: int = 100,
+        block_ms: int = 5000,
+        min_idle_time_ms: int = 60_000,
+        max_in_flight: int = 1000,
+        max_deliveries: int = 5,
+        dead_letter_stream: str | None = None,
+    ):
+        """
+        :param redis: Клиент Redis.
+        :param bot: Экземпляр бота, к которому привязываются апдейты.
+        :param process_update: Корутина обработки одного апдейта.
+        :param stream: Имя стрима.
+        :param group: Имя consumer group.
+        :param batch_size: Сколько апдейтов читать за раз.
+        :param block_ms: Сколько ждать новых апдейтов в одном запросе.
+        :param min_idle_time_ms: Через сколько неподтверждённый апдейт
+         считается брошенным и забирается другим воркером.
+        :param max_in_flight: Сколько прочитанных апдейтов может
+         одновременно ждать обработки.
+        :param max_deliveries: После скольких доставок апдейт
+         переносится в dead_letter_stream.
+        :param dead_letter_stream: Стрим для апдейтов, которые не
+         удалось обработать (по умолчанию `<stream>:dead`).
+        """
+        self.redis = redis
+        self.bot = bot
+        self.process_update = process_update
+        self.stream = stream
+        self.group = group
+        self.batch_size = batch_size
+        self.block_ms = block_ms
+        self.min_idle_time_ms = min_idle_time_ms
+        self.max_in_flight = max_in_flight
+        self.max_deliveries = max_deliveries
+        self.dead_letter_stream = dead_letter_stream or f"{stream}:dead"
+        self.consumer_name = f"{socket.gethostname()}-{os.getpid()}"
+
+        self._running = False
+        self._consume_task: asyncio.Task | None = None
+        self._reclaim_task: asyncio.Task | None = None
+        self._chat_queues: dict[Any, deque[tuple[Any, Update]]] = {}
+        self._chat_tasks: dict[Any, asyncio.Task] = {}
+        self._in_flight = 0
+        self._has_capacity = asyncio.Event()
+        self._has_capacity.set()
+        self._renew_claim = redis.register_script(RENEW_CLAIM_SCRIPT)
+        self._release_claim = redis.register_script(RELEASE_CLAIM_SCRIPT)
+
+    async def start(self):
+        """
+        Создаёт consumer group (если её нет) и запускает чтение стрима.
+        """
+        try:
+            await self.redis.xgroup_create(
+                self.stream, self.group, id="0", mkstream=True
+            )
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+        self._running = True
+        self._consume_task = asyncio.create_task(self._consume())
+        self._reclaim_task = asyncio.create_task(self._reclaim())
+
+    async def shutdown(self, timeout: float = 30.0):
+        """
+        Прекращает чтение стрима и дожидается обработки уже прочитанных
+        апдейтов. Если это не удалось за timeout секунд, неподтверждённые
+        апдейты заберут другие воркеры.
+        """
+        self._running = False
+        self._has_capacity.set()
+        if self._reclaim_task:
+            self._reclaim_task.cancel()
+            await asyncio.gather(self._reclaim_task, return_exceptions=True)
+        if self._consume_task:
+            await asyncio.gather(self._consume_task, return_exceptions=True)
+
+        chat_tasks = list(self._chat_tasks.values())
+        if chat_tasks:
+            _, pending = await asyncio.wait(chat_tasks, timeout=timeout)
+            if pending:
+                logging.warning("Stream updates were not handled in time")
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _consume(self):
+        while self._running:
+            await self._has_capacity.wait()
+            if not self._running:
+                break
+            try:
+                response = await self.redis.xreadgroup(
+                    self.group,
+                    self.consumer_name,
+                    {self.stream: ">"},
+                    count=self.batch_size,
+                    block=self.block_ms,
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logging.exception("Failed to read updates from stream")
+                await asyncio.sleep(1)
+                continue
+
+            for _, entries in response:
+                await self._dispatch_entries(entries)
+
+    async def _reclaim(self):
+        while True:
+            await asyncio.sleep(self.min_idle_time_ms / 1000)
+            try:
+                start_id = "0-0"
+                while True:
+                    start_id, entries, *_ = await self.redis.xautoclaim(
+                        self.stream,
+                        self.group,
+                        self.consumer_name,
+                        min_idle_time=self.min_idle_time_ms,
+                        start_id=start_id,
+                        count=self.batch_size,
+                    )
+                    entries = await self._drop_undeliverable(entries)
+                    if entries:
+                        logging.warning(
+                            f"Reclaimed {len(entries)} stuck updates"
+                        )
+                        await self._dispatch_entries(entries)
+                    if start_id in (b"0-0", "0-0"):
+                        break
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logging.exception("Failed to reclaim stuck updates")
+
+    async def _drop_undeliverable(self, entries: list) -> list:
+        """
+        Переносит в dead_letter_stream забранные апдейты, которые
+        доставлялись больше max_deliveries раз, и подтверждает их.
+
+        :return: Остальные апдейты.
+        """
+        # XAUTOCLAIM отдаёт None для уже удалённых из стрима записей
+        entries = [entry for entry in entries if entry[1]]
+        if not entries:
+            return entries
+        pending = await self.redis.xpending_range(
+            self.stream,
+            self.group,
+            min=entries[0][0],
+            max=entries[-1][0],
+            count=len(entries),
+            consumername=self.consumer_name,
+        )
+        deliveries = {
+            item["message_id"]: item["times_delivered"] for item in pending
+        }
+
+        alive = []
+        for entry_id, fields in entries:
+            delivered = deliveries.get(entry_id, 0)
+            if delivered <= self.max_deliveries:
+                alive.append((entry_id, fields))
+                continue
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.xadd(
+                    self.dead_letter_stream,
+                    {
+                        **fields,
+                        b"entry_id": entry_id,
+                        b"deliveries": delivered,
+                    },
+                )
+                pipe.xack(self.stream, self.group, entry_id)
+                await pipe.execute()
+            logging.error(
+                f"Update {fields.get(b'update_id', b'?').decode()} failed "
+                f"{delivered} deliveries, moved to {self.dead_letter_stream}"
+            )
+        return alive
+
+    async def _dispatch_entries(self, entries: list):
+        """
+        Раскладывает прочитанные апдейты по очередям их чатов и, если
+        нужно, запускает обработку очереди чата. Обработки не ждёт.
+        """
+        for entry_id, fields in entries:
+            # XAUTOCLAIM отдаёт None для уже удалённых из стрима записей
+            if not fields:
+                continue
+            try:
+                update = Update.model_validate_json(
+                    fields[b"payload"], context={"bot": self.bot}
+                )
+            except ValueError:
+                # Повтор не поможет: запись подтверждается и пропускается
+                logging.exception(f"Malformed update in stream {entry_id}")
+                await self.redis.xack(self.stream, self.group, entry_id)
+                continue
+            context = UserContextMiddleware.resolve_event_context(update)
+            chat = context.chat_id or context.user_id or update.update_id
+
+            self._chat_queues.setdefault(chat, deque()).append(
+                (entry_id, update)
+            )
+            self._in_flight += 1
+            if chat not in self._chat_tasks:
+                self._chat_tasks[chat] = asyncio.create_task(
+                    self._run_chat(chat)
+                )
+
+        if self._in_flight >= self.max_in_flight:
+            self._has_capacity.clear()
+
+    async def _run_chat(self, chat):
+        """
+        Обрабатывает очередь одного чата по порядку и завершается,
+        когда очередь опустеет.
+        """
+        queue = self._chat_queues[chat]
+        albums: set[asyncio.Task] = set()
+        try:
+            while queue or albums:
+                if not queue:
+                    await asyncio.wait(albums)
+                    continue
+                entry_id, update = queue.popleft()
+                if update.message and update.message.media_group_id:
+                    task = asyncio.create_task(
+                        self._handle_entry(entry_id, update)
+                    )
+                    albums.add(task)
+                    task.add_done_callback(albums.discard)
+                    task.add_done_callback(lambda _: self._release())
+                    continue
+                if albums:
+                    await asyncio.wait(albums)
+                try:
+                    await self._handle_entry(entry_id, update)
+                finally:
+                    self._release()
+        finally:
+            for task in albums:
+                task.cancel()
+            await asyncio.gather(*albums, return_exceptions=True)
+            # Необработанные апдейты останутся неподтверждёнными
+            self._release(len(queue))
+            del self._chat_queues[chat]
+            del self._chat_tasks[chat]
+
+    def _release(self, count: int = 1):
+        self._in_flight -= count
+        if self._in_flight < self.max_in_flight:
+            self._has_capacity.set()
+
+    async def _handle_entry(self, entry_id, update: Update):
+        key = f"{self.stream}:done:{update.update_id}"
+        claim = f"processing:{self.consumer_name}".encode()
+        try:
+            claimed = await self.redis.set(
+                key, claim, nx=True, px=self.min_idle_time_ms
+            )
+            if not claimed:
+                if await self.redis.get(key) == DONE:
+                    await self.redis.xack(self.stream, self.group, entry_id)
+                # Иначе апдейт сейчас обрабатывает другой воркер
+                return
+        except Exception:
+            logging.exception(f"Failed to claim update {update.update_id}")
+            return
+
+        handling = asyncio.create_task(self.process_update(update))
+        keep_alive = asyncio.create_task(
+            self._keep_claim(key, claim, entry_id, handling)
+        )
+        try:
+            await handling
+        except asyncio.CancelledError:
+            if not (keep_alive.done() and keep_alive.result()):
+                raise
+            # Занятие перешло к другому воркеру, апдейт обработает он
+            return
+        except Exception:
+            # Апдейт останется неподтверждённым и будет забран повторно
+            logging.exception(f"Failed to handle update {update.update_id}")
+            await self._release_claim(keys=[key], args=[claim])
+            return
+        finally:
+            keep_alive.cancel()
+        await self.redis.set(key, DONE, ex=DEDUP_TTL_SECONDS)
+        await self.redis.xack(self.stream, self.group, entry_id)
+
+    async def _keep_claim(
+        self, key: str, claim: bytes, entry_id, handling: asyncio.Task
+    ) -> bool:
+        """
+        Продлевает занятие апдейта и обновляет время простоя записи
+        в стриме, пока хэндлер работает. Если занятие потеряно,
+        обработка отменяется.
+
+        :return: True, если занятие было потеряно.
+        """
+        loop = asyncio.get_running_loop()
+        interval = self.min_idle_time_ms / 1000 / 3
+        renewed_at = loop.time()
+        while not handling.done():
+            await asyncio.sleep(interval)
+            try:
+                renewed = await self._renew_claim(
+                    keys=[key], args=[claim, self.min_idle_time_ms]
+                )
+                if renewed:
+                    # JUSTID не увеличивает счётчик доставок
+                    await self.redis.xclaim(
+                        self.stream,
+                        self.group,
+                        self.consumer_name,
+                        min_idle_time=0,
+                        message_ids=[entry_id],
+                        justid=True,
+                    )
+                    renewed_at = loop.time()
+                    continue
+                logging.error(f"Lost claim on update {key}, cancelling it")
+            except Exception:
+                logging.exception(f"Failed to renew claim on update {key}")
+                if loop.time() - renewed_at < self.min_idle_time_ms / 1000:
+                    continue
+                logging.error(f"Claim on update {key} expired, cancelling it")
+            handling.cancel()
+            return True
+        return False
@@ -3,9 +3,11 @@ import logging
 from functools import wraps
 
 import typer
+from redis.asyncio import Redis
 
 from config import settings
 from database import DatabaseManager
+from scheduled_jobs.reminder_index import ReminderIndex
 from services import admin_service
 from utils import hash_password
 
@@ -61,5 +63,31 @@ async def create_admin(username: str, password: str):
         database_manager.engine.dispose()
 
 
+@app.command()
+@typer_async
+async def rebuild_reminder_index():
+    """
+    Пересобирает индекс кандидатов на напоминание в Redis по базе.
+    """
+    database_manager = DatabaseManager(
+        database_config=settings.database_config
+    )
+    redis = Redis(
+        host=settings.redis_config.redis_host,
+        port=settings.redis_config.redis_port,
+        db=settings.redis_config.redis_db,
+    )
+    try:
+        indexed = await ReminderIndex(redis).rebuild(
+            database_manager.async_session
+        )
+        print(f"Reminder index rebuilt: {indexed} users")
+    except Exception:
+        logging.exception("Exception in rebuild_reminder_index:")
+    finally:
+        await redis.aclose()
+        await database_manager.engine.dispose()
+
+
 if __name__ == "__main__":
     app()
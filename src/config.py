@@ -1,6 +1,6 @@
 import pathlib
 from datetime import timedelta
-from typing import List
+from typing import List, Literal
 
 from pydantic import BaseModel, Field, SecretStr
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -19,6 +19,12 @@ class RedisConfig(BaseModel):
     redis_db: int
     state_ttl: timedelta = timedelta(weeks=2)
     data_ttl: timedelta = timedelta(weeks=2)
+    max_connections: int = 50
+    socket_timeout: float = 5.0
+    socket_connect_timeout: float = 5.0
+    health_check_interval: int = 30
+    fsm_serializer: Literal["json", "msgpack"] = "msgpack"
+    fsm_local_cache: bool = True
 
 
 class AdminConfig(BaseModel):
@@ -28,11 +34,165 @@ class AdminConfig(BaseModel):
 
 class BotConfig(BaseModel):
     bot_token: SecretStr
+    media_group_storage: Literal["memory", "redis"] = "memory"
+    media_group_latency: float = 0.5
+    update_workers: int = 0
+    update_queue_size: int = 100
+    update_mode: Literal["polling", "intake", "worker"] = "polling"
+    update_stream: str = "bot:updates"
+    update_stream_group: str = "bot-workers"
+    update_stream_maxlen: int = 100_000
+    update_stream_max_deliveries: int = 5
+    activity_flush_interval: float = 5.0
+    send_retry_attempts: int = 3
+    slow_update_threshold: float = 1.0
+
+
+class ThrottlingConfig(BaseModel):
+    """
+    Лимиты антифлуда для одного пользователя.
+
+    - rate_limit: сколько событий разрешено за period секунд.
+    - behavior: что делать с лишними событиями:
+        - "drop": молча отбросить;
+        - "queue": подождать освобождения окна (не дольше max_queue_delay);
+        - "warn": один раз за окно ответить предупреждением и отбросить.
+    - local_fast_path_hits: сколько событий в окне пропускать без
+      обращения к Redis, если пользователь до этого молчал. Каждый
+      процесс пропускает их сам, поэтому лимит становится нестрогим:
+      при N процессах в окно проходит до
+      rate_limit + N * local_fast_path_hits событий.
+    """
+
+    rate_limit: int = 5
+    period: float = 1.0
+    behavior: Literal["drop", "queue", "warn"] = "drop"
+    max_queue_delay: float = 5.0
+    warning_text: str = "Слишком много запросов, подождите немного."
+    local_fast_path_hits: int = 0
+
+
+class SchedulerConfig(BaseModel):
+    """
+    Настройки планировщика задач.
+
+    - job_lock: запускать задачи под распределённой блокировкой в Redis,
+      чтобы при нескольких репликах каждая задача выполнялась один раз.
+    - lock_lease: срок аренды блокировки в секундах (продлевается,
+      пока задача выполняется).
+    - persistent_jobs: хранить задачи и время их следующего запуска
+      в Redis, чтобы перезапуск не терял пропущенные запуски.
+      APScheduler 3 не поддерживает общее хранилище у нескольких
+      планировщиков, поэтому при нескольких репликах включайте его
+      только на одной из них; остальные держат задачи в памяти
+      и полагаются на job_lock.
+    - thread_workers, process_workers: размеры пулов для тяжёлых задач.
+    - max_heavy_jobs: сколько тяжёлых задач (в потоках и процессах)
+      может выполняться одновременно.
+    - reminder_hour: час (по местному времени пользователя), с которого
+      начинается рассылка напоминаний.
+    - reminder_window: длительность окна рассылки в минутах.
+    - reminder_index: выбирать кандидатов на напоминание из индекса
+      в Redis, а не запросом к таблице users.
+    """
+
+    job_lock: bool = True
+    lock_lease: float = 30.0
+    persistent_jobs: bool = False
+    key_prefix: str = "scheduler"
+    thread_workers: int = 4
+    process_workers: int = 2
+    max_heavy_jobs: int = 2
+    reminder_hour: int = 9
+    reminder_window: int = 180
+    reminder_index: bool = False
+
+
+class TaskQueueConfig(BaseModel):
+    """
+    Настройки очереди фоновых задач в Redis.
+
+    - enabled: задачи планировщика не выполняются в процессе
+      приложения, а ставятся в очередь для воркеров
+      (python src/main.py worker).
+    - concurrency: сколько задач воркер выполняет одновременно.
+    - max_retries: сколько раз повторять упавшую задачу.
+    - retry_backoff, retry_backoff_max: задержка перед первым повтором
+      и её предел в секундах (задержка удваивается с каждой попыткой).
+    - timeout: предельная длительность задачи в секундах.
+    - result_ttl: сколько хранить статус и результат задачи в секундах.
+    """
+
+    enabled: bool = False
+    concurrency: int = 4
+    max_retries: int = 3
+    retry_backoff: float = 5.0
+    retry_backoff_max: float = 300.0
+    timeout: float = 600.0
+    result_ttl: int = 86400
+    key_prefix: str = "tasks"
 
 
 class ApiClientConfig(BaseModel):
+    """
+    Настройки клиентов внешних API.
+
+    - connect_timeout, read_timeout, total_timeout: таймауты запроса
+      в секундах (подключение, ожидание данных, запрос целиком).
+    - connection_limit: предел соединений пула (0 — без предела).
+    - connection_limit_per_host: предел соединений к одному хосту
+      (0 — без предела).
+    - keepalive_timeout: сколько секунд держать простаивающее
+      соединение открытым.
+    - dns_cache_ttl: сколько секунд кэшировать DNS-ответы.
+    - session_per_upstream: отдельная сессия (и пул соединений) на
+      каждый сервис, чтобы медленный сервис не занимал соединения
+      остальных.
+    - retry_attempts, retry_backoff, retry_backoff_max: повторы
+      идемпотентных запросов после сбоев сервиса.
+    - breaker_failure_threshold: сколько сбоев подряд размыкает
+      автомат защиты сервиса.
+    - breaker_recovery_timeout: через сколько секунд после размыкания
+      пробовать сервис снова.
+    - response_cache: кэшировать ответы на GET-запросы get_by_id и list.
+    - cache_max_entries: предел ответов в памяти процесса.
+    - cache_ttl: время жизни ответа, если сервис не прислал
+      Cache-Control.
+    - cache_stale_ttl: сколько секунд после устаревания отдавать
+      ответ из кэша, обновляя его в фоне.
+    - cache_redis: хранить ответы ещё и в Redis, общем для процессов.
+    - coalesce_requests: объединять одинаковые одновременные
+      GET-запросы в один запрос к сервису.
+    - bulk_chunk_size, bulk_concurrency: bulk_create отправляет записи
+      частями по bulk_chunk_size, до bulk_concurrency частей сразу.
+    - get_many_concurrency: сколько запросов get_many одного клиента
+      выполняется одновременно.
+    """
+
     some_api_url: str
     some_other_api_url: str
+    connect_timeout: float = 5.0
+    read_timeout: float = 30.0
+    total_timeout: float = 60.0
+    connection_limit: int = 100
+    connection_limit_per_host: int = 0
+    keepalive_timeout: float = 15.0
+    dns_cache_ttl: int = 300
+    session_per_upstream: bool = False
+    retry_attempts: int = 3
+    retry_backoff: float = 0.5
+    retry_backoff_max: float = 10.0
+    breaker_failure_threshold: int = 5
+    breaker_recovery_timeout: float = 30.0
+    response_cache: bool = False
+    cache_max_entries: int = 1024
+    cache_ttl: float = 60.0
+    cache_stale_ttl: float = 0.0
+    cache_redis: bool = False
+    coalesce_requests: bool = True
+    bulk_chunk_size: int = 500
+    bulk_concurrency: int = 4
+    get_many_concurrency: int = 10
 
 
 class ServerConfig(BaseModel):
@@ -76,13 +236,78 @@ class Settings(BaseSettings):
     redis_host: str
     redis_port: int
     redis_db: int
+    redis_max_connections: int = 50
+    fsm_serializer: Literal["json", "msgpack"] = "msgpack"
+    fsm_local_cache: bool = True
 
     # API client settings
     some_api_url: str
     some_other_api_url: str
+    api_client_connect_timeout: float = 5.0
+    api_client_read_timeout: float = 30.0
+    api_client_total_timeout: float = 60.0
+    api_client_connection_limit: int = 100
+    api_client_connection_limit_per_host: int = 0
+    api_client_keepalive_timeout: float = 15.0
+    api_client_dns_cache_ttl: int = 300
+    api_client_session_per_upstream: bool = False
+    api_client_retry_attempts: int = 3
+    api_client_retry_backoff: float = 0.5
+    api_client_retry_backoff_max: float = 10.0
+    api_client_breaker_failure_threshold: int = 5
+    api_client_breaker_recovery_timeout: float = 30.0
+    api_client_response_cache: bool = False
+    api_client_cache_max_entries: int = 1024
+    api_client_cache_ttl: float = 60.0
+    api_client_cache_stale_ttl: float = 0.0
+    api_client_cache_redis: bool = False
+    api_client_coalesce_requests: bool = True
+    api_client_bulk_chunk_size: int = 500
+    api_client_bulk_concurrency: int = 4
+    api_client_get_many_concurrency: int = 10
 
     # Bot settings
     bot_token: str
+    media_group_storage: Literal["memory", "redis"] = "memory"
+    media_group_latency: float = 0.5
+    update_workers: int = 0
+    update_queue_size: int = 100
+    update_mode: Literal["polling", "intake", "worker"] = "polling"
+    update_stream: str = "bot:updates"
+    update_stream_group: str = "bot-workers"
+    update_stream_maxlen: int = 100_000
+    update_stream_max_deliveries: int = 5
+    activity_flush_interval: float = 5.0
+    send_retry_attempts: int = 3
+    slow_update_threshold: float = 1.0
+
+    # Throttling settings
+    throttling_rate_limit: int = 5
+    throttling_period: float = 1.0
+    throttling_behavior: Literal["drop", "queue", "warn"] = "drop"
+    throttling_max_queue_delay: float = 5.0
+    throttling_warning_text: str = (
+        "Слишком много запросов, подождите немного."
+    )
+    throttling_local_fast_path_hits: int = 0
+
+    # Scheduler settings
+    scheduler_job_lock: bool = True
+    scheduler_lock_lease: float = 30.0
+    scheduler_persistent_jobs: bool = False
+    scheduler_thread_workers: int = 4
+    scheduler_process_workers: int = 2
+    scheduler_max_heavy_jobs: int = 2
+    scheduler_reminder_hour: int = 9
+    scheduler_reminder_window: int = 180
+    reminder_index: bool = False
+
+    # Task queue settings
+    task_queue_enabled: bool = False
+    task_queue_concurrency: int = 4
+    task_queue_max_retries: int = 3
+    task_queue_retry_backoff: float = 5.0
+    task_queue_timeout: float = 600.0
 
     # Logging settings
     log_bot_token: str
@@ -110,6 +335,9 @@ class Settings(BaseSettings):
             redis_host=self.redis_host,
             redis_port=self.redis_port,
             redis_db=self.redis_db,
+            max_connections=self.redis_max_connections,
+            fsm_serializer=self.fsm_serializer,
+            fsm_local_cache=self.fsm_local_cache,
         )
 
     @property
@@ -125,6 +353,34 @@ class Settings(BaseSettings):
         return ApiClientConfig(
             some_api_url=self.some_api_url,
             some_other_api_url=self.some_other_api_url,
+            connect_timeout=self.api_client_connect_timeout,
+            read_timeout=self.api_client_read_timeout,
+            total_timeout=self.api_client_total_timeout,
+            connection_limit=self.api_client_connection_limit,
+            connection_limit_per_host=(
+                self.api_client_connection_limit_per_host
+            ),
+            keepalive_timeout=self.api_client_keepalive_timeout,
+            dns_cache_ttl=self.api_client_dns_cache_ttl,
+            session_per_upstream=self.api_client_session_per_upstream,
+            retry_attempts=self.api_client_retry_attempts,
+            retry_backoff=self.api_client_retry_backoff,
+            retry_backoff_max=self.api_client_retry_backoff_max,
+            breaker_failure_threshold=(
+                self.api_client_breaker_failure_threshold
+            ),
+            breaker_recovery_timeout=(
+                self.api_client_breaker_recovery_timeout
+            ),
+            response_cache=self.api_client_response_cache,
+            cache_max_entries=self.api_client_cache_max_entries,
+            cache_ttl=self.api_client_cache_ttl,
+            cache_stale_ttl=self.api_client_cache_stale_ttl,
+            cache_redis=self.api_client_cache_redis,
+            coalesce_requests=self.api_client_coalesce_requests,
+            bulk_chunk_size=self.api_client_bulk_chunk_size,
+            bulk_concurrency=self.api_client_bulk_concurrency,
+            get_many_concurrency=self.api_client_get_many_concurrency,
         )
 
     @property
@@ -132,6 +388,56 @@ class Settings(BaseSettings):
         """Возвращает объект конфигурации бота."""
         return BotConfig(
             bot_token=self.bot_token,
+            media_group_storage=self.media_group_storage,
+            media_group_latency=self.media_group_latency,
+            update_workers=self.update_workers,
+            update_queue_size=self.update_queue_size,
+            update_mode=self.update_mode,
+            update_stream=self.update_stream,
+            update_stream_group=self.update_stream_group,
+            update_stream_maxlen=self.update_stream_maxlen,
+            update_stream_max_deliveries=self.update_stream_max_deliveries,
+            activity_flush_interval=self.activity_flush_interval,
+            send_retry_attempts=self.send_retry_attempts,
+            slow_update_threshold=self.slow_update_threshold,
+        )
+
+    @property
+    def throttling_config(self) -> ThrottlingConfig:
+        """Возвращает объект конфигурации антифлуда."""
+        return ThrottlingConfig(
+            rate_limit=self.throttling_rate_limit,
+            period=self.throttling_period,
+            behavior=self.throttling_behavior,
+            max_queue_delay=self.throttling_max_queue_delay,
+            warning_text=self.throttling_warning_text,
+            local_fast_path_hits=self.throttling_local_fast_path_hits,
+        )
+
+    @property
+    def scheduler_config(self) -> SchedulerConfig:
+        """Возвращает объект конфигурации планировщика."""
+        return SchedulerConfig(
+            job_lock=self.scheduler_job_lock,
+            lock_lease=self.scheduler_lock_lease,
+            persistent_jobs=self.scheduler_persistent_jobs,
+            thread_workers=self.scheduler_thread_workers,
+            process_workers=self.scheduler_process_workers,
+            max_heavy_jobs=self.scheduler_max_heavy_jobs,
+            reminder_hour=self.scheduler_reminder_hour,
+            reminder_window=self.scheduler_reminder_window,
+            reminder_index=self.reminder_index,
+        )
+
+    @property
+    def task_queue_config(self) -> TaskQueueConfig:
+        """Возвращает объект конфигурации очереди фоновых задач."""
+        return TaskQueueConfig(
+            enabled=self.task_queue_enabled,
+            concurrency=self.task_queue_concurrency,
+            max_retries=self.task_queue_max_retries,
+            retry_backoff=self.task_queue_retry_backoff,
+            timeout=self.task_queue_timeout,
         )
 
     @property
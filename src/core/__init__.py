@@ -2,3 +2,4 @@
 
 from core.base_module import BaseModuleManager
 from core.configure_logging import configure_logging
+from core.metrics import add_timing, collect_timings, metrics
@@ -0,0 +1,271 @@
+import bisect
+import contextvars
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, Mapping
+
+# Границы корзин гистограмм по умолчанию, в секундах
+DEFAULT_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+# Время, которое текущий апдейт (или другая единица работы) провёл
+# в ожидании внешних ресурсов: {"db": 0.12, "api": 0.4}
+_timings: contextvars.ContextVar[dict[str, float] | None] = (
+    contextvars.ContextVar("timings", default=None)
+)
+
+
+def _format_labels(labelnames: tuple[str, ...], values: tuple) -> str:
+    if not labelnames:
+        return ""
+    pairs = ",".join(
+        f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)
+    )
+    return f"{{{pairs}}}"
+
+
+def _escape(value) -> str:
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\n", "\\n")
+        .replace('"', '\\"')
+    )
+
+
+class Counter:
+    """
+    Счётчик, который только растёт (число апдейтов, ошибок и т.д.).
+    """
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...]):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, value: float = 1, **labels):
+        key = tuple(labels[name] for name in self.labelnames)
+        self._values[key] = self._values.get(key, 0) + value
+
+    def render(self) -> list[str]:
+        lines = [
+            f"# HELP {self.name} {self.help}",
+            f"# TYPE {self.name} counter",
+        ]
+        for key, value in self._values.items():
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}{labels} {value:g}")
+        return lines
+
+
+class Histogram:
+    """
+    Гистограмма длительностей: число наблюдений по корзинам,
+    их сумма и количество.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: tuple[str, ...],
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = buckets
+        # Для каждого набора меток: счётчики корзин (+Inf последняя),
+        # сумма наблюдений
+        self._values: dict[tuple, tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, **labels):
+        key = tuple(labels[name] for name in self.labelnames)
+        counts, total = self._values.setdefault(
+            key, ([0] * (len(self.buckets) + 1), [0.0])
+        )
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        total[0] += value
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        """
+        Замеряет длительность блока кода.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self) -> list[str]:
+        lines = [
+            f"# HELP {self.name} {self.help}",
+            f"# TYPE {self.name} histogram",
+        ]
+        for key, (counts, total) in self._values.items():
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += count
+                labels = _format_labels(
+                    (*self.labelnames, "le"), (*key, bound)
+                )
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {total[0]:g}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Gauge:
+    """
+    Текущее значение, которое вычисляется в момент экспорта
+    (размер очереди, занятые соединения пула и т.д.).
+
+    С метками функция возвращает словарь {значения меток: значение}.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        func: Callable[[], float | Mapping[tuple, float]],
+        labelnames: tuple[str, ...] = (),
+    ):
+        self.name = name
+        self.help = help
+        self.func = func
+        self.labelnames = labelnames
+
+    def render(self) -> list[str]:
+        lines = [
+            f"# HELP {self.name} {self.help}",
+            f"# TYPE {self.name} gauge",
+        ]
+        if not self.labelnames:
+            lines.append(f"{self.name} {self.func():g}")
+            return lines
+        for key, value in self.func().items():
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}{labels} {value:g}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Метрики процесса в памяти с экспортом в текстовом формате
+    Prometheus.
+
+    Метрики одного процесса: при нескольких репликах каждую нужно
+    опрашивать отдельно.
+    """
+
+    def __init__(self):
+        self._metrics: dict[str, Counter | Histogram | Gauge] = {}
+
+    def counter(
+        self, name: str, help: str, labelnames: tuple[str, ...] = ()
+    ) -> Counter:
+        """
+        Возвращает счётчик, создавая его при первом обращении.
+
+        :param name: Имя метрики.
+        :param help: Описание метрики.
+        :param labelnames: Имена меток.
+        :return: Счётчик.
+        """
+        if name not in self._metrics:
+            self._metrics[name] = Counter(name, help, labelnames)
+        return self._metrics[name]
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        """
+        Возвращает гистограмму, создавая её при первом обращении.
+
+        :param name: Имя метрики.
+        :param help: Описание метрики.
+        :param labelnames: Имена меток.
+        :param buckets: Границы корзин в секундах.
+        :return: Гистограмма.
+        """
+        if name not in self._metrics:
+            self._metrics[name] = Histogram(name, help, labelnames, buckets)
+        return self._metrics[name]
+
+    def gauge(
+        self,
+        name: str,
+        help: str,
+        func: Callable[[], float | Mapping[tuple, float]],
+        labelnames: tuple[str, ...] = (),
+    ):
+        """
+        Регистрирует показатель, который вычисляется при экспорте.
+        Повторная регистрация заменяет функцию.
+
+        :param name: Имя метрики.
+        :param help: Описание метрики.
+        :param func: Функция, возвращающая текущее значение (с метками —
+         словарь {значения меток: значение}).
+        :param labelnames: Имена меток.
+        """
+        self._metrics[name] = Gauge(name, help, func, labelnames)
+
+    def render(self) -> str:
+        """
+        :return: Все метрики в текстовом формате Prometheus.
+        """
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+
+@contextmanager
+def collect_timings() -> Iterator[dict[str, float]]:
+    """
+    Собирает время ожидания внешних ресурсов внутри блока кода
+    (в том числе во вложенных корутинах той же задачи).
+
+    :yield: Словарь {ресурс: секунды}, который заполняется по ходу.
+    """
+    timings: dict[str, float] = {}
+    token = _timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _timings.reset(token)
+
+
+def add_timing(resource: str, seconds: float):
+    """
+    Добавляет время ожидания ресурса к текущему блоку collect_timings.
+    Вне такого блока ничего не делает.
+
+    :param resource: Ресурс: "db", "api" и т.д.
+    :param seconds: Длительность в секундах.
+    """
+    timings = _timings.get()
+    if timings is not None:
+        timings[resource] = timings.get(resource, 0.0) + seconds
@@ -1,14 +1,42 @@
+import time
 from typing import AsyncGenerator
 
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import (
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
 from sqlalchemy.ext.asyncio.engine import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from config import DatabaseConfig
-from core import BaseModuleManager
+from core import BaseModuleManager, add_timing, metrics
+
+query_duration = metrics.histogram(
+    "db_query_duration_seconds", "Duration of database queries"
+)
+pool_wait = metrics.histogram(
+    "db_pool_wait_seconds",
+    "Time spent waiting for a database connection from the pool",
+)
+
+
+class TimedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """
+    Пул соединений, который замеряет, сколько сессия ждала соединение
+    (свободное из пула или новое). Когда пул исчерпан, время уходит
+    именно сюда, а не на выполнение запросов.
+    """
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            elapsed = time.perf_counter() - start
+            pool_wait.observe(elapsed)
+            add_timing("db_wait", elapsed)
 
 
 class DatabaseManager(BaseModuleManager):
@@ -30,6 +58,7 @@ class DatabaseManager(BaseModuleManager):
             echo=database_config.echo,
             pool_size=database_config.pool_size,
             max_overflow=database_config.max_overflow,
+            poolclass=TimedAsyncQueuePool,
         )
         self.async_session: async_sessionmaker[AsyncSession] = (
             async_sessionmaker(
@@ -39,6 +68,52 @@ class DatabaseManager(BaseModuleManager):
                 expire_on_commit=False,
             )
         )
+        self._instrument()
+
+    def _instrument(self):
+        """
+        Замеряет длительность запросов (и добавляет её к времени
+        ожидания базы текущего апдейта) и экспортирует занятость
+        пула соединений. Ожидание соединения из пула замеряет
+        TimedAsyncQueuePool.
+        """
+        sync_engine = self.engine.sync_engine
+
+        # На соединении в каждый момент выполняется один запрос, поэтому
+        # хватает одного значения; упавший запрос его просто перезапишет
+        @event.listens_for(sync_engine, "before_cursor_execute")
+        def before_cursor_execute(conn, *args):
+            conn.info["query_start"] = time.perf_counter()
+
+        @event.listens_for(sync_engine, "after_cursor_execute")
+        def after_cursor_execute(conn, *args):
+            start = conn.info.pop("query_start", None)
+            if start is None:
+                return
+            elapsed = time.perf_counter() - start
+            query_duration.observe(elapsed)
+            add_timing("db", elapsed)
+
+        @event.listens_for(sync_engine, "handle_error")
+        def handle_error(context):
+            conn = context.connection
+            if conn is None:
+                return
+            start = conn.info.pop("query_start", None)
+            if start is not None:
+                elapsed = time.perf_counter() - start
+                query_duration.observe(elapsed)
+                add_timing("db", elapsed)
+
+        pool = sync_engine.pool
+        metrics.gauge(
+            "db_pool_checked_out",
+            "Database connections in use",
+            pool.checkedout,
+        )
+        metrics.gauge(
+            "db_pool_size", "Database connections kept in the pool", pool.size
+        )
 
     async def shutdown(self):
         """
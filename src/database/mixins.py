@@ -10,6 +10,8 @@ class TimestampMixin:
     Миксин для добавления временных меток:
     - created_at: время создания записи (UTC).
     - updated_at: время последнего обновления записи (UTC).
+      Обновляется при каждом UPDATE через SQLAlchemy (ORM и Core),
+      поэтому по нему можно выбирать изменённые записи.
     """
 
     created_at: Mapped[datetime.datetime] = mapped_column(
@@ -18,7 +20,7 @@ class TimestampMixin:
     updated_at: Mapped[datetime.datetime] = mapped_column(
         DateTime(timezone=True),
         server_default=text("TIMEZONE('utc', now())"),
-        server_onupdate=text("TIMEZONE('utc', now())"),
+        onupdate=text("TIMEZONE('utc', now())"),
     )
 
 
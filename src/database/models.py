@@ -1,6 +1,19 @@
+import datetime
 import enum
 
-from sqlalchemy import Boolean, ForeignKey, String
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    Computed,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    UniqueConstraint,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from database.basemodels import Base
@@ -14,12 +27,20 @@ class User(BigIntPrimaryKeyMixin, Base):
     Поля класса:
     - `id`: Уникальный идентификатор юзера.
     - `last_active` дата последней активности.
+    - `timezone`: часовой пояс пользователя (название IANA).
+    - `reminder_slot`: слот 0..1023 (вычисляется из id), по которому
+      напоминания распределяются по окну рассылки.
+    - `is_reminded`: напоминание отправлено после последней активности.
     - `is_active`используется для soft delete.
     - `items` список штук, которые принадлежат пользователю.
 
     """
 
     __tablename__ = "users"
+    # Для выборки слайсов напоминаний
+    __table_args__ = (
+        Index("ix_users_timezone_reminder_slot", "timezone", "reminder_slot"),
+    )
 
     first_name: Mapped[str] = mapped_column(String(64), nullable=True)
     last_name: Mapped[str | None] = mapped_column(String(64), nullable=True)
@@ -27,6 +48,18 @@ class User(BigIntPrimaryKeyMixin, Base):
     some_bool_val: Mapped[bool] = mapped_column(
         Boolean, default=False, server_default="FALSE"
     )
+    last_active: Mapped[datetime.datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    timezone: Mapped[str] = mapped_column(
+        String(64), default="UTC", server_default="UTC"
+    )
+    reminder_slot: Mapped[int] = mapped_column(
+        Integer, Computed("id % 1024", persisted=True)
+    )
+    is_reminded: Mapped[bool] = mapped_column(
+        Boolean, default=False, server_default="FALSE"
+    )
 
     items: Mapped[list["Item"]] = relationship(back_populates="user")
 
@@ -50,6 +83,8 @@ class Item(IntPrimaryKeyMixin, Base):
     """
 
     __tablename__ = "items"
+    # Для инкрементальной синхронизации по (updated_at, id)
+    __table_args__ = (Index("ix_items_updated_at_id", "updated_at", "id"),)
 
     title: Mapped[str] = mapped_column(String(128), nullable=False)
     item_type: Mapped[ItemType] = mapped_column(nullable=False)
@@ -72,3 +107,102 @@ class Admin(IntPrimaryKeyMixin, Base):
 
     username: Mapped[str] = mapped_column(String(50), unique=True)
     password: Mapped[str]
+
+
+class MediaGroup(IntPrimaryKeyMixin, Base):
+    """
+    Файлы из медиагрупп (альбомов), присланных боту.
+
+    Поля класса:
+    - `chat_id`: ID чата, в который пришёл альбом.
+    - `media_group_id`: ID медиагруппы в Telegram.
+    - `message_id`: ID сообщения с файлом.
+    - `file_id`: ID файла в Telegram.
+    - `media_type`: Тип файла (photo, video, document, audio, animation).
+    """
+
+    __tablename__ = "media_groups"
+
+    chat_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    media_group_id: Mapped[str] = mapped_column(String(64), index=True)
+    message_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    file_id: Mapped[str] = mapped_column(String(256), nullable=False)
+    media_type: Mapped[str] = mapped_column(String(16), nullable=False)
+
+
+class MediaFile(IntPrimaryKeyMixin, Base):
+    """
+    Кэш file_id файлов, которые бот уже загружал в Telegram.
+
+    Поля класса:
+    - `key`: Ключ файла: логическое имя, хэш содержимого или URL.
+    - `file_id`: ID файла в Telegram, по которому его можно отправить
+      повторно без загрузки.
+    - `media_type`: Тип файла (photo, video, document, audio и т.д.).
+    """
+
+    __tablename__ = "media_files"
+    # Один и тот же файл, отправленный как фото и как документ,
+    # получает разные file_id
+    __table_args__ = (UniqueConstraint("key", "media_type"),)
+
+    key: Mapped[str] = mapped_column(String(256), nullable=False)
+    file_id: Mapped[str] = mapped_column(String(256), nullable=False)
+    media_type: Mapped[str] = mapped_column(String(16), nullable=False)
+
+
+class JobRun(IntPrimaryKeyMixin, Base):
+    """
+    История запусков задач планировщика.
+
+    Поля класса:
+    - `job_id`: ID задачи в планировщике.
+    - `status`: Итог запуска: success, failed, missed (пропущен из-за
+      опоздания больше misfire_grace_time) или skipped (пропущен,
+      потому что предыдущий запуск ещё не закончился).
+    - `scheduled_at`: Плановое время запуска.
+    - `started_at`: Фактическое время начала.
+    - `finished_at`: Время окончания.
+    - `duration`: Длительность в секундах.
+    - `items_processed`: Сколько объектов обработала задача.
+    - `error`: Текст ошибки.
+    """
+
+    __tablename__ = "job_runs"
+
+    job_id: Mapped[str] = mapped_column(String(64), index=True)
+    status: Mapped[str] = mapped_column(String(16), nullable=False)
+    scheduled_at: Mapped[datetime.datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    started_at: Mapped[datetime.datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    finished_at: Mapped[datetime.datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    duration: Mapped[float | None] = mapped_column(Float, nullable=True)
+    items_processed: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+
+class SyncWatermark(IntPrimaryKeyMixin, Base):
+    """
+    Отметки инкрементальной синхронизации с внешними системами.
+
+    Поля класса:
+    - `name`: Название синхронизации.
+    - `last_updated_at`: updated_at последней отправленной записи.
+    - `last_id`: ID последней отправленной записи.
+    - `fencing_token`: Токен блокировки задачи, сохранившей отметку.
+      Запись с меньшим токеном отбрасывается.
+    """
+
+    __tablename__ = "sync_watermarks"
+
+    name: Mapped[str] = mapped_column(String(64), unique=True)
+    last_updated_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False
+    )
+    last_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    fencing_token: Mapped[int | None] = mapped_column(BigInteger)
@@ -2,4 +2,14 @@
 
 from database.repositories.admin_repository import admin_repository
 from database.repositories.item_repository import item_repository
+from database.repositories.job_run_repository import job_run_repository
+from database.repositories.media_file_repository import (
+    media_file_repository,
+)
+from database.repositories.media_group_repository import (
+    media_group_repository,
+)
+from database.repositories.sync_watermark_repository import (
+    sync_watermark_repository,
+)
 from database.repositories.user_repository import user_repository
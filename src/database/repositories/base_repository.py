@@ -1,8 +1,9 @@
+import datetime
 import logging
 from contextlib import asynccontextmanager
 from typing import List
 
-from sqlalchemy import delete, func, inspect, select, update
+from sqlalchemy import delete, func, inspect, select, tuple_, update
 from sqlalchemy.exc import (
     DataError,
     IntegrityError,
@@ -246,3 +247,39 @@ class BaseRepository:
 
             result = await session.execute(query)
             return result.scalar()
+
+    async def list_changed_since(
+        self,
+        session: AsyncSession,
+        after: tuple[datetime.datetime, int] | None = None,
+        limit: int = 500,
+        safety_lag: datetime.timedelta = datetime.timedelta(0),
+    ):
+        """
+        Постраничное (keyset) получение объектов, изменённых после
+        отметки, в порядке (updated_at, id). Неактивные объекты тоже
+        возвращаются, чтобы получатель узнал об их удалении.
+
+        :param session: Асинхронная сессия SQLAlchemy.
+        :param after: Пара (updated_at, id) последнего полученного
+         объекта или None, чтобы начать с начала.
+        :param limit: Размер страницы.
+        :param safety_lag: Не брать объекты, изменённые позже, чем
+         now() - safety_lag: транзакции, которые ещё не закоммичены,
+         могли записать более раннее updated_at.
+        :return: Список объектов.
+        """
+        async with self._handle_errors("listing changed objects"):
+            query = (
+                select(self.table)
+                .where(self.table.updated_at < func.now() - safety_lag)
+                .order_by(self.table.updated_at, self.table.id)
+                .limit(limit)
+            )
+            if after is not None:
+                query = query.where(
+                    tuple_(self.table.updated_at, self.table.id)
+                    > tuple_(*after)
+                )
+            results = await session.execute(query)
+            return results.scalars().all()
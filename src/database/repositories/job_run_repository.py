@@ -0,0 +1,28 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.models import JobRun
+from database.repositories.base_repository import BaseRepository
+
+
+class JobRunRepository(BaseRepository):
+    async def list_recent(
+        self, session: AsyncSession, job_id: str | None = None, limit: int = 50
+    ):
+        """
+        Возвращает последние запуски задач, от новых к старым.
+
+        :param session: Асинхронная сессия SQLAlchemy.
+        :param job_id: ID задачи (если не указан — все задачи).
+        :param limit: Максимальное количество запусков.
+        :return: Список запусков.
+        """
+        async with self._handle_errors("listing recent job runs"):
+            query = select(JobRun).order_by(JobRun.id.desc()).limit(limit)
+            if job_id is not None:
+                query = query.filter_by(job_id=job_id)
+            results = await session.execute(query)
+            return results.scalars().all()
+
+
+job_run_repository = JobRunRepository(JobRun, primary_key="id")
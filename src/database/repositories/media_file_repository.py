@@ -0,0 +1,36 @@
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.models import MediaFile
+from database.repositories.base_repository import BaseRepository
+
+
+class MediaFileRepository(BaseRepository):
+    async def upsert(
+        self, session: AsyncSession, key: str, file_id: str, media_type: str
+    ):
+        """
+        Сохраняет file_id файла одним запросом.
+
+        :param session: Асинхронная сессия SQLAlchemy.
+        :param key: Ключ файла.
+        :param file_id: ID файла в Telegram.
+        :param media_type: Тип файла.
+        """
+        async with self._handle_errors("saving media file"):
+            query = insert(MediaFile).values(
+                key=key, file_id=file_id, media_type=media_type
+            )
+            await session.execute(
+                query.on_conflict_do_update(
+                    index_elements=[MediaFile.key, MediaFile.media_type],
+                    set_={
+                        "file_id": query.excluded.file_id,
+                        "updated_at": query.excluded.updated_at,
+                    },
+                )
+            )
+            await session.commit()
+
+
+media_file_repository = MediaFileRepository(MediaFile, primary_key="id")
@@ -0,0 +1,9 @@
+from database.models import MediaGroup
+from database.repositories.base_repository import BaseRepository
+
+
+class MediaGroupRepository(BaseRepository):
+    pass
+
+
+media_group_repository = MediaGroupRepository(MediaGroup, primary_key="id")
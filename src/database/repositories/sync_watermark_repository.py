@@ -0,0 +1,64 @@
+import datetime
+
+from sqlalchemy import or_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.models import SyncWatermark
+from database.repositories.base_repository import BaseRepository
+
+
+class SyncWatermarkRepository(BaseRepository):
+    async def upsert(
+        self,
+        session: AsyncSession,
+        name: str,
+        last_updated_at: datetime.datetime,
+        last_id: int,
+        fencing_token: int | None = None,
+    ) -> bool:
+        """
+        Создаёт или сдвигает отметку синхронизации одним запросом.
+
+        Если отметку уже сохранила задача с большим fencing token
+        (блокировка перешла к другому исполнителю), запись отбрасывается.
+
+        :param session: Асинхронная сессия SQLAlchemy.
+        :param name: Название синхронизации.
+        :param last_updated_at: updated_at последней отправленной записи.
+        :param last_id: ID последней отправленной записи.
+        :param fencing_token: Токен блокировки задачи (если есть).
+        :return: False, если запись отброшена.
+        """
+        async with self._handle_errors("saving sync watermark"):
+            query = insert(SyncWatermark).values(
+                name=name,
+                last_updated_at=last_updated_at,
+                last_id=last_id,
+                fencing_token=fencing_token,
+            )
+            result = await session.execute(
+                query.on_conflict_do_update(
+                    index_elements=[SyncWatermark.name],
+                    set_={
+                        "last_updated_at": query.excluded.last_updated_at,
+                        "last_id": query.excluded.last_id,
+                        "fencing_token": query.excluded.fencing_token,
+                        "updated_at": query.excluded.updated_at,
+                    },
+                    where=or_(
+                        query.excluded.fencing_token.is_(None),
+                        SyncWatermark.fencing_token.is_(None),
+                        SyncWatermark.fencing_token
+                        <= query.excluded.fencing_token,
+                    ),
+                ).returning(SyncWatermark.id)
+            )
+            saved = result.scalar_one_or_none() is not None
+            await session.commit()
+            return saved
+
+
+sync_watermark_repository = SyncWatermarkRepository(
+    SyncWatermark, primary_key="id"
+)
@@ -1,6 +1,15 @@
 import datetime
 
-from sqlalchemy import and_, select
+from sqlalchemy import (
+    BigInteger,
+    DateTime,
+    and_,
+    column,
+    func,
+    select,
+    update,
+    values,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from database.models import User
@@ -9,17 +18,66 @@ from database.repositories.base_repository import BaseRepository
 
 class UserRepository(BaseRepository):
     async def get_bobs_for_reminder(
-        self, session: AsyncSession, timeout: datetime.datetime
+        self,
+        session: AsyncSession,
+        timeout: datetime.datetime,
+        timezones: list[str],
+        slot_before: int,
+        limit: int,
     ):
         """
-        Возвращает пользователей, которым нужно отправить напоминание.
+        Возвращает слайс пользователей, которым нужно отправить
+        напоминание: из заданных часовых поясов, со слотом меньше
+        slot_before и ещё не получивших напоминание.
+
+        Слоты ниже текущей границы, не обработанные из-за пропуска
+        запуска или лимита, догоняются следующими слайсами.
+
+        :param session: Асинхронная сессия SQLAlchemy.
+        :param timeout: Временной предел активности пользователя.
+        :param timezones: Часовые пояса, в которых сейчас окно рассылки.
+        :param slot_before: Верхняя граница слотов (не включительно).
+        :param limit: Максимальный размер слайса.
+        :return: Список пользователей.
+        """
+        query = (
+            select(User)
+            .filter(
+                and_(
+                    User.timezone.in_(timezones),
+                    User.reminder_slot < slot_before,
+                    User.is_reminded.is_(False),
+                    User.is_active.is_(True),
+                    User.first_name == "Bob",
+                    User.last_active < timeout,
+                )
+            )
+            .order_by(User.reminder_slot)
+            .limit(limit)
+        )
+        results = await session.execute(query)
+        return results.scalars().all()
+
+    async def get_bobs_for_reminder_by_ids(
+        self,
+        session: AsyncSession,
+        timeout: datetime.datetime,
+        user_ids: list[int],
+    ):
+        """
+        Возвращает пользователей из списка, которым по-прежнему нужно
+        отправить напоминание (для проверки кандидатов из индекса).
 
         :param session: Асинхронная сессия SQLAlchemy.
         :param timeout: Временной предел активности пользователя.
+        :param user_ids: ID кандидатов.
         :return: Список пользователей.
         """
         query = select(User).filter(
             and_(
+                User.id.in_(user_ids),
+                User.is_reminded.is_(False),
+                User.is_active.is_(True),
                 User.first_name == "Bob",
                 User.last_active < timeout,
             )
@@ -27,5 +85,78 @@ class UserRepository(BaseRepository):
         results = await session.execute(query)
         return results.scalars().all()
 
+    async def list_reminder_candidates(
+        self, session: AsyncSession, after_id: int | None, limit: int
+    ):
+        """
+        Возвращает страницу активных пользователей, ещё не получивших
+        напоминание, для пересборки индекса напоминаний.
+
+        :param session: Асинхронная сессия SQLAlchemy.
+        :param after_id: ID последнего пользователя предыдущей страницы.
+        :param limit: Размер страницы.
+        :return: Строки с полями id, timezone, last_active, is_active.
+        """
+        async with self._handle_errors("listing reminder candidates"):
+            query = (
+                select(
+                    User.id, User.timezone, User.last_active, User.is_active
+                )
+                .filter(
+                    and_(
+                        User.is_active.is_(True),
+                        User.is_reminded.is_(False),
+                        User.last_active.is_not(None),
+                    )
+                )
+                .order_by(User.id)
+                .limit(limit)
+            )
+            if after_id is not None:
+                query = query.filter(User.id > after_id)
+            results = await session.execute(query)
+            return results.all()
+
+    async def bulk_update_last_active(
+        self,
+        session: AsyncSession,
+        activity: dict[int, datetime.datetime],
+    ):
+        """
+        Обновляет время последней активности пользователей
+        одним запросом UPDATE ... FROM (VALUES ...).
+
+        Время только сдвигается вперёд: если другой процесс уже записал
+        более позднее значение, оно не перезаписывается. Активный
+        пользователь снова может получить напоминание, когда пропадёт.
+
+        :param session: Асинхронная сессия SQLAlchemy.
+        :param activity: Словарь {ID пользователя: время активности}.
+        :return: Обновлённые строки с полями id, timezone, last_active
+         и is_active.
+        """
+        async with self._handle_errors("bulk updating last activity"):
+            activity_values = values(
+                column("id", BigInteger),
+                column("last_active", DateTime(timezone=True)),
+                name="activity",
+            ).data(list(activity.items()))
+            result = await session.execute(
+                update(User)
+                .where(User.id == activity_values.c.id)
+                .values(
+                    last_active=func.greatest(
+                        User.last_active, activity_values.c.last_active
+                    ),
+                    is_reminded=False,
+                )
+                .returning(
+                    User.id, User.timezone, User.last_active, User.is_active
+                )
+            )
+            users = result.all()
+            await session.commit()
+            return users
+
 
 user_repository = UserRepository(User, primary_key="id")
@@ -1,15 +1,16 @@
 import asyncio
 import logging
+import sys
 
 from app_container import AppContainer
 from config import Settings
 from core import configure_logging
 
 
-async def main():
+async def main(role: str):
     settings = Settings()
     configure_logging(settings.log_config)
-    app_container = AppContainer(settings)
+    app_container = AppContainer(settings, role=role)
     try:
         await app_container.configure()
         await app_container.start()
@@ -19,4 +20,7 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    # python src/main.py — всё приложение
+    # python src/main.py bot-worker — воркер обработки апдейтов бота
+    # python src/main.py worker — воркер очереди фоновых задач
+    asyncio.run(main(sys.argv[1] if len(sys.argv) > 1 else "app"))
@@ -0,0 +1,89 @@
+import datetime
+import logging
+
+from apscheduler.triggers.interval import IntervalTrigger
+
+
+class AdaptiveInterval:
+    """
+    Адаптивный интервал для задач с IntervalTrigger.
+
+    Если запуск занял больше stretch_ratio интервала, интервал
+    увеличивается в factor раз (не больше max_interval). Если запуск
+    занял меньше shrink_ratio интервала, интервал уменьшается
+    в factor раз (не меньше исходного). Так медленный внешний API
+    не превращается в очередь из наложившихся запусков.
+
+    Пример:
+        manager.add_job(
+            "sync",
+            sync_items,
+            IntervalTrigger(minutes=5, jitter=30),
+            adaptive=AdaptiveInterval(max_interval=timedelta(minutes=30)),
+        )
+    """
+
+    def __init__(
+        self,
+        max_interval: datetime.timedelta,
+        stretch_ratio: float = 0.5,
+        shrink_ratio: float = 0.2,
+        factor: float = 2.0,
+    ):
+        """
+        :param max_interval: Максимальный интервал.
+        :param stretch_ratio: Доля интервала, после которой он растёт.
+        :param shrink_ratio: Доля интервала, ниже которой он сокращается.
+        :param factor: Во сколько раз меняется интервал за один шаг.
+        """
+        self.max_interval = max_interval
+        self.stretch_ratio = stretch_ratio
+        self.shrink_ratio = shrink_ratio
+        self.factor = factor
+
+        self.trigger: IntervalTrigger | None = None
+        self.base_interval: datetime.timedelta | None = None
+        self.interval: datetime.timedelta | None = None
+
+    def bind(self, trigger: IntervalTrigger):
+        """
+        Запоминает исходный триггер задачи.
+
+        :param trigger: Триггер с исходным интервалом.
+        """
+        if not isinstance(trigger, IntervalTrigger):
+            raise ValueError("Adaptive interval requires an IntervalTrigger")
+        self.trigger = trigger
+        self.base_interval = trigger.interval
+        self.interval = trigger.interval
+
+    def adjust(self, duration: float) -> IntervalTrigger | None:
+        """
+        Пересчитывает интервал по длительности последнего запуска.
+
+        :param duration: Длительность запуска в секундах.
+        :return: Новый триггер или None, если интервал не изменился.
+        """
+        seconds = self.interval.total_seconds()
+        if duration > seconds * self.stretch_ratio:
+            interval = min(self.interval * self.factor, self.max_interval)
+        elif duration < seconds * self.shrink_ratio:
+            interval = max(self.interval / self.factor, self.base_interval)
+        else:
+            return None
+
+        if interval == self.interval:
+            return None
+        logging.info(
+            f"Job took {duration:.1f}s, "
+            f"interval changed from {self.interval} to {interval}"
+        )
+        self.interval = interval
+        # start_date исходного триггера сохраняется, чтобы запуски
+        # оставались на общей для реплик сетке
+        return IntervalTrigger(
+            seconds=interval.total_seconds(),
+            start_date=self.trigger.start_date,
+            jitter=self.trigger.jitter,
+            timezone=self.trigger.timezone,
+        )
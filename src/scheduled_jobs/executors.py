@@ -0,0 +1,115 @@
+import asyncio
+import datetime
+import logging
+import sys
+from contextvars import ContextVar
+
+from apscheduler.executors.asyncio import AsyncIOExecutor
+from apscheduler.executors.base import run_coroutine_job
+
+from scheduled_jobs.job_lock import (
+    RedisJobLock,
+    current_fencing_token,
+    current_job_lock,
+)
+
+# Плановое время запуска текущей задачи планировщика
+current_scheduled_time: ContextVar[datetime.datetime | None] = ContextVar(
+    "current_scheduled_time", default=None
+)
+
+# Слот текущего запуска: ключ, по которому реплики узнают, что запуск
+# уже выполнен
+current_slot: ContextVar[int | None] = ContextVar("current_slot", default=None)
+
+
+class LockedAsyncIOExecutor(AsyncIOExecutor):
+    """
+    Исполнитель APScheduler, который запускает задачу только под
+    распределённой блокировкой RedisJobLock (если она задана).
+
+    Если задачу уже выполняет другая реплика или этот слот уже
+    выполнен, запуск молча пропускается. Слот — начало отрезка
+    длиной slot_sizes[job.id] секунд (по умолчанию одна секунда),
+    в который попало плановое время запуска. У задач с интервалом
+    каждая реплика выбирает время запуска сама (свой jitter и
+    адаптивный интервал), а отрезок у всех реплик общий.
+
+    Плановое время запуска и слот доступны задаче через
+    current_scheduled_time и current_slot.
+    """
+
+    def __init__(
+        self,
+        job_lock: RedisJobLock | None = None,
+        slot_sizes: dict[str, float] | None = None,
+    ):
+        """
+        :param job_lock: Распределённая блокировка задач (опционально).
+        :param slot_sizes: Длина слота в секундах по ID задачи.
+        """
+        super().__init__()
+        self.job_lock = job_lock
+        self.slot_sizes = {} if slot_sizes is None else slot_sizes
+
+    def get_slot(self, job_id: str, run_time: datetime.datetime) -> int:
+        """
+        Возвращает слот запуска: начало отрезка, в который попало
+        плановое время, в секундах от начала эпохи.
+        """
+        size = self.slot_sizes.get(job_id, 1)
+        return int(run_time.timestamp() // size * size)
+
+    def _do_submit_job(self, job, run_times):
+        def callback(f):
+            self._pending_futures.discard(f)
+            try:
+                events = f.result()
+            except BaseException:
+                self._run_job_error(job.id, *sys.exc_info()[1:])
+            else:
+                self._run_job_success(job.id, events)
+
+        f = self._eventloop.create_task(self._run_locked(job, run_times))
+        f.add_done_callback(callback)
+        self._pending_futures.add(f)
+
+    async def _run_locked(self, job, run_times) -> list:
+        slot = self.get_slot(job.id, run_times[-1])
+        current_scheduled_time.set(run_times[-1])
+        current_slot.set(slot)
+        if self.job_lock is None:
+            return await run_coroutine_job(
+                job, job._jobstore_alias, run_times, self._logger.name
+            )
+
+        token = await self.job_lock.acquire(job.id)
+        if token is None:
+            logging.info(f"Job {job.id} is locked by another replica")
+            return []
+
+        try:
+            if await self.job_lock.is_done(job.id, slot):
+                return []
+
+            current_fencing_token.set(token)
+            current_job_lock.set((self.job_lock, job.id, token))
+            task = asyncio.create_task(
+                run_coroutine_job(
+                    job, job._jobstore_alias, run_times, self._logger.name
+                )
+            )
+            keep_alive = asyncio.create_task(
+                self.job_lock.keep_alive(job.id, token, task)
+            )
+            try:
+                events = await task
+            finally:
+                lock_lost = keep_alive.done() and keep_alive.result()
+                keep_alive.cancel()
+
+            if not lock_lost:
+                await self.job_lock.mark_done(job.id, slot)
+            return events
+        finally:
+            await self.job_lock.release(job.id, token)
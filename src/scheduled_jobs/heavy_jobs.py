@@ -0,0 +1,140 @@
+import asyncio
+import inspect
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable
+
+from api_client import ApiClientManager
+from config import Settings
+from database import DatabaseManager
+
+
+class HeavyJobRunner:
+    """
+    Запуск тяжёлых задач планировщика вне event loop приложения,
+    чтобы они не тормозили бота и API.
+
+    - "thread": синхронная функция выполняется в пуле потоков.
+      Подходит для блокирующего ввода-вывода и библиотек,
+      отпускающих GIL. Ресурсы event loop (сессии базы, API-клиент,
+      бот) такой задаче не передаются.
+    - "process": функция (синхронная или корутина) выполняется
+      в отдельном процессе. Подходит для CPU-тяжёлых задач.
+      Подключения к базе и API-клиент у процесса свои
+      (см. run_job_in_process).
+
+    Одновременно выполняется не больше max_concurrent тяжёлых задач,
+    остальные ждут своей очереди.
+    """
+
+    def __init__(
+        self,
+        thread_workers: int = 4,
+        process_workers: int = 2,
+        max_concurrent: int = 2,
+    ):
+        """
+        :param thread_workers: Размер пула потоков.
+        :param process_workers: Размер пула процессов.
+        :param max_concurrent: Сколько тяжёлых задач может выполняться
+         одновременно.
+        """
+        self.thread_pool = ThreadPoolExecutor(
+            max_workers=thread_workers, thread_name_prefix="scheduler"
+        )
+        # spawn вместо fork: дочерний процесс не наследует event loop,
+        # открытые соединения и потоки родителя
+        self.process_pool = ProcessPoolExecutor(
+            max_workers=process_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        self.semaphore = asyncio.Semaphore(max_concurrent)
+
+    async def run_in_thread(self, func: Callable[..., Any], kwargs: dict):
+        """
+        Выполняет синхронную функцию в пуле потоков.
+
+        :param func: Функция задачи.
+        :param kwargs: Именованные аргументы задачи.
+        :return: Результат задачи.
+        """
+        loop = asyncio.get_running_loop()
+        async with self.semaphore:
+            return await loop.run_in_executor(
+                self.thread_pool, lambda: func(**kwargs)
+            )
+
+    async def run_in_process(self, func: Callable[..., Any], kwargs: dict):
+        """
+        Выполняет задачу в пуле процессов.
+
+        Функция передаётся в процесс по имени, поэтому она должна
+        быть объявлена на уровне модуля, а аргументы — сериализуемыми.
+        Отменить уже запущенную в процессе задачу нельзя: отмена только
+        перестаёт ждать результат.
+
+        :param func: Функция или корутина задачи.
+        :param kwargs: Именованные аргументы задачи.
+        :return: Результат задачи.
+        """
+        loop = asyncio.get_running_loop()
+        async with self.semaphore:
+            return await loop.run_in_executor(
+                self.process_pool, run_job_in_process, func, kwargs
+            )
+
+    def shutdown(self):
+        """
+        Останавливает пулы, не дожидаясь выполняющихся задач.
+        """
+        self.thread_pool.shutdown(wait=False, cancel_futures=True)
+        self.process_pool.shutdown(wait=False, cancel_futures=True)
+
+
+def run_job_in_process(func: Callable[..., Any], kwargs: dict):
+    """
+    Точка входа задачи в дочернем процессе.
+
+    :param func: Функция или корутина задачи.
+    :param kwargs: Именованные аргументы задачи.
+    :return: Результат задачи.
+    """
+    return asyncio.run(_run_job_with_resources(func, kwargs))
+
+
+async def _run_job_with_resources(func: Callable[..., Any], kwargs: dict):
+    """
+    Создаёт ресурсы, которые задача запрашивает по имени параметра
+    (settings, async_session, api_client), выполняет задачу
+    и закрывает ресурсы.
+    """
+    settings = Settings()
+    parameters = inspect.signature(func).parameters
+    kwargs = dict(kwargs)
+    database_manager: DatabaseManager | None = None
+    api_client_manager: ApiClientManager | None = None
+
+    try:
+        if "settings" in parameters:
+            kwargs["settings"] = settings
+        if "async_session" in parameters:
+            database_manager = DatabaseManager(
+                settings.database_config.model_copy(
+                    update={"pool_size": 2, "max_overflow": 0}
+                )
+            )
+            kwargs["async_session"] = database_manager.async_session
+        if "api_client" in parameters:
+            api_client_manager = ApiClientManager(settings.api_client_config)
+            await api_client_manager.configure()
+            kwargs["api_client"] = api_client_manager
+
+        result = func(**kwargs)
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+    finally:
+        if api_client_manager:
+            await api_client_manager.shutdown()
+        if database_manager:
+            await database_manager.shutdown()
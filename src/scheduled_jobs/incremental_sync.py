@@ -0,0 +1,100 @@
+import datetime
+import logging
+from typing import Any, Awaitable, Callable, Sequence
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from scheduled_jobs.job_lock import current_fencing_token
+from services import sync_watermark_service
+from services.base_service import BaseService
+
+
+class IncrementalSync:
+    """
+    Инкрементальная отправка изменённых записей во внешнюю систему.
+
+    - Отметка (watermark) — пара (updated_at, id) последней отправленной
+      записи — хранится в таблице sync_watermarks.
+    - Изменённые записи читаются страницами по ключу (updated_at, id),
+      без OFFSET и без загрузки всей таблицы.
+    - Каждая страница отправляется отдельным запросом, и отметка
+      сдвигается только после того, как получатель её принял.
+      Если отправка упала, следующий запуск продолжит с этой страницы.
+
+    Отметка сохраняется с fencing token блокировки задачи: если
+    блокировка перешла к другому исполнителю, его отметку устаревший
+    запуск уже не перезапишет и остановится.
+
+    Получатель должен уметь принимать одну и ту же запись повторно
+    (upsert): после сбоя между отправкой и сохранением отметки
+    страница будет отправлена ещё раз.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        async_session: async_sessionmaker,
+        service: BaseService,
+        push: Callable[[Sequence[Any]], Awaitable[Any]],
+        chunk_size: int = 500,
+        safety_lag: datetime.timedelta = datetime.timedelta(seconds=30),
+    ):
+        """
+        :param name: Название синхронизации (ключ отметки).
+        :param async_session: Фабрика асинхронных сессий SQLAlchemy.
+        :param service: Сервис таблицы, из которой берутся записи.
+        :param push: Корутина, отправляющая страницу записей.
+        :param chunk_size: Размер страницы.
+        :param safety_lag: Записи, изменённые позже now() - safety_lag,
+         откладываются до следующего запуска, чтобы не пропустить
+         записи из ещё не закоммиченных транзакций.
+        """
+        self.name = name
+        self.async_session = async_session
+        self.service = service
+        self.push = push
+        self.chunk_size = chunk_size
+        self.safety_lag = safety_lag
+
+    async def run(self) -> int:
+        """
+        Отправляет все записи, изменённые с прошлого запуска.
+
+        :return: Количество отправленных записей.
+        """
+        sent = 0
+        async with self.async_session() as session:
+            watermark = await sync_watermark_service.get_watermark(
+                session=session, name=self.name
+            )
+            while True:
+                rows = await self.service.list_changed_since(
+                    session=session,
+                    after=watermark,
+                    limit=self.chunk_size,
+                    safety_lag=self.safety_lag,
+                )
+                if not rows:
+                    break
+
+                await self.push(rows)
+
+                watermark = (rows[-1].updated_at, rows[-1].id)
+                saved = await sync_watermark_service.save_watermark(
+                    session=session,
+                    name=self.name,
+                    watermark=watermark,
+                    fencing_token=current_fencing_token.get(),
+                )
+                sent += len(rows)
+                if not saved:
+                    logging.warning(
+                        f"Sync {self.name} is taken over by another run"
+                    )
+                    break
+                # Отправленные записи больше не нужны в сессии
+                session.expunge_all()
+
+                if len(rows) < self.chunk_size:
+                    break
+        return sent
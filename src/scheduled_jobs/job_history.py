@@ -0,0 +1,140 @@
+import asyncio
+import datetime
+import logging
+from typing import Any, Awaitable, Callable
+
+from apscheduler.events import (
+    EVENT_JOB_MAX_INSTANCES,
+    EVENT_JOB_MISSED,
+    JobEvent,
+)
+from apscheduler.schedulers.base import BaseScheduler
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from scheduled_jobs.executors import current_scheduled_time
+from services import job_run_service
+from utils import ServiceError
+
+
+class JobRunRecorder:
+    """
+    Журнал запусков задач планировщика (таблица job_runs).
+
+    - Каждый запуск задачи оборачивается в track: записываются плановое
+      и фактическое время, длительность, итог и количество обработанных
+      объектов (если задача вернула число).
+    - Пропущенные запуски (опоздание больше misfire_grace_time или
+      превышение max_instances) записываются по событиям APScheduler.
+
+    Ошибка записи в журнал не влияет на выполнение задачи.
+    """
+
+    def __init__(self, async_session: async_sessionmaker):
+        """
+        :param async_session: Фабрика асинхронных сессий SQLAlchemy.
+        """
+        self.async_session = async_session
+        self._pending_writes: set[asyncio.Task] = set()
+
+    def listen(self, scheduler: BaseScheduler):
+        """
+        Подписывается на события пропуска запусков.
+
+        :param scheduler: Планировщик APScheduler.
+        """
+        scheduler.add_listener(
+            self._on_skipped, EVENT_JOB_MISSED | EVENT_JOB_MAX_INSTANCES
+        )
+
+    async def track(
+        self,
+        job_id: str,
+        func: Callable[..., Awaitable[Any]],
+        kwargs: dict,
+    ):
+        """
+        Выполняет задачу и записывает её запуск в журнал.
+
+        :param job_id: ID задачи.
+        :param func: Корутина, которая выполняет задачу.
+        :param kwargs: Именованные аргументы задачи.
+        :return: Результат задачи.
+        """
+        loop = asyncio.get_running_loop()
+        started_at = datetime.datetime.now(datetime.timezone.utc)
+        started = loop.time()
+        status, error, result = "success", None, None
+        try:
+            result = await func(**kwargs)
+            return result
+        except BaseException as e:
+            status, error = "failed", repr(e)
+            raise
+        finally:
+            await self._write(
+                job_id=job_id,
+                status=status,
+                scheduled_at=current_scheduled_time.get(),
+                started_at=started_at,
+                finished_at=datetime.datetime.now(datetime.timezone.utc),
+                duration=loop.time() - started,
+                # bool — тоже int, но количеством объектов не является
+                items_processed=(
+                    result
+                    if isinstance(result, int) and not isinstance(result, bool)
+                    else None
+                ),
+                error=error,
+            )
+
+    async def record_failed(
+        self,
+        job_id: str,
+        error: str,
+        started_at: datetime.datetime,
+        duration: float,
+    ):
+        """
+        Записывает запуск, который упал, не дойдя до выполнения
+        (например, задача очереди так и не досталась воркеру).
+
+        :param job_id: ID задачи.
+        :param error: Описание ошибки.
+        :param started_at: Когда запуск начался.
+        :param duration: Сколько он длился, в секундах.
+        """
+        await self._write(
+            job_id=job_id,
+            status="failed",
+            scheduled_at=current_scheduled_time.get(),
+            started_at=started_at,
+            finished_at=datetime.datetime.now(datetime.timezone.utc),
+            duration=duration,
+            error=error,
+        )
+
+    def _on_skipped(self, event: JobEvent):
+        if event.code == EVENT_JOB_MISSED:
+            status, scheduled_times = "missed", [event.scheduled_run_time]
+        else:
+            status, scheduled_times = "skipped", event.scheduled_run_times
+
+        for scheduled_at in scheduled_times:
+            task = asyncio.create_task(
+                self._write(
+                    job_id=event.job_id,
+                    status=status,
+                    scheduled_at=scheduled_at,
+                )
+            )
+            self._pending_writes.add(task)
+            task.add_done_callback(self._pending_writes.discard)
+
+    async def _write(self, **fields):
+        try:
+            async with self.async_session() as session:
+                await job_run_service.create(session=session, **fields)
+        except ServiceError:
+            logging.exception(
+                f"Failed to record run of job {fields['job_id']}"
+            )
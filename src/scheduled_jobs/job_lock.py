@@ -0,0 +1,203 @@
+import asyncio
+import logging
+from contextvars import ContextVar
+
+from redis.asyncio import Redis
+
+# Токен блокировки, под которой выполняется текущая задача планировщика.
+# Задачи передают его вместе с записью (см. sync_watermarks), чтобы
+# отбрасывать запись от исполнителя, чья блокировка уже перешла к другому.
+current_fencing_token: ContextVar[int | None] = ContextVar(
+    "current_fencing_token", default=None
+)
+
+# Блокировка текущей задачи: (блокировка, ID задачи, токен)
+current_job_lock: ContextVar[tuple["RedisJobLock", str, int] | None] = (
+    ContextVar("current_job_lock", default=None)
+)
+
+
+class LockLostError(Exception):
+    """
+    Блокировка задачи перешла к другому исполнителю.
+    """
+
+
+# Захват блокировки: выдаёт следующий fencing token, если ключ свободен.
+# KEYS: ключ блокировки, счётчик токенов; ARGV: срок аренды в мс
+ACQUIRE_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return nil
+end
+local token = redis.call('INCR', KEYS[2])
+redis.call('SET', KEYS[1], token, 'PX', ARGV[1])
+return token
+"""
+
+# Продление аренды, только если блокировка всё ещё наша.
+# KEYS: ключ блокировки; ARGV: токен, срок аренды в мс
+RENEW_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+# Снятие блокировки, только если она всё ещё наша.
+# KEYS: ключ блокировки; ARGV: токен
+RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class RedisJobLock:
+    """
+    Распределённая блокировка задач планировщика в Redis.
+
+    - Блокировка берётся на время аренды (lease) и продлевается,
+      пока задача выполняется. Если процесс упал, блокировка
+      освободится сама по истечении аренды.
+    - Каждый захват выдаёт монотонно растущий fencing token.
+      Снять или продлить блокировку можно только со своим токеном.
+    - После успешного выполнения слот (плановое время запуска)
+      помечается выполненным, поэтому реплика, запустившая тот же
+      слот чуть позже, его пропустит.
+    """
+
+    def __init__(
+        self,
+        redis: Redis,
+        lease_ms: int = 30_000,
+        done_ttl_ms: int = 24 * 60 * 60 * 1000,
+        key_prefix: str = "scheduler",
+    ):
+        """
+        :param redis: Клиент Redis.
+        :param lease_ms: Срок аренды блокировки в миллисекундах.
+        :param done_ttl_ms: Сколько помнить выполненные слоты.
+        :param key_prefix: Префикс ключей в Redis.
+        """
+        self.redis = redis
+        self.lease_ms = lease_ms
+        self.done_ttl_ms = done_ttl_ms
+        self.key_prefix = key_prefix
+
+        self._acquire = redis.register_script(ACQUIRE_SCRIPT)
+        self._renew = redis.register_script(RENEW_SCRIPT)
+        self._release = redis.register_script(RELEASE_SCRIPT)
+
+    def _lock_key(self, job_id: str) -> str:
+        return f"{self.key_prefix}:lock:{job_id}"
+
+    def _fence_key(self, job_id: str) -> str:
+        return f"{self.key_prefix}:fence:{job_id}"
+
+    def _done_key(self, job_id: str, slot: int) -> str:
+        return f"{self.key_prefix}:done:{job_id}:{slot}"
+
+    async def acquire(self, job_id: str) -> int | None:
+        """
+        Пытается взять блокировку задачи.
+
+        :param job_id: ID задачи.
+        :return: Fencing token или None, если блокировка занята.
+        """
+        token = await self._acquire(
+            keys=[self._lock_key(job_id), self._fence_key(job_id)],
+            args=[self.lease_ms],
+        )
+        return int(token) if token is not None else None
+
+    async def renew(self, job_id: str, token: int) -> bool:
+        """
+        Продлевает аренду блокировки.
+
+        :return: False, если блокировка уже не принадлежит токену.
+        """
+        return bool(
+            await self._renew(
+                keys=[self._lock_key(job_id)], args=[token, self.lease_ms]
+            )
+        )
+
+    async def release(self, job_id: str, token: int):
+        """
+        Снимает блокировку, если она всё ещё принадлежит токену.
+        """
+        await self._release(keys=[self._lock_key(job_id)], args=[token])
+
+    async def is_held(self, job_id: str, token: int) -> bool:
+        """
+        Проверяет, принадлежит ли блокировка всё ещё токену.
+        """
+        value = await self.redis.get(self._lock_key(job_id))
+        return value is not None and int(value) == token
+
+    async def is_done(self, job_id: str, slot: int) -> bool:
+        """
+        Проверяет, выполнен ли уже слот задачи какой-либо репликой.
+        """
+        return bool(await self.redis.exists(self._done_key(job_id, slot)))
+
+    async def mark_done(self, job_id: str, slot: int):
+        """
+        Помечает слот задачи выполненным.
+        """
+        await self.redis.set(
+            self._done_key(job_id, slot), 1, px=self.done_ttl_ms
+        )
+
+    async def keep_alive(
+        self, job_id: str, token: int, task: asyncio.Task
+    ) -> bool:
+        """
+        Продлевает аренду, пока выполняется задача. Если блокировка
+        потеряна (аренда истекла и её забрала другая реплика),
+        задача отменяется, чтобы две реплики не работали одновременно.
+
+        :param job_id: ID задачи.
+        :param token: Fencing token текущего захвата.
+        :param task: Выполняющаяся задача.
+        :return: True, если блокировка была потеряна.
+        """
+        loop = asyncio.get_running_loop()
+        interval = self.lease_ms / 1000 / 3
+        renewed_at = loop.time()
+        while not task.done():
+            await asyncio.sleep(interval)
+            try:
+                if await self.renew(job_id, token):
+                    renewed_at = loop.time()
+                    continue
+                logging.error(f"Lost lock for job {job_id}, cancelling it")
+            except Exception:
+                logging.exception(f"Failed to renew lock for job {job_id}")
+                if loop.time() - renewed_at < self.lease_ms / 1000:
+                    continue
+                logging.error(f"Lock for job {job_id} expired, cancelling it")
+            task.cancel()
+            return True
+        return False
+
+
+async def ensure_lock_held():
+    """
+    Проверяет, что текущая задача всё ещё владеет своей блокировкой.
+
+    keep_alive замечает потерю блокировки только при очередном
+    продлении, поэтому задачи с внешними побочными эффектами, которые
+    нельзя отбросить по fencing token (например, отправка сообщений),
+    вызывают эту проверку перед каждой порцией таких действий.
+    Вне блокировки (без Redis) ничего не проверяет.
+
+    :raises LockLostError: Если блокировка перешла к другому исполнителю.
+    """
+    held = current_job_lock.get()
+    if held is None:
+        return
+    job_lock, job_id, token = held
+    if not await job_lock.is_held(job_id, token):
+        raise LockLostError(f"Lock for job {job_id} is lost")
@@ -0,0 +1,42 @@
+class JobStats:
+    """
+    Счётчики запусков одной задачи в текущем процессе.
+    """
+
+    def __init__(self):
+        self.runs = 0
+        self.failed = 0
+        self.missed = 0
+        self.skipped = 0
+        self.running = 0
+        self.last_duration: float | None = None
+        self.max_duration = 0.0
+        self.total_duration = 0.0
+
+    def record_run(self, duration: float, failed: bool = False):
+        """
+        Учитывает завершённый запуск.
+
+        :param duration: Длительность запуска в секундах.
+        :param failed: Завершился ли запуск ошибкой.
+        """
+        self.runs += 1
+        if failed:
+            self.failed += 1
+        self.last_duration = duration
+        self.max_duration = max(self.max_duration, duration)
+        self.total_duration += duration
+
+    def as_dict(self) -> dict:
+        return {
+            "runs": self.runs,
+            "failed": self.failed,
+            "missed": self.missed,
+            "skipped": self.skipped,
+            "running": self.running,
+            "last_duration": self.last_duration,
+            "avg_duration": (
+                self.total_duration / self.runs if self.runs else None
+            ),
+            "max_duration": self.max_duration,
+        }
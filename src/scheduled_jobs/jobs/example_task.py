@@ -1,8 +1,8 @@
-import logging
-
 from sqlalchemy.ext.asyncio import async_sessionmaker
 
 from api_client import ApiClientManager
+from schemas import ItemSchema
+from scheduled_jobs.incremental_sync import IncrementalSync
 from services import item_service
 
 
@@ -10,19 +10,29 @@ async def example_scheduler_task(
     api_client: ApiClientManager, async_session: async_sessionmaker
 ):
     """
-    Пример задачи для планировщика.
+    Пример задачи для планировщика: отправляет во внешний API штуки,
+    изменённые с прошлого запуска (включая деактивированные).
+
+    Исключения не перехватываются: их записывает журнал запусков
+    задач (job_runs) и логирует APScheduler.
 
     :param api_client: Клиент для работы с внешними API.
     :param async_session: Фабрика асинхронных сессий для работы с базой данных.
+    :return: Количество отправленных объектов.
     """
 
-    try:
-        # Пример работы с базой данных
-        async with async_session() as session:
-            items = await item_service.list(session=session)
-
-        # Пример работы с API-клиентом
-        await api_client.some_client.item_client.bulk_create(items)
-
-    except Exception:
-        logging.exception("Exception in example scheduler job: ")
+    async def push_items(items):
+        result = await api_client.some_client.item_client.bulk_create(
+            ItemSchema.model_validate(item) for item in items
+        )
+        # Отметка синхронизации не сдвигается, пока не принята вся
+        # страница
+        result.raise_for_failures()
+
+    items_sync = IncrementalSync(
+        "some_api_items",
+        async_session=async_session,
+        service=item_service,
+        push=push_items,
+    )
+    return await items_sync.run()
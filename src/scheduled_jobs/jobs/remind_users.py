@@ -1,7 +1,9 @@
 import asyncio
 import datetime
+import functools
 import logging
 import random
+import zoneinfo
 
 from aiogram import Bot
 from aiogram.exceptions import (
@@ -9,8 +11,15 @@ from aiogram.exceptions import (
     TelegramForbiddenError,
     TelegramNetworkError,
 )
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import async_sessionmaker
 
+from scheduled_jobs.executors import current_scheduled_time
+from scheduled_jobs.job_lock import LockLostError, ensure_lock_held
+from scheduled_jobs.reminder_index import (
+    REMINDER_SLOTS,
+    REMINDER_TIMEOUT,
+    ReminderIndex,
+)
 from services import user_service
 
 # ограничение ТГ 30 сообщений в секунду
@@ -18,71 +27,243 @@ from services import user_service
 MESSAGES_PER_SECOND = 25
 # Задержка между сообщениями
 DELAY_BETWEEN_MESSAGES = 1 / MESSAGES_PER_SECOND
+# Задача запускается раз в минуту: слайс отправляется не дольше
+# SEND_BUDGET от планового времени запуска, остальное уходит
+# в следующие слайсы. Время отправки (и повторы после сетевых ошибок)
+# заранее неизвестно, поэтому слайс ограничен по времени, а SLICE_LIMIT
+# только ограничивает выборку
+SEND_BUDGET = datetime.timedelta(seconds=50)
+SLICE_LIMIT = MESSAGES_PER_SECOND * 50
+
+
+@functools.cache
+def _all_timezones() -> tuple[zoneinfo.ZoneInfo, ...]:
+    return tuple(
+        zoneinfo.ZoneInfo(name)
+        for name in sorted(zoneinfo.available_timezones())
+    )
 
 
-async def remind_users(bot: Bot, async_session: AsyncSession):
+def due_slots(
+    now: datetime.datetime, start_hour: int, window: int
+) -> dict[int, list[str]]:
     """
-    Отправляет напоминания пользователям, которые не были активны 3 дня.
+    Определяет, какие часовые пояса сейчас находятся в окне рассылки
+    и до какого слота в каждом из них нужно дойти.
 
-    :param bot: Экземпляр Telegram-бота.
-    :param db_session: Асинхронная сессия базы данных.
+    Окно из window минут делится на равные части: к концу каждой минуты
+    окна обрабатывается очередная доля слотов, поэтому напоминания
+    уходят равномерно, а не одним залпом в начале окна.
+
+    :param now: Текущее время (с часовым поясом).
+    :param start_hour: Час начала окна по местному времени.
+    :param window: Длительность окна в минутах.
+    :return: Словарь {граница слотов: список часовых поясов}.
     """
-    timeout = datetime.datetime.now(
-        datetime.timezone.utc
-    ) - datetime.timedelta(days=3)
+    slots: dict[int, list[str]] = {}
+    for tz in _all_timezones():
+        local = now.astimezone(tz)
+        elapsed = (local.hour * 60 + local.minute - start_hour * 60) % 1440
+        if elapsed >= window:
+            continue
+        slot_before = (elapsed + 1) * REMINDER_SLOTS // window
+        slots.setdefault(slot_before, []).append(tz.key)
+    return slots
 
+
+async def _select_from_db(
+    async_session: async_sessionmaker,
+    slots: dict[int, list[str]],
+    timeout: datetime.datetime,
+):
+    users = []
     async with async_session() as session:
-        users = await user_service.get_bobs_for_reminder(
-            session=session, timeout=timeout
+        for slot_before, timezones in slots.items():
+            users += await user_service.get_bobs_for_reminder(
+                session=session,
+                timeout=timeout,
+                timezones=timezones,
+                slot_before=slot_before,
+                limit=SLICE_LIMIT - len(users),
+            )
+            if len(users) >= SLICE_LIMIT:
+                break
+    return users
+
+
+async def _select_from_index(
+    async_session: async_sessionmaker,
+    reminder_index: ReminderIndex,
+    slots: dict[int, list[str]],
+    timeout: datetime.datetime,
+    now: datetime.datetime,
+):
+    await reminder_index.promote(now)
+    entries = []
+    for slot_before, timezones in slots.items():
+        entries += await reminder_index.slice(
+            timezones, slot_before, SLICE_LIMIT - len(entries)
         )
+        if len(entries) >= SLICE_LIMIT:
+            break
 
-        if not users:
-            return
+    async with async_session() as session:
+        users = await user_service.get_bobs_for_reminder_by_ids(
+            session=session,
+            timeout=timeout,
+            user_ids=[user_id for _, user_id in entries],
+        )
+    return users, entries
 
-        reminded_users_ids = []
-        blocked_users_ids = []
 
-        # Функция для повторной отправки сообщения
-        async def send_with_retry(user_id, message):
-            retry_attempts = 3
-            for attempt in range(retry_attempts):
-                try:
-                    await bot.send_message(user_id, message)
-                    return True
-                except TelegramForbiddenError:
-                    return False
-                except TelegramBadRequest as e:
-                    if "chat not found" in str(e):
-                        return False
-                except TelegramNetworkError:
-                    # Ждем случайное время и пробуем снова
-                    wait_time = random.uniform(
-                        2, 5
-                    )  # случайное время от 2 до 5 секунд
-                    await asyncio.sleep(wait_time)
-                    logging.exception(
-                        "TelegramNetworkError while notification: "
-                    )
-                    continue
-                except Exception:
-                    logging.exception("Unexpected error while notification: ")
+async def remind_users(
+    bot: Bot,
+    async_session: async_sessionmaker,
+    start_hour: int = 9,
+    window: int = 180,
+    reminder_index: ReminderIndex | None = None,
+):
+    """
+    Отправляет очередной слайс напоминаний пользователям, которые
+    не были активны 3 дня.
+
+    Задача запускается каждую минуту. Пользователь получает
+    напоминание в окне рассылки по своему местному времени, а внутри
+    окна — в минуту, определяемую его слотом. Так нагрузка на базу
+    и исходящий поток сообщений остаются ровными. Отправка
+    прекращается через SEND_BUDGET после планового времени запуска,
+    чтобы слайс не наезжал на следующий; неотправленные напоминания
+    достаются следующим слайсам.
+
+    :param bot: Экземпляр Telegram-бота.
+    :param async_session: Фабрика асинхронных сессий для работы с базой данных.
+    :param start_hour: Час начала окна рассылки по местному времени.
+    :param window: Длительность окна рассылки в минутах.
+    :param reminder_index: Индекс кандидатов в Redis (опционально).
+     Без него кандидаты выбираются запросом к таблице users.
+    :return: Количество отправленных напоминаний.
+    """
+    now = datetime.datetime.now(datetime.timezone.utc)
+    deadline = (current_scheduled_time.get() or now) + SEND_BUDGET
+    timeout = now - REMINDER_TIMEOUT
+    slots = due_slots(now, start_hour, window)
+
+    entries = []
+    if reminder_index:
+        users, entries = await _select_from_index(
+            async_session, reminder_index, slots, timeout, now
+        )
+    else:
+        users = await _select_from_db(async_session, slots, timeout)
+
+    if len(users) >= SLICE_LIMIT:
+        logging.warning(
+            "Reminder slice limit reached, "
+            "the rest will be sent in the next slices"
+        )
+
+    if not users:
+        if entries:
+            # Кандидаты из индекса, которые уже не подходят
+            await reminder_index.discard(entries)
+        return 0
+
+    reminded_users_ids = []
+    blocked_users_ids = []
+
+    # Функция для повторной отправки сообщения. None — не отправлено
+    # из-за сетевых ошибок до конца слайса, пробуем в следующем
+    async def send_with_retry(user_id, message):
+        retry_attempts = 3
+        for attempt in range(retry_attempts):
+            try:
+                await bot.send_message(user_id, message)
+                return True
+            except TelegramForbiddenError:
+                return False
+            except TelegramBadRequest as e:
+                if "chat not found" in str(e):
                     return False
-            return False  # если все попытки не удались
+            except TelegramNetworkError:
+                # Ждем случайное время и пробуем снова
+                wait_time = random.uniform(
+                    2, 5
+                )  # случайное время от 2 до 5 секунд
+                retry_at = datetime.datetime.now(
+                    datetime.timezone.utc
+                ) + datetime.timedelta(seconds=wait_time)
+                if retry_at >= deadline:
+                    return None
+                await asyncio.sleep(wait_time)
+                logging.exception("TelegramNetworkError while notification: ")
+                continue
+            except Exception:
+                logging.exception("Unexpected error while notification: ")
+                return False
+        return False  # если все попытки не удались
+
+    reminded_count = 0
+
+    async def save_progress():
+        # Сохраняем отправленное сразу: повтор задачи после сбоя
+        # не отправит эти напоминания ещё раз
+        nonlocal reminded_count
+        if not (reminded_users_ids or blocked_users_ids):
+            return
+        async with async_session() as session:
+            if reminded_users_ids:
+                await user_service.bulk_update(
+                    session=session,
+                    obj_ids=reminded_users_ids,
+                    is_reminded=True,
+                )
+            if blocked_users_ids:
+                await user_service.bulk_update(
+                    session=session,
+                    obj_ids=blocked_users_ids,
+                    is_active=False,
+                )
+        reminded_count += len(reminded_users_ids)
+        reminded_users_ids.clear()
+        blocked_users_ids.clear()
 
-        for user in users:
-            success = await send_with_retry(user.tg_id, "Where are you?")
+    unsent = set()
+    try:
+        for i, user in enumerate(users):
+            # Раз в секунду сохраняем отправленное и, так как сообщение
+            # не отменить fencing token'ом, проверяем, что блокировка
+            # задачи всё ещё наша
+            if i % MESSAGES_PER_SECOND == 0:
+                await save_progress()
+                try:
+                    await ensure_lock_held()
+                except LockLostError:
+                    logging.error("Reminder job lost its lock, stopping")
+                    unsent.update(user.id for user in users[i:])
+                    break
+            if datetime.datetime.now(datetime.timezone.utc) >= deadline:
+                logging.warning(
+                    f"Reminder slice ran out of time, {len(users) - i} "
+                    "reminders are left for the next slices"
+                )
+                unsent.update(user.id for user in users[i:])
+                break
+            success = await send_with_retry(user.id, "Where are you?")
             if success:
-                reminded_users_ids.append(user.tg_id)
+                reminded_users_ids.append(user.id)
+            elif success is False:
+                blocked_users_ids.append(user.id)
             else:
-                blocked_users_ids.append(user.tg_id)
+                unsent.add(user.id)
             await asyncio.sleep(DELAY_BETWEEN_MESSAGES)
+    finally:
+        await save_progress()
 
-        if reminded_users_ids:
-            await user_service.bulk_update(
-                session=session, obj_ids=reminded_users_ids, is_reminded=True
-            )
+    if unsent:
+        # Неотправленные остаются в индексе для следующего слайса
+        entries = [e for e in entries if e[1] not in unsent]
 
-        if blocked_users_ids:
-            await user_service.bulk_update(
-                session=session, obj_ids=blocked_users_ids, is_active=False
-            )
+    if entries:
+        await reminder_index.discard(entries)
+
+    return reminded_count
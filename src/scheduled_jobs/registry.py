@@ -0,0 +1,57 @@
+import inspect
+from typing import Any, Awaitable, Callable
+
+# Задачи планировщика и их аргументы, по ID задачи
+_jobs: dict[str, tuple[Callable[..., Awaitable[Any]], dict]] = {}
+
+
+def register_job(
+    job_id: str, func: Callable[..., Awaitable[Any]], kwargs: dict
+):
+    """
+    Регистрирует функцию задачи и её аргументы в текущем процессе.
+
+    :param job_id: ID задачи.
+    :param func: Корутина задачи.
+    :param kwargs: Именованные аргументы задачи.
+    """
+    _jobs[job_id] = (func, kwargs)
+
+
+async def run_registered_job(job_id: str):
+    """
+    Запускает зарегистрированную задачу.
+
+    В хранилище задач сохраняется вызов этой функции с одним ID задачи,
+    а не сама задача: бот, фабрика сессий и API-клиент не сериализуются
+    и у каждого процесса свои.
+
+    :param job_id: ID задачи.
+    :return: Результат задачи.
+    """
+    func, kwargs = _jobs[job_id]
+    return await func(**kwargs)
+
+
+def inject_resources(
+    func: Callable[..., Any], kwargs: dict, resources: dict
+) -> dict:
+    """
+    Добавляет к аргументам задачи ресурсы процесса (бот, фабрика
+    сессий, API-клиент и т.д.), которые задача запрашивает по имени
+    параметра. Явно переданные аргументы не перезаписываются.
+
+    :param func: Функция задачи.
+    :param kwargs: Именованные аргументы задачи.
+    :param resources: Ресурсы процесса по именам параметров.
+    :return: Аргументы вместе с ресурсами.
+    """
+    parameters = inspect.signature(func).parameters
+    return {
+        **{
+            name: resource
+            for name, resource in resources.items()
+            if name in parameters and resource is not None
+        },
+        **kwargs,
+    }
@@ -0,0 +1,178 @@
+import datetime
+import logging
+from typing import Any, Iterable
+
+from redis.asyncio import Redis
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from services import user_service
+
+# Через сколько после последней активности пользователю нужно напомнить
+REMINDER_TIMEOUT = datetime.timedelta(days=3)
+# Количество слотов, см. User.reminder_slot
+REMINDER_SLOTS = 1024
+
+# Переносит пользователей, чьё время напоминания наступило, из общего
+# множества в множества часовых поясов, упорядоченные по слоту
+PROMOTE_SCRIPT = """
+local members = redis.call(
+    'ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2]
+)
+for _, member in ipairs(members) do
+    local sep = string.find(member, '|', 1, true)
+    local user_id = string.sub(member, sep + 1)
+    redis.call(
+        'ZADD',
+        ARGV[3] .. string.sub(member, 1, sep - 1),
+        tonumber(user_id) % tonumber(ARGV[4]),
+        user_id
+    )
+end
+if #members > 0 then
+    redis.call('ZREM', KEYS[1], unpack(members))
+end
+return #members
+"""
+
+
+class ReminderIndex:
+    """
+    Индекс кандидатов на напоминание в Redis.
+
+    - `<prefix>:due` — sorted set всех активных пользователей
+      (элемент `<часовой пояс>|<id>`), score — время, когда пользователю
+      пора напомнить (последняя активность + REMINDER_TIMEOUT).
+      Обновляется при записи активности.
+    - `<prefix>:ready:<часовой пояс>` — пользователи, которым уже пора
+      напомнить, score — слот. Сюда их переносит promote.
+
+    Выбор очередного слайса стоит O(log n + N) вместо сканирования
+    таблицы users. Индекс может отставать от базы: выбранные
+    пользователи всё равно проверяются в базе по первичному ключу,
+    а обработанные удаляются из индекса через discard.
+    """
+
+    def __init__(self, redis: Redis, key_prefix: str = "reminders"):
+        """
+        :param redis: Асинхронный клиент Redis.
+        :param key_prefix: Префикс ключей индекса.
+        """
+        self.redis = redis
+        self.key_prefix = key_prefix
+        self.due_key = f"{key_prefix}:due"
+        self._promote = redis.register_script(PROMOTE_SCRIPT)
+
+    def _ready_key(self, timezone: str) -> str:
+        return f"{self.key_prefix}:ready:{timezone}"
+
+    async def touch(self, users: Iterable[Any]):
+        """
+        Обновляет индекс по записанной активности.
+
+        :param users: Строки с полями id, timezone, last_active
+         и is_active.
+        """
+        pipe = self.redis.pipeline(transaction=False)
+        for user in users:
+            member = f"{user.timezone}|{user.id}"
+            if user.is_active:
+                due_at = user.last_active + REMINDER_TIMEOUT
+                pipe.zadd(self.due_key, {member: due_at.timestamp()})
+            else:
+                pipe.zrem(self.due_key, member)
+            pipe.zrem(self._ready_key(user.timezone), user.id)
+        await pipe.execute()
+
+    async def promote(self, now: datetime.datetime, batch: int = 1000) -> int:
+        """
+        Переносит пользователей, которым пора напомнить, в множества
+        их часовых поясов.
+
+        :param now: Текущее время.
+        :param batch: Сколько пользователей переносить за один вызов
+         скрипта.
+        :return: Количество перенесённых пользователей.
+        """
+        promoted = 0
+        while True:
+            moved = await self._promote(
+                keys=[self.due_key],
+                args=[
+                    now.timestamp(),
+                    batch,
+                    f"{self.key_prefix}:ready:",
+                    REMINDER_SLOTS,
+                ],
+            )
+            promoted += moved
+            if moved < batch:
+                return promoted
+
+    async def slice(
+        self, timezones: list[str], slot_before: int, limit: int
+    ) -> list[tuple[str, int]]:
+        """
+        Возвращает пользователей из заданных часовых поясов со слотом
+        меньше slot_before. Из индекса они не удаляются до discard.
+
+        :param timezones: Часовые пояса.
+        :param slot_before: Верхняя граница слотов (не включительно).
+        :param limit: Максимальный размер слайса.
+        :return: Список пар (часовой пояс, ID пользователя).
+        """
+        entries = []
+        for timezone in timezones:
+            user_ids = await self.redis.zrangebyscore(
+                self._ready_key(timezone),
+                0,
+                f"({slot_before}",
+                start=0,
+                num=limit - len(entries),
+            )
+            entries += [(timezone, int(user_id)) for user_id in user_ids]
+            if len(entries) >= limit:
+                break
+        return entries
+
+    async def discard(self, entries: Iterable[tuple[str, int]]):
+        """
+        Удаляет обработанных (получивших напоминание, заблокировавших
+        бота или больше не подходящих) пользователей из индекса.
+
+        :param entries: Пары (часовой пояс, ID пользователя).
+        """
+        pipe = self.redis.pipeline(transaction=False)
+        for timezone, user_id in entries:
+            pipe.zrem(self._ready_key(timezone), user_id)
+        await pipe.execute()
+
+    async def rebuild(
+        self, async_session: async_sessionmaker, batch: int = 5000
+    ) -> int:
+        """
+        Пересобирает индекс по базе.
+
+        :param async_session: Фабрика асинхронных сессий SQLAlchemy.
+        :param batch: Сколько пользователей читать из базы за раз.
+        :return: Количество пользователей в индексе.
+        """
+        keys = [
+            key
+            async for key in self.redis.scan_iter(match=f"{self.key_prefix}:*")
+        ]
+        if keys:
+            await self.redis.delete(*keys)
+
+        indexed, after_id = 0, None
+        async with async_session() as session:
+            while True:
+                users = await user_service.list_reminder_candidates(
+                    session=session, after_id=after_id, limit=batch
+                )
+                if not users:
+                    break
+                await self.touch(users)
+                indexed += len(users)
+                after_id = users[-1].id
+        logging.info(f"Reminder index rebuilt: {indexed} users")
+        return indexed
@@ -1,12 +1,49 @@
+import asyncio
+import datetime
+import inspect
+import json
+import logging
 from datetime import timezone
+from typing import Any, Callable, Literal
 
 from aiogram import Bot
+from apscheduler.events import (
+    EVENT_JOB_MAX_INSTANCES,
+    EVENT_JOB_MISSED,
+    JobEvent,
+)
+from apscheduler.jobstores.redis import RedisJobStore
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from apscheduler.triggers.base import BaseTrigger
 from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
+from redis.asyncio import Redis
 from sqlalchemy.ext.asyncio import async_sessionmaker
 
 from api_client import ApiClientManager
+from config import RedisConfig, SchedulerConfig, TaskQueueConfig
+from scheduled_jobs.adaptive import AdaptiveInterval
+from scheduled_jobs.executors import (
+    LockedAsyncIOExecutor,
+    current_scheduled_time,
+    current_slot,
+)
+from scheduled_jobs.heavy_jobs import HeavyJobRunner
+from scheduled_jobs.job_history import JobRunRecorder
+from scheduled_jobs.job_lock import RedisJobLock
+from scheduled_jobs.job_stats import JobStats
 from scheduled_jobs.jobs import example_scheduler_task, remind_users
+from scheduled_jobs.registry import (
+    inject_resources,
+    register_job,
+    run_registered_job,
+)
+from scheduled_jobs.reminder_index import ReminderIndex
+from task_queue.task_queue import TaskQueue
+
+# Общая точка отсчёта интервальных задач: запуски всех реплик ложатся
+# на одну сетку, и слот запуска у них совпадает
+INTERVAL_ANCHOR = datetime.datetime(2024, 1, 1, tzinfo=timezone.utc)
 
 
 class SchedulerManager:
@@ -15,6 +52,10 @@ class SchedulerManager:
         bot: Bot | None = None,
         async_session: async_sessionmaker | None = None,
         api_client: ApiClientManager | None = None,
+        redis: Redis | None = None,
+        redis_config: RedisConfig | None = None,
+        scheduler_config: SchedulerConfig | None = None,
+        task_queue_config: TaskQueueConfig | None = None,
     ):
         """
         Менеджер для управления жизненным циклом планировщика.
@@ -22,30 +63,408 @@ class SchedulerManager:
         :param bot: Экземпляр Telegram-бота (опционально).
         :param async_session: Фабрика сессий для работы с БД (опционально).
         :param api_client: Клиент для работы с внешними API (опционально).
+        :param redis: Клиент Redis для блокировок задач (опционально).
+        :param redis_config: Настройки Redis для хранилища задач
+         (опционально).
+        :param scheduler_config: Настройки планировщика (опционально).
+        :param task_queue_config: Настройки очереди фоновых задач
+         (опционально). Если очередь включена, задачи по умолчанию
+         ставятся в очередь и выполняются воркерами.
         """
         self.bot = bot
         self.async_session = async_session
         self.api_client = api_client
-        self.scheduler = AsyncIOScheduler()
+        self.redis = redis
+        self.redis_config = redis_config
+        self.scheduler_config = scheduler_config or SchedulerConfig()
+        self.task_queue: TaskQueue | None = None
+        if redis and task_queue_config and task_queue_config.enabled:
+            self.task_queue = TaskQueue(redis, task_queue_config)
+        # Ресурсы, которые задачи получают по имени параметра
+        self.resources = {
+            "bot": bot,
+            "async_session": async_session,
+            "api_client": api_client,
+            "redis": redis,
+            "reminder_index": (
+                ReminderIndex(redis)
+                if redis and self.scheduler_config.reminder_index
+                else None
+            ),
+        }
+        # Не больше одного запуска задачи одновременно; накопившиеся
+        # пропущенные запуски выполняются один раз
+        self.scheduler = AsyncIOScheduler(
+            job_defaults={"max_instances": 1, "coalesce": True}
+        )
+        self.jobstore: RedisJobStore | None = None
+        self.heavy_job_runner = HeavyJobRunner(
+            thread_workers=self.scheduler_config.thread_workers,
+            process_workers=self.scheduler_config.process_workers,
+            max_concurrent=self.scheduler_config.max_heavy_jobs,
+        )
+        self.job_run_recorder: JobRunRecorder | None = None
+        self.job_stats: dict[str, JobStats] = {}
+        self.adaptive_intervals: dict[str, AdaptiveInterval] = {}
+        # Длина слота (см. LockedAsyncIOExecutor) по ID задачи
+        self.slot_sizes: dict[str, float] = {}
+        self.scheduler.add_listener(
+            self._on_job_skipped, EVENT_JOB_MISSED | EVENT_JOB_MAX_INSTANCES
+        )
 
     async def configure(self):
         """
         Настройка задач планировщика.
         """
+        self.configure_executor()
+        self.configure_jobstore()
+        self.configure_job_history()
 
-        self.scheduler.add_job(
+        # С очередью задачи выполняют воркеры (python src/main.py worker)
+        executor = "queue" if self.task_queue else "event_loop"
+
+        # Напоминания отправляются небольшими слайсами каждую минуту
+        # в окне рассылки по местному времени пользователей
+        self.add_job(
+            "remind_users",
             remind_users,
-            CronTrigger(hour=9, minute=0, timezone=timezone.utc),
-            misfire_grace_time=60,
-            args=[self.bot, self.async_session],
+            CronTrigger(second=0, timezone=timezone.utc),
+            kwargs={
+                "start_hour": self.scheduler_config.reminder_hour,
+                "window": self.scheduler_config.reminder_window,
+            },
+            executor=executor,
+            misfire_grace_time=30,
         )
-        self.scheduler.add_job(
+        # Интервал растягивается до 30 минут, если внешний API
+        # отвечает медленно, и возвращается к 5 минутам, когда
+        # нагрузка спадает. Jitter разносит запуски задач; слот у реплик
+        # общий, так что за 5 минут задача выполняется один раз
+        self.add_job(
+            "example_scheduler_task",
             example_scheduler_task,
-            CronTrigger(minute="*/5", timezone=timezone.utc),
+            IntervalTrigger(
+                minutes=5,
+                jitter=30,
+                start_date=INTERVAL_ANCHOR,
+                timezone=timezone.utc,
+            ),
+            executor=executor,
+            adaptive=AdaptiveInterval(
+                max_interval=datetime.timedelta(minutes=30)
+            ),
             misfire_grace_time=60,
-            args=[self.api_client, self.async_session],
         )
 
+        # Тяжёлая задача в отдельном процессе: подключения к базе
+        # и API-клиент она получит свои, по именам параметров
+        # async_session и api_client
+        # self.add_job(
+        #     "nightly_aggregation",
+        #     nightly_aggregation,
+        #     CronTrigger(hour=3, minute=0, timezone=timezone.utc),
+        #     executor="process",
+        #     misfire_grace_time=600,
+        # )
+
+    def configure_executor(self):
+        """
+        Подключает исполнитель задач. Если есть Redis, задачи
+        запускаются под распределённой блокировкой: при нескольких
+        репликах задача выполняется одной из них.
+        """
+        job_lock = None
+        if self.redis and self.scheduler_config.job_lock:
+            job_lock = RedisJobLock(
+                self.redis,
+                lease_ms=int(self.scheduler_config.lock_lease * 1000),
+                key_prefix=self.scheduler_config.key_prefix,
+            )
+        self.scheduler.add_executor(
+            LockedAsyncIOExecutor(job_lock, self.slot_sizes), alias="default"
+        )
+        # Задачи очереди выполняются под той же блокировкой в воркере,
+        # а здесь только ставятся в очередь и ждут итога
+        self.scheduler.add_executor(
+            LockedAsyncIOExecutor(slot_sizes=self.slot_sizes), alias="queue"
+        )
+
+    def configure_jobstore(self):
+        """
+        Подключает хранилище задач в Redis, если оно включено.
+
+        Хранилищем должен владеть один планировщик: APScheduler 3
+        не согласует между процессами ни выборку задач, ни запись
+        времени следующего запуска.
+        """
+        if not (self.redis_config and self.scheduler_config.persistent_jobs):
+            return
+        key_prefix = self.scheduler_config.key_prefix
+        self.jobstore = RedisJobStore(
+            jobs_key=f"{key_prefix}:jobs",
+            run_times_key=f"{key_prefix}:run_times",
+            host=self.redis_config.redis_host,
+            port=self.redis_config.redis_port,
+            db=self.redis_config.redis_db,
+        )
+        self.scheduler.add_jobstore(self.jobstore, alias="default")
+
+    def configure_job_history(self):
+        """
+        Подключает журнал запусков задач, если есть база данных.
+        """
+        if not self.async_session:
+            return
+        self.job_run_recorder = JobRunRecorder(self.async_session)
+        self.job_run_recorder.listen(self.scheduler)
+
+    def add_job(
+        self,
+        job_id: str,
+        func: Callable[..., Any],
+        trigger: BaseTrigger,
+        kwargs: dict | None = None,
+        executor: Literal[
+            "event_loop", "thread", "process", "queue"
+        ] = "event_loop",
+        adaptive: AdaptiveInterval | None = None,
+        **options,
+    ):
+        """
+        Добавляет задачу в планировщик.
+
+        Задача хранится как вызов run_registered_job(job_id), поэтому
+        её можно сохранить в хранилище задач, даже если аргументы
+        (бот, фабрика сессий) не сериализуются. Каждый запуск
+        записывается в журнал job_runs; если задача возвращает число,
+        оно сохраняется как количество обработанных объектов.
+
+        Ресурсы процесса (bot, async_session, api_client, redis,
+        reminder_index) задача получает по имени параметра, их не нужно
+        передавать в kwargs. Задачам "thread" они не передаются:
+        ресурсы привязаны к event loop приложения, поэтому такая задача
+        не может их запрашивать. Задачи "process" создают свои
+        (см. run_job_in_process).
+
+        :param job_id: Уникальный ID задачи.
+        :param func: Задача: корутина для "event_loop", синхронная
+         функция для "thread", функция или корутина уровня модуля
+         для "process", корутина из task_queue.tasks.TASKS для "queue".
+        :param trigger: Триггер APScheduler.
+        :param kwargs: Именованные аргументы задачи. Для "process" они
+         должны быть сериализуемыми, для "queue" — сериализуемыми в JSON.
+        :param executor: Где выполнять задачу:
+         - "event_loop": в event loop приложения (лёгкие задачи);
+         - "thread": в пуле потоков;
+         - "process": в пуле процессов (CPU-тяжёлые задачи);
+         - "queue": поставить в очередь для воркеров и дождаться итога;
+           запуск записывается в журнал воркером, а длительность
+           из воркера попадает в метрики и адаптивный интервал.
+        :param adaptive: Адаптивный интервал (только для IntervalTrigger).
+        :param options: Остальные параметры add_job APScheduler
+         (misfire_grace_time, max_instances, coalesce и т.д.).
+         Разброс времени запуска задаётся параметром jitter триггера.
+        """
+        name = func.__name__
+        kwargs = kwargs or {}
+        if executor == "queue":
+            if self.task_queue is None:
+                raise ValueError("Task queue is not enabled")
+            # Блокировку по имени задачи берёт воркер
+            options["executor"] = "queue"
+        elif executor == "thread":
+            # Все ресурсы привязаны к event loop приложения, и из потока
+            # ими пользоваться нельзя
+            requested = inspect.signature(func).parameters.keys() & (
+                self.resources.keys() - kwargs.keys()
+            )
+            if requested:
+                raise ValueError(
+                    f"Thread job {job_id} cannot use event loop resources: "
+                    f"{', '.join(sorted(requested))}"
+                )
+        elif executor != "process":
+            kwargs = inject_resources(func, kwargs, self.resources)
+
+        if executor == "thread":
+            func, kwargs = self.heavy_job_runner.run_in_thread, {
+                "func": func,
+                "kwargs": kwargs,
+            }
+        elif executor == "process":
+            func, kwargs = self.heavy_job_runner.run_in_process, {
+                "func": func,
+                "kwargs": kwargs,
+            }
+        self.job_stats[job_id] = JobStats()
+        if isinstance(trigger, IntervalTrigger):
+            # Слот — исходный интервал: реплики с разным jitter
+            # и адаптивным интервалом выполняют его один раз
+            self.slot_sizes[job_id] = trigger.interval.total_seconds()
+        if adaptive:
+            adaptive.bind(trigger)
+            self.adaptive_intervals[job_id] = adaptive
+        if executor == "queue":
+            func, kwargs = self._run_queued, {
+                "job_id": job_id,
+                "name": name,
+                "kwargs": kwargs,
+            }
+        else:
+            func, kwargs = self._run_measured, {
+                "job_id": job_id,
+                "func": func,
+                "kwargs": kwargs,
+            }
+        if self.job_run_recorder and executor != "queue":
+            func, kwargs = self.job_run_recorder.track, {
+                "job_id": job_id,
+                "func": func,
+                "kwargs": kwargs,
+            }
+        register_job(job_id, func, kwargs)
+
+        next_run_time = self._get_stored_next_run_time(job_id, trigger)
+        if next_run_time:
+            options["next_run_time"] = next_run_time
+
+        self.scheduler.add_job(
+            run_registered_job,
+            trigger,
+            args=[job_id],
+            id=job_id,
+            name=name,
+            replace_existing=True,
+            **options,
+        )
+
+    async def _run_queued(self, job_id: str, name: str, kwargs: dict):
+        """
+        Ставит задачу в очередь фоновых задач и ждёт её итога. Пока
+        задача стоит в очереди или выполняется, следующий запуск
+        пропускается (max_instances), а длительность выполнения
+        в воркере учитывается так же, как у остальных задач.
+        """
+        stats = self.job_stats[job_id]
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        started_at = datetime.datetime.now(timezone.utc)
+        stats.running += 1
+        try:
+            task_id = await self.task_queue.enqueue(
+                name,
+                kwargs,
+                scheduled_at=current_scheduled_time.get(),
+                slot=current_slot.get(),
+            )
+            task = await self.task_queue.wait(task_id)
+            if task is None:
+                raise LookupError(f"Task {name} ({task_id}) is gone")
+        except (TimeoutError, LookupError) as e:
+            # Воркер до задачи не дошёл и в журнал её не записал
+            duration = loop.time() - started
+            self._record_run(job_id, duration, failed=True)
+            if self.job_run_recorder:
+                await self.job_run_recorder.record_failed(
+                    job_id, repr(e), started_at, duration
+                )
+            raise
+        finally:
+            stats.running -= 1
+
+        if task["status"] == "skipped":
+            stats.skipped += 1
+            return None
+
+        failed = task["status"] != "success"
+        self._record_run(job_id, float(task.get("duration", 0)), failed)
+        if failed:
+            raise RuntimeError(f"Task {name} failed: {task.get('error')}")
+        return json.loads(task["result"])
+
+    async def _run_measured(
+        self,
+        job_id: str,
+        func: Callable[..., Any],
+        kwargs: dict,
+    ):
+        """
+        Выполняет задачу и учитывает её запуск (см. _record_run).
+        """
+        stats = self.job_stats[job_id]
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        stats.running += 1
+        failed = True
+        try:
+            result = await func(**kwargs)
+            failed = False
+            return result
+        finally:
+            stats.running -= 1
+            self._record_run(job_id, loop.time() - started, failed)
+
+    def _record_run(self, job_id: str, duration: float, failed: bool):
+        """
+        Обновляет счётчики задачи и, если у задачи адаптивный
+        интервал, пересчитывает его.
+        """
+        self.job_stats[job_id].record_run(duration, failed=failed)
+
+        adaptive = self.adaptive_intervals.get(job_id)
+        trigger = adaptive.adjust(duration) if adaptive else None
+        if trigger:
+            # Следующий запуск — через новый интервал после окончания
+            self.scheduler.reschedule_job(job_id, trigger=trigger)
+
+    def _on_job_skipped(self, event: JobEvent):
+        stats = self.job_stats.get(event.job_id)
+        if stats is None:
+            return
+        if event.code == EVENT_JOB_MISSED:
+            stats.missed += 1
+        else:
+            stats.skipped += 1
+
+    def get_stats(self) -> dict:
+        """
+        Возвращает метрики задач: счётчики запусков, длительность
+        (в секундах), текущий интервал и время следующего запуска.
+        """
+        stats = {}
+        for job in self.scheduler.get_jobs():
+            job_stats = self.job_stats.get(job.id, JobStats())
+            adaptive = self.adaptive_intervals.get(job.id)
+            interval = getattr(job.trigger, "interval", None)
+            stats[job.id] = {
+                "name": job.name,
+                "next_run_time": job.next_run_time,
+                "interval": interval.total_seconds() if interval else None,
+                "base_interval": (
+                    adaptive.base_interval.total_seconds()
+                    if adaptive
+                    else None
+                ),
+                **job_stats.as_dict(),
+            }
+        return stats
+
+    def _get_stored_next_run_time(
+        self, job_id: str, trigger: BaseTrigger
+    ) -> datetime.datetime | None:
+        """
+        Возвращает сохранённое время следующего запуска задачи, если
+        её расписание не менялось. Так пропущенный за время простоя
+        запуск выполнится после перезапуска (в пределах
+        misfire_grace_time), а не потеряется.
+        """
+        if self.jobstore is None:
+            return None
+        job = self.jobstore.lookup_job(job_id)
+        if job is None or str(job.trigger) != str(trigger):
+            return None
+        return job.next_run_time
+
     async def start(self):
         """
         Запуск планировщика.
@@ -59,3 +478,4 @@ class SchedulerManager:
         """
         if self.scheduler:
             self.scheduler.shutdown(wait=False)
+        self.heavy_job_runner.shutdown()
@@ -1,7 +1,51 @@
+import datetime
+
 from pydantic import BaseModel, ConfigDict
 
+from database.models import ItemType
+
 
 class UserCountStatistics(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
     user_count: int
+
+
+class ItemSchema(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    title: str
+    item_type: ItemType
+    user_id: int
+    is_active: bool
+    updated_at: datetime.datetime
+
+
+class JobRunSchema(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    job_id: str
+    status: str
+    scheduled_at: datetime.datetime | None
+    started_at: datetime.datetime | None
+    finished_at: datetime.datetime | None
+    duration: float | None
+    items_processed: int | None
+    error: str | None
+
+
+class JobStatsSchema(BaseModel):
+    name: str
+    next_run_time: datetime.datetime | None
+    interval: float | None
+    base_interval: float | None
+    runs: int
+    failed: int
+    missed: int
+    skipped: int
+    running: int
+    last_duration: float | None
+    avg_duration: float | None
+    max_duration: float
@@ -2,4 +2,8 @@
 
 from services.admin_service import admin_service
 from services.item_service import item_service
+from services.job_run_service import job_run_service
+from services.media_file_service import media_file_service
+from services.media_group_service import media_group_service
+from services.sync_watermark_service import sync_watermark_service
 from services.user_service import user_service
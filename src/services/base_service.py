@@ -1,3 +1,4 @@
+import datetime
 from typing import List
 
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -223,3 +224,23 @@ class BaseService:
         return await self.repository.count(
             session, include_inactive, **filters
         )
+
+    @handle_service_errors("listing changed items")
+    async def list_changed_since(
+        self,
+        session: AsyncSession,
+        after: tuple[datetime.datetime, int] | None = None,
+        limit: int = 500,
+        safety_lag: datetime.timedelta = datetime.timedelta(0),
+    ):
+        """
+        Постраничное получение объектов, изменённых после отметки.
+        :param session: Асинхронная сессия SQLAlchemy.
+        :param after: Пара (updated_at, id) последнего полученного объекта.
+        :param limit: Размер страницы.
+        :param safety_lag: Отставание от текущего времени.
+        :return: Список объектов в порядке (updated_at, id).
+        """
+        return await self.repository.list_changed_since(
+            session, after=after, limit=limit, safety_lag=safety_lag
+        )
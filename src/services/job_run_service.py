@@ -0,0 +1,27 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.repositories import job_run_repository
+from services.base_service import BaseService
+from utils import handle_service_errors
+
+
+class JobRunService(BaseService):
+
+    @handle_service_errors("listing recent job runs")
+    async def list_recent(
+        self, session: AsyncSession, job_id: str | None = None, limit: int = 50
+    ):
+        """
+        Возвращает последние запуски задач планировщика.
+
+        :param session: Асинхронная сессия SQLAlchemy.
+        :param job_id: ID задачи (если не указан — все задачи).
+        :param limit: Максимальное количество запусков.
+        :return: Список запусков.
+        """
+        return await self.repository.list_recent(
+            session=session, job_id=job_id, limit=limit
+        )
+
+
+job_run_service = JobRunService(job_run_repository)
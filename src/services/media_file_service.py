@@ -0,0 +1,59 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.repositories import media_file_repository
+from services.base_service import BaseService
+from utils import handle_service_errors
+
+
+class MediaFileService(BaseService):
+
+    @handle_service_errors("loading media file")
+    async def get_file_id(
+        self, session: AsyncSession, key: str, media_type: str
+    ) -> str | None:
+        """
+        Возвращает сохранённый file_id файла.
+
+        :param session: Асинхронная сессия SQLAlchemy.
+        :param key: Ключ файла.
+        :param media_type: Тип файла.
+        :return: ID файла в Telegram или None.
+        """
+        media_file = await self.repository.get(
+            session, key=key, media_type=media_type
+        )
+        return media_file.file_id if media_file else None
+
+    @handle_service_errors("saving media file")
+    async def save_file_id(
+        self, session: AsyncSession, key: str, file_id: str, media_type: str
+    ):
+        """
+        Сохраняет file_id файла.
+
+        :param session: Асинхронная сессия SQLAlchemy.
+        :param key: Ключ файла.
+        :param file_id: ID файла в Telegram.
+        :param media_type: Тип файла.
+        """
+        await self.repository.upsert(
+            session, key=key, file_id=file_id, media_type=media_type
+        )
+
+    @handle_service_errors("deleting media file")
+    async def forget(self, session: AsyncSession, key: str, media_type: str):
+        """
+        Удаляет file_id файла (например, если Telegram его не принял).
+
+        :param session: Асинхронная сессия SQLAlchemy.
+        :param key: Ключ файла.
+        :param media_type: Тип файла.
+        """
+        media_file = await self.repository.get(
+            session, key=key, media_type=media_type
+        )
+        if media_file:
+            await self.repository.delete(session, media_file.id)
+
+
+media_file_service = MediaFileService(media_file_repository)
@@ -0,0 +1,9 @@
+from database.repositories import media_group_repository
+from services.base_service import BaseService
+
+
+class MediaGroupService(BaseService):
+    pass
+
+
+media_group_service = MediaGroupService(media_group_repository)
@@ -0,0 +1,58 @@
+import datetime
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.repositories import sync_watermark_repository
+from services.base_service import BaseService
+from utils import handle_service_errors
+
+
+class SyncWatermarkService(BaseService):
+
+    @handle_service_errors("loading sync watermark")
+    async def get_watermark(
+        self, session: AsyncSession, name: str
+    ) -> tuple[datetime.datetime, int] | None:
+        """
+        Возвращает отметку синхронизации.
+
+        :param session: Асинхронная сессия SQLAlchemy.
+        :param name: Название синхронизации.
+        :return: Пара (updated_at, id) последней отправленной записи
+         или None, если синхронизация ещё не запускалась.
+        """
+        watermark = await self.repository.get(session, name=name)
+        if watermark is None:
+            return None
+        return watermark.last_updated_at, watermark.last_id
+
+    @handle_service_errors("saving sync watermark")
+    async def save_watermark(
+        self,
+        session: AsyncSession,
+        name: str,
+        watermark: tuple[datetime.datetime, int],
+        fencing_token: int | None = None,
+    ) -> bool:
+        """
+        Сохраняет отметку синхронизации.
+
+        :param session: Асинхронная сессия SQLAlchemy.
+        :param name: Название синхронизации.
+        :param watermark: Пара (updated_at, id) последней отправленной
+         записи.
+        :param fencing_token: Токен блокировки задачи (если есть).
+        :return: False, если отметку уже сохранила задача с большим
+         токеном.
+        """
+        last_updated_at, last_id = watermark
+        return await self.repository.upsert(
+            session,
+            name=name,
+            last_updated_at=last_updated_at,
+            last_id=last_id,
+            fencing_token=fencing_token,
+        )
+
+
+sync_watermark_service = SyncWatermarkService(sync_watermark_repository)
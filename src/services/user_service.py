@@ -4,22 +4,93 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from database.repositories import user_repository
 from services.base_service import BaseService
+from utils import handle_service_errors
 
 
 class UserService(BaseService):
 
     async def get_bobs_for_reminder(
-        self, session: AsyncSession, timeout: datetime.datetime
+        self,
+        session: AsyncSession,
+        timeout: datetime.datetime,
+        timezones: list[str],
+        slot_before: int,
+        limit: int,
     ):
         """
-        Возвращает список пользователей для напоминания.
+        Возвращает слайс пользователей для напоминания.
 
         :param session: Асинхронная сессия SQLAlchemy.
         :param timeout: Временной предел активности пользователя.
+        :param timezones: Часовые пояса, в которых сейчас окно рассылки.
+        :param slot_before: Верхняя граница слотов (не включительно).
+        :param limit: Максимальный размер слайса.
         :return: Список пользователей.
         """
         return await self.repository.get_bobs_for_reminder(
-            session=session, timeout=timeout
+            session=session,
+            timeout=timeout,
+            timezones=timezones,
+            slot_before=slot_before,
+            limit=limit,
+        )
+
+    async def get_bobs_for_reminder_by_ids(
+        self,
+        session: AsyncSession,
+        timeout: datetime.datetime,
+        user_ids: list[int],
+    ):
+        """
+        Возвращает пользователей из списка кандидатов, которым
+        по-прежнему нужно отправить напоминание.
+
+        :param session: Асинхронная сессия SQLAlchemy.
+        :param timeout: Временной предел активности пользователя.
+        :param user_ids: ID кандидатов.
+        :return: Список пользователей.
+        """
+        if not user_ids:
+            return []
+        return await self.repository.get_bobs_for_reminder_by_ids(
+            session=session, timeout=timeout, user_ids=user_ids
+        )
+
+    @handle_service_errors("listing reminder candidates")
+    async def list_reminder_candidates(
+        self, session: AsyncSession, after_id: int | None, limit: int
+    ):
+        """
+        Возвращает страницу кандидатов для пересборки индекса
+        напоминаний.
+
+        :param session: Асинхронная сессия SQLAlchemy.
+        :param after_id: ID последнего пользователя предыдущей страницы.
+        :param limit: Размер страницы.
+        :return: Строки с полями id, timezone, last_active, is_active.
+        """
+        return await self.repository.list_reminder_candidates(
+            session=session, after_id=after_id, limit=limit
+        )
+
+    @handle_service_errors("updating last activity")
+    async def update_last_active(
+        self,
+        session: AsyncSession,
+        activity: dict[int, datetime.datetime],
+    ):
+        """
+        Записывает время последней активности пачки пользователей.
+
+        :param session: Асинхронная сессия SQLAlchemy.
+        :param activity: Словарь {ID пользователя: время активности}.
+        :return: Обновлённые строки с полями id, timezone, last_active
+         и is_active.
+        """
+        if not activity:
+            return []
+        return await self.repository.bulk_update_last_active(
+            session=session, activity=activity
         )
 
 
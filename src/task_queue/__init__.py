@@ -0,0 +1,4 @@
+# flake8: noqa
+
+from task_queue.task_queue import TaskQueue
+from task_queue.worker_manager import TaskWorkerManager
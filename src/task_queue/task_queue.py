@@ -0,0 +1,188 @@
+import asyncio
+import datetime
+import json
+import uuid
+
+from redis.asyncio import Redis
+
+from config import TaskQueueConfig
+
+# Статусы задачи, после которых она больше не выполняется
+FINAL_STATUSES = ("success", "failed", "skipped")
+
+# Запас сверх времени всех попыток задачи на ожидание в очереди
+WAIT_SLACK = 300.0
+
+# Снимает с очереди задачу, которую так и не начали выполнять.
+# KEYS: hash задачи, очередь, delayed; ARGV: ID, ошибка, время, TTL
+EXPIRE_WAITING_SCRIPT = """
+local status = redis.call('HGET', KEYS[1], 'status')
+if status ~= 'queued' and status ~= 'retrying' then
+    return 0
+end
+redis.call(
+    'HSET', KEYS[1], 'status', 'failed', 'error', ARGV[2],
+    'finished_at', ARGV[3]
+)
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+redis.call('LREM', KEYS[2], 0, ARGV[1])
+redis.call('ZREM', KEYS[3], ARGV[1])
+return 1
+"""
+
+
+class TaskQueue:
+    """
+    Очередь фоновых задач в Redis.
+
+    - `<prefix>:queue` — список ID задач, ожидающих выполнения.
+    - `<prefix>:task:<id>` — hash задачи: имя, аргументы, статус,
+      номер попытки, результат или ошибка. После завершения хранится
+      result_ttl секунд.
+    - `<prefix>:processing:<воркер>` — задачи, которые сейчас выполняет
+      воркер. Если воркер упал, другие воркеры возвращают их в очередь.
+    - `<prefix>:delayed` — sorted set задач, ожидающих повтора,
+      score — время повтора.
+
+    Задача — функция из task_queue.tasks.TASKS. Воркер выполняет
+    одновременно не больше одного запуска задачи с одним именем. Аргументы должны
+    сериализоваться в JSON; ресурсы (bot, async_session, api_client
+    и т.д.) воркер подставляет сам по именам параметров.
+    """
+
+    def __init__(self, redis: Redis, config: TaskQueueConfig):
+        """
+        :param redis: Асинхронный клиент Redis.
+        :param config: Настройки очереди.
+        """
+        self.redis = redis
+        self.config = config
+        self.queue_key = f"{config.key_prefix}:queue"
+        self.delayed_key = f"{config.key_prefix}:delayed"
+        self._expire_waiting = redis.register_script(EXPIRE_WAITING_SCRIPT)
+
+    def task_key(self, task_id: str) -> str:
+        return f"{self.config.key_prefix}:task:{task_id}"
+
+    def processing_key(self, worker_id: str) -> str:
+        return f"{self.config.key_prefix}:processing:{worker_id}"
+
+    def heartbeat_key(self, worker_id: str) -> str:
+        return f"{self.config.key_prefix}:worker:{worker_id}"
+
+    async def enqueue(
+        self,
+        name: str,
+        kwargs: dict | None = None,
+        scheduled_at: datetime.datetime | None = None,
+        slot: int | None = None,
+        max_retries: int | None = None,
+        timeout: float | None = None,
+    ) -> str:
+        """
+        Ставит задачу в очередь.
+
+        :param name: Имя задачи в task_queue.tasks.TASKS.
+        :param kwargs: Именованные аргументы задачи (JSON).
+        :param scheduled_at: Плановое время запуска (для журнала
+         запусков задач).
+        :param slot: Слот запуска задачи планировщика (см.
+         LockedAsyncIOExecutor). По умолчанию — плановое время.
+        :param max_retries: Сколько раз повторять упавшую задачу
+         (по умолчанию из настроек).
+        :param timeout: Предельная длительность задачи в секундах
+         (по умолчанию из настроек).
+        :return: ID задачи.
+        """
+        task_id = uuid.uuid4().hex
+        task = {
+            "name": name,
+            "kwargs": json.dumps(kwargs or {}),
+            "status": "queued",
+            "attempts": 0,
+            "max_retries": (
+                self.config.max_retries if max_retries is None else max_retries
+            ),
+            "timeout": timeout or self.config.timeout,
+            "enqueued_at": datetime.datetime.now(
+                datetime.timezone.utc
+            ).isoformat(),
+        }
+        if scheduled_at:
+            task["scheduled_at"] = scheduled_at.isoformat()
+        if slot is not None:
+            task["slot"] = slot
+
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(self.task_key(task_id), mapping=task)
+            pipe.lpush(self.queue_key, task_id)
+            await pipe.execute()
+        return task_id
+
+    async def get_task(self, task_id: str) -> dict | None:
+        """
+        Возвращает статус задачи.
+
+        :param task_id: ID задачи.
+        :return: Поля задачи или None, если задача не найдена
+         (или срок хранения результата истёк).
+        """
+        task = await self.redis.hgetall(self.task_key(task_id))
+        if not task:
+            return None
+        return {key.decode(): value.decode() for key, value in task.items()}
+
+    def max_wait(self) -> float:
+        """
+        Сколько может занять задача с настройками по умолчанию: все
+        попытки, задержки между ними и запас на ожидание в очереди.
+        """
+        config = self.config
+        backoff = sum(
+            min(config.retry_backoff * 2**attempt, config.retry_backoff_max)
+            for attempt in range(config.max_retries)
+        )
+        return (
+            config.timeout * (config.max_retries + 1) + backoff + WAIT_SLACK
+        )
+
+    async def wait(
+        self,
+        task_id: str,
+        timeout: float | None = None,
+        poll_interval: float = 1.0,
+    ) -> dict | None:
+        """
+        Ждёт, пока задача не будет выполнена, пропущена или не упадёт
+        окончательно (после всех повторов).
+
+        Если за timeout задача так и не началась (нет воркеров,
+        очередь забита), она снимается с очереди со статусом failed.
+
+        :param task_id: ID задачи.
+        :param timeout: Сколько ждать, в секундах (по умолчанию
+         max_wait()).
+        :param poll_interval: Как часто проверять статус, в секундах.
+        :return: Поля задачи или None, если задача пропала из Redis.
+        :raises TimeoutError: Если задача не завершилась за timeout.
+        """
+        timeout = timeout or self.max_wait()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while loop.time() < deadline:
+            task = await self.get_task(task_id)
+            if task is None or task["status"] in FINAL_STATUSES:
+                return task
+            await asyncio.sleep(poll_interval)
+
+        error = f"Not finished in {timeout:g}s"
+        await self._expire_waiting(
+            keys=[self.task_key(task_id), self.queue_key, self.delayed_key],
+            args=[
+                task_id,
+                error,
+                datetime.datetime.now(datetime.timezone.utc).isoformat(),
+                self.config.result_ttl,
+            ],
+        )
+        raise TimeoutError(f"Task {task_id}: {error}")
@@ -0,0 +1,9 @@
+from typing import Any, Awaitable, Callable
+
+from scheduled_jobs.jobs import example_scheduler_task, remind_users
+
+# Задачи, которые выполняют воркеры очереди, по имени.
+# Имя задачи совпадает с именем функции
+TASKS: dict[str, Callable[..., Awaitable[Any]]] = {
+    task.__name__: task for task in (example_scheduler_task, remind_users)
+}
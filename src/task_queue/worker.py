@@ -0,0 +1,465 @@
+import asyncio
+import contextvars
+import datetime
+import json
+import logging
+import os
+import random
+import socket
+import uuid
+
+from scheduled_jobs.executors import current_scheduled_time
+from scheduled_jobs.job_history import JobRunRecorder
+from scheduled_jobs.job_lock import (
+    RedisJobLock,
+    current_fencing_token,
+    current_job_lock,
+)
+from scheduled_jobs.registry import inject_resources
+from task_queue.task_queue import FINAL_STATUSES, TaskQueue
+from task_queue.tasks import TASKS
+
+# Переносит задачи, время повтора которых наступило, в очередь
+PROMOTE_DELAYED_SCRIPT = """
+local ids = redis.call(
+    'ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2]
+)
+if #ids > 0 then
+    redis.call('ZREM', KEYS[1], unpack(ids))
+    redis.call('LPUSH', KEYS[2], unpack(ids))
+end
+return #ids
+"""
+
+# Возвращает в очередь одну задачу упавшего воркера. Задача, у которой
+# кончились попытки, в очередь не возвращается, а помечается failed:
+# иначе задача, роняющая воркер, будет перезапускаться бесконечно.
+# KEYS: processing, очередь; ARGV: префикс задач, ошибка, время, TTL.
+# Возвращает ID задачи и 1, если она помечена failed
+REQUEUE_DEAD_SCRIPT = """
+local task_id = redis.call('RPOP', KEYS[1])
+if not task_id then
+    return nil
+end
+local task_key = ARGV[1] .. task_id
+local fields = redis.call('HMGET', task_key, 'attempts', 'max_retries')
+local attempts = tonumber(fields[1]) or 0
+local max_retries = tonumber(fields[2]) or 0
+if attempts > max_retries then
+    redis.call(
+        'HSET', task_key, 'status', 'failed', 'error', ARGV[2],
+        'finished_at', ARGV[3]
+    )
+    redis.call('EXPIRE', task_key, ARGV[4])
+    return {task_id, 1}
+end
+redis.call('RPUSH', KEYS[2], task_id)
+return {task_id, 0}
+"""
+
+# Как часто воркер продлевает свой heartbeat и ищет упавших соседей
+HEARTBEAT_INTERVAL = 5.0
+# Воркер без heartbeat дольше этого срока считается упавшим
+HEARTBEAT_TTL = 15.0
+# Сколько секунд ждать задачу в BLMOVE (меньше socket_timeout Redis)
+POLL_TIMEOUT = 2
+
+
+def _now() -> datetime.datetime:
+    return datetime.datetime.now(datetime.timezone.utc)
+
+
+class TaskWorker:
+    """
+    Воркер очереди фоновых задач.
+
+    - concurrency корутин забирают задачи из очереди командой BLMOVE
+      в свой список processing: пока задача выполняется, она не
+      потеряется, даже если процесс упадёт.
+    - Упавшая или превысившая timeout задача повторяется с
+      экспоненциальной задержкой (через sorted set delayed), пока
+      не кончатся попытки.
+    - Воркер продлевает свой heartbeat и возвращает в очередь задачи
+      воркеров, чей heartbeat истёк. Задача, у которой попытки уже
+      кончились, вместо этого помечается failed.
+    - С job_lock задача выполняется под распределённой блокировкой
+      по её имени (той же, что у планировщика): два запуска одной
+      задачи не идут одновременно ни на разных воркерах, ни на воркере
+      и в процессе приложения. Задача получает fencing token через
+      current_fencing_token. Запуск, который застал блокировку занятой
+      или слот (плановое время) уже выполненным, пропускается
+      со статусом skipped.
+    - Каждый запуск записывается в журнал job_runs (если задан
+      recorder), статус и результат — в hash задачи.
+    """
+
+    def __init__(
+        self,
+        queue: TaskQueue,
+        resources: dict,
+        recorder: JobRunRecorder | None = None,
+        job_lock: RedisJobLock | None = None,
+    ):
+        """
+        :param queue: Очередь задач.
+        :param resources: Ресурсы процесса, которые задачи получают
+         по имени параметра (bot, async_session, api_client и т.д.).
+        :param recorder: Журнал запусков задач (опционально).
+        :param job_lock: Распределённая блокировка задач (опционально).
+        """
+        self.queue = queue
+        self.redis = queue.redis
+        self.config = queue.config
+        self.resources = resources
+        self.recorder = recorder
+        self.job_lock = job_lock
+
+        self.worker_id = (
+            f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        )
+        self.processing_key = queue.processing_key(self.worker_id)
+        self._promote_delayed = self.redis.register_script(
+            PROMOTE_DELAYED_SCRIPT
+        )
+        self._requeue_dead = self.redis.register_script(REQUEUE_DEAD_SCRIPT)
+        self._consumers: list[asyncio.Task] = []
+        self._maintenance_task: asyncio.Task | None = None
+
+    async def start(self):
+        """
+        Запускает обработку задач.
+        """
+        await self._heartbeat()
+        self._consumers = [
+            asyncio.create_task(self._consume())
+            for _ in range(self.config.concurrency)
+        ]
+        self._maintenance_task = asyncio.create_task(self._maintain())
+        logging.info(
+            f"Task worker {self.worker_id} started "
+            f"with concurrency {self.config.concurrency}"
+        )
+
+    async def shutdown(self):
+        """
+        Останавливает обработку. Незавершённые задачи возвращаются
+        в очередь и будут выполнены заново.
+        """
+        tasks = [*self._consumers]
+        if self._maintenance_task:
+            tasks.append(self._maintenance_task)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._consumers, self._maintenance_task = [], None
+
+        requeued = await self._requeue(self.processing_key)
+        if requeued:
+            logging.info(f"Returned {requeued} unfinished tasks to the queue")
+        await self.redis.delete(self.queue.heartbeat_key(self.worker_id))
+
+    async def _consume(self):
+        while True:
+            try:
+                task_id = await self.redis.blmove(
+                    self.queue.queue_key,
+                    self.processing_key,
+                    POLL_TIMEOUT,
+                    src="RIGHT",
+                    dest="LEFT",
+                )
+                if task_id is None:
+                    continue
+                await self._execute(task_id.decode())
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logging.exception("Task worker error: ")
+                await asyncio.sleep(1)
+
+    async def _execute(self, task_id: str):
+        task = await self.queue.get_task(task_id)
+        # Задача пропала или уже завершена (например, снята с очереди
+        # по истечении ожидания): выполнять нечего
+        if task is None or task["status"] in FINAL_STATUSES:
+            await self.redis.lrem(self.processing_key, 0, task_id)
+            return
+
+        name = task["name"]
+        scheduled_at = None
+        if task.get("scheduled_at"):
+            scheduled_at = datetime.datetime.fromisoformat(
+                task["scheduled_at"]
+            )
+
+        token = None
+        if self.job_lock:
+            token = await self.job_lock.acquire(name)
+            if token is None:
+                await self._skip(
+                    task_id, name, "Another run of the task is in progress"
+                )
+                return
+        try:
+            slot = None
+            if task.get("slot"):
+                slot = int(task["slot"])
+            elif scheduled_at:
+                slot = int(scheduled_at.timestamp())
+            if token is not None and slot is not None:
+                if await self.job_lock.is_done(name, slot):
+                    await self._skip(task_id, name, "Slot is already done")
+                    return
+
+            done = await self._run(task_id, task, scheduled_at, token)
+            if done and token is not None and slot is not None:
+                await self.job_lock.mark_done(name, slot)
+        finally:
+            if token is not None:
+                await self.job_lock.release(name, token)
+
+    async def _run(
+        self,
+        task_id: str,
+        task: dict,
+        scheduled_at: datetime.datetime | None,
+        token: int | None,
+    ) -> bool:
+        """
+        Выполняет задачу и сохраняет её итог.
+
+        :return: True, если задача выполнена успешно.
+        """
+        task_key = self.queue.task_key(task_id)
+        attempt = await self.redis.hincrby(task_key, "attempts", 1)
+        await self.redis.hset(
+            task_key,
+            mapping={
+                "status": "running",
+                "started_at": _now().isoformat(),
+                "worker": self.worker_id,
+            },
+        )
+
+        name = task["name"]
+        # Контекст задачи отдельный, чтобы плановое время и токен
+        # не достались следующей задаче этой корутины воркера
+        context = contextvars.copy_context()
+        context.run(current_scheduled_time.set, scheduled_at)
+        if token is not None:
+            context.run(current_fencing_token.set, token)
+            context.run(current_job_lock.set, (self.job_lock, name, token))
+
+        timeout = float(task["timeout"])
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        keep_alive = None
+        try:
+            func = TASKS.get(name)
+            if func is None:
+                raise LookupError(f"Unknown task {name}")
+            kwargs = inject_resources(
+                func, json.loads(task["kwargs"]), self.resources
+            )
+            if self.recorder:
+                coro = self.recorder.track(name, func, kwargs)
+            else:
+                coro = func(**kwargs)
+            run = asyncio.create_task(coro, context=context)
+            if token is not None:
+                keep_alive = asyncio.create_task(
+                    self.job_lock.keep_alive(name, token, run)
+                )
+            result = await asyncio.wait_for(run, timeout)
+        except asyncio.CancelledError:
+            lock_lost = (
+                keep_alive is not None
+                and keep_alive.done()
+                and keep_alive.result()
+            )
+            if not lock_lost:
+                # Задачу вернёт в очередь shutdown
+                raise
+            error = "Lock for the task was lost"
+        except Exception as e:
+            if isinstance(e, TimeoutError):
+                error = f"Timed out after {timeout:g}s"
+            else:
+                error = repr(e)
+        else:
+            error = None
+        finally:
+            if keep_alive is not None:
+                keep_alive.cancel()
+        duration = loop.time() - started
+
+        if error is not None:
+            await self._fail(task_id, name, attempt, task, error, duration)
+            return False
+
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(
+                task_key,
+                mapping={
+                    "status": "success",
+                    "result": json.dumps(result, default=str),
+                    "duration": duration,
+                    "finished_at": _now().isoformat(),
+                },
+            )
+            pipe.hdel(task_key, "error", "retry_at")
+            pipe.expire(task_key, self.config.result_ttl)
+            pipe.lrem(self.processing_key, 0, task_id)
+            await pipe.execute()
+        return True
+
+    async def _skip(self, task_id: str, name: str, reason: str):
+        logging.info(f"Task {name} ({task_id}) skipped: {reason}")
+        task_key = self.queue.task_key(task_id)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(
+                task_key,
+                mapping={
+                    "status": "skipped",
+                    "error": reason,
+                    "finished_at": _now().isoformat(),
+                },
+            )
+            pipe.expire(task_key, self.config.result_ttl)
+            pipe.lrem(self.processing_key, 0, task_id)
+            await pipe.execute()
+
+    async def _fail(
+        self,
+        task_id: str,
+        name: str,
+        attempt: int,
+        task: dict,
+        error: str,
+        duration: float,
+    ):
+        task_key = self.queue.task_key(task_id)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(task_key, "duration", duration)
+            if attempt <= int(task["max_retries"]):
+                delay = min(
+                    self.config.retry_backoff * 2 ** (attempt - 1),
+                    self.config.retry_backoff_max,
+                ) * random.uniform(0.5, 1.0)
+                logging.warning(
+                    f"Task {name} ({task_id}) failed: {error}, "
+                    f"retrying in {delay:.1f}s"
+                )
+                retry_at = _now() + datetime.timedelta(seconds=delay)
+                pipe.hset(
+                    task_key,
+                    mapping={
+                        "status": "retrying",
+                        "error": error,
+                        "retry_at": retry_at.isoformat(),
+                    },
+                )
+                pipe.zadd(
+                    self.queue.delayed_key, {task_id: retry_at.timestamp()}
+                )
+            else:
+                logging.error(
+                    f"Task {name} ({task_id}) failed after "
+                    f"{attempt} attempts: {error}"
+                )
+                pipe.hset(
+                    task_key,
+                    mapping={
+                        "status": "failed",
+                        "error": error,
+                        "finished_at": _now().isoformat(),
+                    },
+                )
+                pipe.expire(task_key, self.config.result_ttl)
+            pipe.lrem(self.processing_key, 0, task_id)
+            await pipe.execute()
+
+    async def _maintain(self):
+        next_heartbeat = 0.0
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                while await self._promote_delayed(
+                    keys=[self.queue.delayed_key, self.queue.queue_key],
+                    args=[_now().timestamp(), 100],
+                ):
+                    pass
+                if loop.time() >= next_heartbeat:
+                    await self._heartbeat()
+                    await self._recover_dead_workers()
+                    next_heartbeat = loop.time() + HEARTBEAT_INTERVAL
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logging.exception("Task worker maintenance error: ")
+            await asyncio.sleep(1)
+
+    async def _heartbeat(self):
+        await self.redis.set(
+            self.queue.heartbeat_key(self.worker_id),
+            1,
+            px=int(HEARTBEAT_TTL * 1000),
+        )
+
+    async def _recover_dead_workers(self):
+        """
+        Возвращает в очередь задачи воркеров, чей heartbeat истёк.
+        """
+        prefix = self.queue.processing_key("")
+        async for key in self.redis.scan_iter(match=f"{prefix}*"):
+            worker_id = key.decode().removeprefix(prefix)
+            if worker_id == self.worker_id:
+                continue
+            if await self.redis.exists(self.queue.heartbeat_key(worker_id)):
+                continue
+            requeued, failed = await self._requeue_from_dead(key)
+            if requeued or failed:
+                logging.warning(
+                    f"Worker {worker_id} is gone, "
+                    f"returned {requeued} tasks to the queue, "
+                    f"{failed} tasks are out of attempts"
+                )
+
+    async def _requeue_from_dead(self, processing_key) -> tuple[int, int]:
+        """
+        Возвращает в очередь задачи упавшего воркера. Задачи, у которых
+        кончились попытки, помечаются failed.
+
+        :return: Сколько задач возвращено и сколько помечено failed.
+        """
+        requeued = failed = 0
+        while True:
+            result = await self._requeue_dead(
+                keys=[processing_key, self.queue.queue_key],
+                args=[
+                    self.queue.task_key(""),
+                    "Worker died while running the task",
+                    _now().isoformat(),
+                    self.config.result_ttl,
+                ],
+            )
+            if not result:
+                return requeued, failed
+            task_id, exhausted = result
+            if exhausted:
+                failed += 1
+                logging.error(
+                    f"Task {task_id.decode()} failed: worker died "
+                    f"and no attempts are left"
+                )
+            else:
+                requeued += 1
+
+    async def _requeue(self, processing_key) -> int:
+        requeued = 0
+        # Задачи встают в начало очереди: их возьмут первыми
+        while await self.redis.lmove(
+            processing_key, self.queue.queue_key, "RIGHT", "RIGHT"
+        ):
+            requeued += 1
+        return requeued
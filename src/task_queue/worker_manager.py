@@ -0,0 +1,107 @@
+from aiogram import Bot
+from aiogram.client.bot import DefaultBotProperties
+from aiogram.enums import ParseMode
+from redis.asyncio import ConnectionPool, Redis
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from api_client import ApiClientManager
+from config import BotConfig, RedisConfig, SchedulerConfig, TaskQueueConfig
+from core import BaseModuleManager
+from scheduled_jobs.job_history import JobRunRecorder
+from scheduled_jobs.job_lock import RedisJobLock
+from scheduled_jobs.reminder_index import ReminderIndex
+from task_queue.task_queue import TaskQueue
+from task_queue.worker import POLL_TIMEOUT, TaskWorker
+
+
+class TaskWorkerManager(BaseModuleManager):
+    """
+    Модуль воркера очереди фоновых задач (роль "worker").
+    """
+
+    def __init__(
+        self,
+        task_queue_config: TaskQueueConfig,
+        redis_config: RedisConfig,
+        bot_config: BotConfig,
+        async_session: async_sessionmaker,
+        api_client: ApiClientManager,
+        scheduler_config: SchedulerConfig | None = None,
+    ):
+        self.task_queue_config = task_queue_config
+        self.scheduler_config = scheduler_config or SchedulerConfig()
+        self.redis_config = redis_config
+        self.bot_config = bot_config
+        self.async_session = async_session
+        self.api_client = api_client
+
+        # Бот нужен задачам только для отправки сообщений
+        self.bot = Bot(
+            token=self.bot_config.bot_token.get_secret_value(),
+            default=DefaultBotProperties(parse_mode=ParseMode.HTML),
+        )
+        self.redis: Redis | None = None
+        self.worker: TaskWorker | None = None
+
+    async def configure(self):
+        """
+        Подключение к Redis и создание воркера.
+        """
+        connection_pool = ConnectionPool(
+            host=self.redis_config.redis_host,
+            port=self.redis_config.redis_port,
+            db=self.redis_config.redis_db,
+            # Каждая корутина воркера держит соединение в BLMOVE
+            max_connections=max(
+                self.redis_config.max_connections,
+                self.task_queue_config.concurrency * 2,
+            ),
+            socket_timeout=max(
+                self.redis_config.socket_timeout, POLL_TIMEOUT + 3
+            ),
+            socket_connect_timeout=self.redis_config.socket_connect_timeout,
+            health_check_interval=self.redis_config.health_check_interval,
+        )
+        self.redis = Redis(connection_pool=connection_pool)
+
+        resources = {
+            "bot": self.bot,
+            "async_session": self.async_session,
+            "api_client": self.api_client,
+            "redis": self.redis,
+        }
+        if self.scheduler_config.reminder_index:
+            resources["reminder_index"] = ReminderIndex(self.redis)
+
+        # Та же блокировка, что у планировщика: счётчик fencing token
+        # у задачи общий, где бы она ни выполнялась
+        job_lock = None
+        if self.scheduler_config.job_lock:
+            job_lock = RedisJobLock(
+                self.redis,
+                lease_ms=int(self.scheduler_config.lock_lease * 1000),
+                key_prefix=self.scheduler_config.key_prefix,
+            )
+
+        self.worker = TaskWorker(
+            TaskQueue(self.redis, self.task_queue_config),
+            resources=resources,
+            recorder=JobRunRecorder(self.async_session),
+            job_lock=job_lock,
+        )
+
+    async def start(self):
+        """
+        Запуск воркера.
+        """
+        await self.worker.start()
+
+    async def shutdown(self):
+        """
+        Остановка воркера: незавершённые задачи возвращаются в очередь.
+        """
+        if self.worker:
+            await self.worker.shutdown()
+        await self.bot.session.close()
+        if self.redis:
+            await self.redis.aclose(close_connection_pool=True)